@@ -0,0 +1,82 @@
+from .backends.SceneBackend import *
+
+
+class AttributeSnapshot:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Plugs known by the snapshot (dict used as an ordered set)
+        self.__plugs = {}
+        # Flat cache of the values by plug name ("node.attribute")
+        self.__values = {}
+        self.__nb_batch_reads = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    def add_plugs(self, plugs):
+        """
+        Add plugs to the ones read in batch
+        :param plugs
+        :return:
+        """
+        for plug in plugs:
+            self.__plugs[plug] = None
+
+    def __read_batch(self):
+        """
+        Read in one batch all the known plugs that are not cached
+        :return:
+        """
+        to_read = [plug for plug in self.__plugs if plug not in self.__values]
+        if len(to_read) == 0:
+            return
+        self.__values.update(SceneBackend.get_instance().get_many(to_read))
+        self.__nb_batch_reads += 1
+
+    def get(self, plug):
+        """
+        Getter of the value of a plug from the cache (read in batch with the other known plugs if needed)
+        :param plug
+        :return: value
+        """
+        if plug in self.__values:
+            self.__hits += 1
+            return self.__values[plug]
+        self.__misses += 1
+        if plug not in self.__plugs:
+            self.__plugs[plug] = None
+        self.__read_batch()
+        if plug not in self.__values:
+            # Not readable in batch, let the backend raise the proper error
+            self.__values[plug] = SceneBackend.get_instance().get(plug)
+        return self.__values[plug]
+
+    def invalidate(self, plug):
+        """
+        Invalidate the cached value of a plug
+        :param plug
+        :return:
+        """
+        self.__values.pop(plug, None)
+
+    def invalidate_all(self):
+        """
+        Invalidate all the cached values
+        :return:
+        """
+        self.__values.clear()
+        SceneBackend.get_instance().clear_cache()
+
+    def get_stats(self):
+        """
+        Getter of the statistics of the snapshot
+        :return: stats
+        """
+        return {
+            "plugs": len(self.__plugs),
+            "cached": len(self.__values),
+            "batch_reads": self.__nb_batch_reads,
+            "hits": self.__hits,
+            "misses": self.__misses,
+        }
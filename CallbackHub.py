@@ -0,0 +1,156 @@
+import maya.api.OpenMaya as OpenMaya2
+
+# Attribute messages that change the value or the editability of a plug
+_ATTRIBUTE_CHANGED_MSG = OpenMaya2.MNodeMessage.kAttributeSet | OpenMaya2.MNodeMessage.kAttributeLocked | \
+                         OpenMaya2.MNodeMessage.kAttributeUnlocked | OpenMaya2.MNodeMessage.kConnectionMade | \
+                         OpenMaya2.MNodeMessage.kConnectionBroken
+
+
+class CallbackHub:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Subscribers by node name then by attribute name
+        self.__subscribers = {}
+        # Maya callback id by node name
+        self.__callback_ids = {}
+        self.__active = False
+        self.__suspended = False
+        self.__nb_ignored = 0
+
+    def subscribe(self, plug, callback):
+        """
+        Subscribe a callback to the changes of a plug. The callback receives the plug
+        :param plug: "node.attribute"
+        :param callback
+        :return:
+        """
+        node_name, attr_name = plug.split(".", 1)
+        subscribers_node = self.__subscribers.setdefault(node_name, {})
+        subscribers_attr = subscribers_node.setdefault(attr_name, [])
+        if callback not in subscribers_attr:
+            subscribers_attr.append(callback)
+        if self.__active and node_name not in self.__callback_ids:
+            self.__add_node_callback(node_name)
+
+    def unsubscribe(self, plug, callback):
+        """
+        Unsubscribe a callback from the changes of a plug
+        :param plug: "node.attribute"
+        :param callback
+        :return:
+        """
+        node_name, attr_name = plug.split(".", 1)
+        subscribers_node = self.__subscribers.get(node_name, {})
+        subscribers_attr = subscribers_node.get(attr_name, [])
+        if callback in subscribers_attr:
+            subscribers_attr.remove(callback)
+        if len(subscribers_attr) == 0:
+            subscribers_node.pop(attr_name, None)
+        if len(subscribers_node) == 0:
+            self.__subscribers.pop(node_name, None)
+            self.__remove_node_callback(node_name)
+
+    def is_watched(self, plug):
+        """
+        Getter of whether the changes of a plug are dispatched to subscribers
+        :param plug: "node.attribute"
+        :return: is watched
+        """
+        node_name, attr_name = plug.split(".", 1)
+        return self.__active and node_name in self.__callback_ids and \
+            attr_name in self.__subscribers.get(node_name, {})
+
+    def __on_attribute_changed(self, msg, plug, other_plug, node_name):
+        """
+        On an attribute of a watched node changed call the subscribers of the plug
+        :param msg
+        :param plug
+        :param other_plug
+        :param node_name
+        :return:
+        """
+        if not msg & _ATTRIBUTE_CHANGED_MSG:
+            return
+        if self.__suspended:
+            self.__nb_ignored += 1
+            return
+        attr_name = plug.partialName(useLongNames=True)
+        subscribers_attr = self.__subscribers.get(node_name, {}).get(attr_name)
+        if not subscribers_attr:
+            return
+        plug_name = node_name + "." + attr_name
+        for callback in list(subscribers_attr):
+            callback(plug_name)
+
+    def __add_node_callback(self, node_name):
+        """
+        Register the attribute changed callback of a node
+        :param node_name
+        :return:
+        """
+        try:
+            selection = OpenMaya2.MSelectionList()
+            selection.add(node_name)
+            node = selection.getDependNode(0)
+        except RuntimeError:
+            # Node doesn't exist (yet)
+            return
+        self.__callback_ids[node_name] = OpenMaya2.MNodeMessage.addAttributeChangedCallback(
+            node, self.__on_attribute_changed, node_name)
+
+    def __remove_node_callback(self, node_name):
+        """
+        Remove the attribute changed callback of a node
+        :param node_name
+        :return:
+        """
+        if node_name in self.__callback_ids:
+            try:
+                OpenMaya2.MMessage.removeCallback(self.__callback_ids[node_name])
+            except RuntimeError:
+                pass
+            del self.__callback_ids[node_name]
+
+    def add_callbacks(self):
+        """
+        Register one attribute changed callback per watched node
+        :return:
+        """
+        self.__active = True
+        for node_name in self.__subscribers.keys():
+            if node_name not in self.__callback_ids:
+                self.__add_node_callback(node_name)
+
+    def remove_callbacks(self):
+        """
+        Remove all the attribute changed callbacks
+        :return:
+        """
+        self.__active = False
+        for node_name in list(self.__callback_ids.keys()):
+            self.__remove_node_callback(node_name)
+
+    def suspend(self):
+        """
+        Suspend the dispatch of the plug changes (the Maya callbacks stay registered)
+        :return:
+        """
+        self.__suspended = True
+        self.__nb_ignored = 0
+
+    def resume(self):
+        """
+        Resume the dispatch of the plug changes
+        :return: number of plug changes ignored while suspended
+        """
+        self.__suspended = False
+        return self.__nb_ignored
+
+    def get_nb_callbacks(self):
+        """
+        Getter of the number of Maya callbacks registered
+        :return: number of callbacks
+        """
+        return len(self.__callback_ids)
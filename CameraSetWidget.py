@@ -0,0 +1,94 @@
+from PySide2.QtWidgets import *
+from PySide2.QtCore import *
+from PySide2.QtGui import *
+
+from .SceneContext import *
+
+# Labels of the modes of the camera set in the order of the combobox
+_MODE_LABELS = [
+    (CameraSetMode.RenderCamera, "Render camera"),
+    (CameraSetMode.Renderable, "All renderable"),
+    (CameraSetMode.Selection, "Selection"),
+    (CameraSetMode.Pattern, "Name pattern"),
+]
+
+
+class CameraSetWidget(QWidget):
+    def __init__(self, parent=None):
+        """
+        Constructor of the row choosing the cameras edited by the camera parts (created once by the ControlRoom)
+        :param parent
+        """
+        super(CameraSetWidget, self).__init__(parent)
+        self.__ui_mode_cbb = None
+        self.__ui_pattern_line_edit = None
+        self.__ui_pick_btn = None
+        self.__ui_lbl_count = None
+        self.__create_ui()
+
+    def __create_ui(self):
+        """
+        Create the UI
+        :return:
+        """
+        lyt = QHBoxLayout(self)
+        lyt.setContentsMargins(0, 0, 0, 0)
+        lyt.addWidget(QLabel("Cameras"))
+        self.__ui_mode_cbb = QComboBox()
+        for mode, label in _MODE_LABELS:
+            self.__ui_mode_cbb.addItem(label, mode)
+        self.__ui_mode_cbb.currentIndexChanged.connect(self.__on_mode_changed)
+        lyt.addWidget(self.__ui_mode_cbb)
+        self.__ui_pattern_line_edit = QLineEdit()
+        self.__ui_pattern_line_edit.setPlaceholderText("shotCam* stereo*")
+        self.__ui_pattern_line_edit.setToolTip("Names of cameras or of their transforms, * as wildcard")
+        self.__ui_pattern_line_edit.editingFinished.connect(self.__on_pattern_changed)
+        lyt.addWidget(self.__ui_pattern_line_edit, 1)
+        self.__ui_pick_btn = QPushButton("Pick")
+        self.__ui_pick_btn.setToolTip("Use the cameras selected now")
+        self.__ui_pick_btn.clicked.connect(self.__on_pick)
+        lyt.addWidget(self.__ui_pick_btn)
+        self.__ui_lbl_count = QLabel()
+        lyt.addWidget(self.__ui_lbl_count, 0, Qt.AlignRight)
+
+    def refresh(self):
+        """
+        Refresh the row from the camera set of the scene context
+        :return:
+        """
+        scene_context = SceneContext.get_instance()
+        mode = scene_context.get_camera_set_mode()
+        self.__ui_mode_cbb.blockSignals(True)
+        self.__ui_mode_cbb.setCurrentIndex(self.__ui_mode_cbb.findData(mode))
+        self.__ui_mode_cbb.blockSignals(False)
+        self.__ui_pattern_line_edit.setVisible(mode == CameraSetMode.Pattern)
+        if not self.__ui_pattern_line_edit.hasFocus():
+            self.__ui_pattern_line_edit.setText(scene_context.get_camera_set_pattern())
+        self.__ui_pick_btn.setVisible(mode == CameraSetMode.Selection)
+        cameras = scene_context.get_edited_cameras()
+        self.__ui_lbl_count.setText(str(len(cameras)) + (" camera" if len(cameras) == 1 else " cameras"))
+        self.__ui_lbl_count.setToolTip("\n".join(cameras) if len(cameras) > 0 else "No camera edited")
+
+    def __on_mode_changed(self, index):
+        """
+        On mode changed set the camera set
+        :param index
+        :return:
+        """
+        SceneContext.get_instance().set_camera_set(self.__ui_mode_cbb.itemData(index))
+
+    def __on_pattern_changed(self):
+        """
+        On pattern changed set the camera set
+        :return:
+        """
+        scene_context = SceneContext.get_instance()
+        if self.__ui_pattern_line_edit.text() != scene_context.get_camera_set_pattern():
+            scene_context.set_camera_set(CameraSetMode.Pattern, self.__ui_pattern_line_edit.text())
+
+    def __on_pick(self):
+        """
+        On click on Pick use the cameras selected
+        :return:
+        """
+        SceneContext.get_instance().set_camera_set(CameraSetMode.Selection)
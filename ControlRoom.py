@@ -1,9 +1,10 @@
 import os
+import time
 from functools import partial
 
 import sys
 
-import pymel.core as pm
+import maya.cmds as cmds
 import maya.OpenMayaUI as omui
 
 from PySide2 import QtCore
@@ -13,7 +14,7 @@ from PySide2.QtWidgets import *
 from PySide2.QtCore import *
 from PySide2.QtGui import *
 
-from shiboken2 import wrapInstance
+from shiboken2 import wrapInstance, isValid
 
 from common.utils import *
 
@@ -22,8 +23,20 @@ from common.Prefs import *
 import maya.OpenMaya as OpenMaya
 
 from .PresetManager import *
+from .PresetMatcher import values_differ
+from .OverrideIndex import *
+from .DirtyTracker import *
+from .RefreshScheduler import *
+from .AttributeSnapshot import *
+from .CallbackHub import *
+from .LayerContext import *
+from .SceneContext import *
+from .CameraSetWidget import *
+from .WritePipeline import *
+from .backends.SceneBackend import *
 
 import maya.mel as mel
+from maya.app.general.mayaMixin import MayaQWidgetDockableMixin
 import maya.app.renderSetup.model.override as maya_override
 import maya.app.renderSetup.model.renderSetup as render_setup
 import maya.app.renderSetup.model.utils as render_setup_utils
@@ -40,28 +53,101 @@ from .parts.PresetsPart import *
 
 _FILE_NAME_PREFS = "control_room"
 
-OVERRIDE_BG_COLOR = "rgb(100,50,25)"
+# Hexadecimal to be usable in the stylesheets and by QColor
+OVERRIDE_BG_COLOR = "#643219"
 OVERRIDE_LABEL_COLOR = "rgb(230,115,60)"
 PRESET_CONTAINS_LABEL_COLOR = "rgb(151, 154, 206)"
 PRESET_CONTAINS_AND_DIFFERENT_LABEL_COLOR = "rgb(53, 200, 223)"
+SELECTED_BG_COLOR = "#2C2C2C"
+
+# Stylesheet of the window : the fields are highlighted according to their dynamic property "state"
+_FIELDS_STYLESHEET = \
+    "QLabel[state=\"override\"], QCheckBox[state=\"override\"]{color:" + OVERRIDE_LABEL_COLOR + "}" \
+    "QLabel[state=\"preset\"], QCheckBox[state=\"preset\"]{color:" + PRESET_CONTAINS_LABEL_COLOR + "}" \
+    "QLabel[state=\"preset-diff\"], QCheckBox[state=\"preset-diff\"]" \
+    "{color:" + PRESET_CONTAINS_AND_DIFFERENT_LABEL_COLOR + "}" \
+    "QWidget#widget_form_slider[state=\"override\"]{background-color:" + OVERRIDE_BG_COLOR + "}" \
+    "QPushButton[state=\"selected\"]{background-color:" + SELECTED_BG_COLOR + "}"
+
+# Maximum size of a widget in Qt (QWIDGETSIZE_MAX)
+_MAX_WIDGET_SIZE = 16777215
+
+# Delay before a hovered preset is previewed (so sweeping the presets doesn't refresh on every card)
+_HOVER_INTENT_DELAY_MS = 120
 
 
 # ######################################################################################################################
 
 
-class ControlRoom(QDialog):
+class ControlRoom(MayaQWidgetDockableMixin, QDialog):
+    # ################################################### Singleton ####################################################
+    __instance = None
+
+    @staticmethod
+    def get_instance():
+        """
+        Getter of the window kept between the launches
+        :return: instance of ControlRoom or None
+        """
+        instance = ControlRoom.__instance
+        if instance is None or not isValid(instance):
+            return None
+        return instance
+
+    @staticmethod
+    def show_instance(dockable=False):
+        """
+        Show the window kept between the launches (built only the first time) and measure its time to visible
+        :param dockable: show it in a workspace control
+        :return: instance of ControlRoom
+        """
+        start_time = time.perf_counter()
+        instance = ControlRoom.get_instance()
+        is_constructed = instance is None or not instance.__is_ui_created
+        if is_constructed:
+            ControlRoom.delete_instance()
+            instance = ControlRoom()
+            ControlRoom.__instance = instance
+            if not instance.__is_ui_created:
+                return instance
+        instance.__show_stats = {"constructed": is_constructed, "dockable": dockable, "time_to_visible": None}
+        instance.__visible_start_time = start_time
+        if dockable:
+            # The height is given by the workspace control
+            instance.setMinimumHeight(0)
+            instance.setMaximumHeight(_MAX_WIDGET_SIZE)
+        instance.show(dockable=dockable)
+        instance.raise_()
+        instance.activateWindow()
+        # Measured once the window is painted on the next tick of the event loop
+        QTimer.singleShot(0, instance.__on_visible)
+        return instance
 
     @staticmethod
-    def create_override(obj_name, attr_name):
+    def delete_instance():
+        """
+        Delete the window kept between the launches (before a reload of the package for instance)
+        :return:
+        """
+        instance = ControlRoom.get_instance()
+        ControlRoom.__instance = None
+        if instance is not None:
+            instance.__kill_scene_jobs()
+            instance.hide()
+            instance.deleteLater()
+
+    # ################################################### Singleton ####################################################
+
+    @staticmethod
+    def create_override(obj_name, attr_name, layer=None):
         """
         Generic function that create an override for an attribute of an object
         :param obj_name:
         :param attr_name:
+        :param layer: visible layer if None
         :return: override
         """
-        visible_layer = render_setup.instance().getVisibleRenderLayer()
-        col = visible_layer.renderSettingsCollectionInstance()
-        return col.createAbsoluteOverride(obj_name, attr_name)
+        return OverrideIndex.get_instance().create(obj_name, attr_name, layer)
 
     @staticmethod
     def remove_override(override):
@@ -70,22 +156,53 @@ class ControlRoom(QDialog):
         :param override:
         :return:
         """
-        if override is not None:
-            maya_override.delete(override)
+        OverrideIndex.get_instance().remove(override)
 
     @staticmethod
-    def retrieve_override(obj_name, attr_name):
+    def retrieve_override(obj_name, attr_name, layer=None):
         """
         Generic function that retrieve an override for an attribute of an object
         :param obj_name:
         :param attr_name:
+        :param layer: visible layer if None
         :return: override
         """
-        visible_layer = render_setup.instance().getVisibleRenderLayer()
-        for override in render_setup_utils.getOverridesRecursive(visible_layer):
-            if override.typeName() == "absUniqueOverride" and obj_name == override.targetNodeName() and attr_name == override.attributeName():
-                return override
-        return None
+        return OverrideIndex.get_instance().retrieve(obj_name, attr_name, layer)
+
+    @staticmethod
+    def set_override_value(obj_name, attr_name, value, layer=None):
+        """
+        Generic function that set the value of an override for an attribute of an object (created if needed)
+        :param obj_name:
+        :param attr_name:
+        :param value:
+        :param layer: visible layer if None
+        :return: override
+        """
+        return OverrideIndex.get_instance().set_value(obj_name, attr_name, value, layer)
+
+    @staticmethod
+    def set_widget_state(widget, state):
+        """
+        Set the "state" property styled by the window stylesheet and re-polish the widget only if it changed
+        :param widget
+        :param state: "override", "preset", "preset-diff", "selected" or ""
+        :return: has changed
+        """
+        if widget.property("state") == state:
+            return False
+        widget.setProperty("state", state)
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+        return True
+
+    @staticmethod
+    def get_override_stats():
+        """
+        Getter of the statistics of the override index (hits, misses, builds...)
+        :return: stats
+        """
+        return OverrideIndex.get_instance().get_stats()
 
     def __init__(self, prnt=wrapInstance(int(omui.MQtUtil.mainWindow()), QWidget)):
         super(ControlRoom, self).__init__(prnt)
@@ -98,6 +215,10 @@ class ControlRoom(QDialog):
         asset_path = os.path.dirname(__file__) + "/assets"
 
         # Model attributes
+        # Overrides may have changed while no Control Room was observing them
+        OverrideIndex.get_instance().invalidate()
+        # Visible layer and its overrides shared by all the fields
+        self.__layer_context = LayerContext()
         self.__parts = [
             FeatureOverridesPart(self, "feature_overrides"),
             DepthOfFieldPart(self, "dof"),
@@ -108,9 +229,42 @@ class ControlRoom(QDialog):
         ]
         self.__preset_part = PresetsPart(self, asset_path, "assets")
         self.__hovered_preset = None
-        self.__new_scene_callback = None
+        # Scene jobs kept while the window exists (hidden or not) to rebind the model to the scenes opened
+        self.__scene_jobs = []
+        self.__layer_observer_added = False
+        # One attribute changed callback per watched node routing the plug changes to the fields
+        self.__callback_hub = CallbackHub()
+        self.__callbacks_added = False
+        self.__was_hidden = False
+        self.__dirty_tracker = DirtyTracker()
+        for part in self.__parts:
+            part.register_fields(self.__dirty_tracker)
+        self.__preset_part.register_fields(self.__dirty_tracker)
+        # Values of all the plugs the fields depend on, read in batch
+        self.__attribute_snapshot = AttributeSnapshot()
+        self.__attribute_snapshot.add_plugs(self.__dirty_tracker.get_plugs())
+        self.__refresh_scheduler = RefreshScheduler(self.__dirty_tracker)
+        # Rate limited writes of the dragged sliders
+        self.__write_pipeline = WritePipeline(self)
+        self.__nb_writes = 0
+        self.__nb_writes_elided = 0
+        self.__apply_preset_stats = None
+        # Preset previewed after the hover intent delay
+        self.__pending_hovered_preset = None
+        self.__hover_timer = QTimer(self)
+        self.__hover_timer.setSingleShot(True)
+        self.__hover_timer.setInterval(_HOVER_INTENT_DELAY_MS)
+        self.__hover_timer.timeout.connect(self.__on_hover_intent)
+        # Scene values in a preset form and differences of the presets with it by id of preset
+        self.__scene_preset = None
+        self.__preset_diffs = {}
+        # Whether the scene has been opened since the model was bound to it
+        self.__is_scene_stale = False
+        self.__visible_start_time = None
+        self.__show_stats = None
 
         # UI attributes
+        self.__ui_camera_set = None
         self.__ui_width = 550
         self.__ui_height = 780
         self.__ui_min_width = 550
@@ -118,18 +272,20 @@ class ControlRoom(QDialog):
 
         self.__retrieve_prefs()
 
-        # name the window
+        # name the window (the object name is the one of the workspace control when docked)
         self.setWindowTitle("Control Room")
+        self.setObjectName("ControlRoom")
         # make the window a "tool" in Maya's eyes so that it stays on top when you click off
         self.setWindowFlags(QtCore.Qt.Tool)
-        # Makes the object get deleted from memory, not just hidden, when it is closed.
-        self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        # The window is only hidden when it is closed to be shown again without being rebuilt
 
-        if ControlRoom.test_arnold_renderer():
+        self.__is_ui_created = ControlRoom.test_arnold_renderer()
+        if self.__is_ui_created:
             # Create the layout, linking it to actions and refresh the display
             self.__create_ui()
             self.__refresh_ui()
-            self.__add_callbacks()
+            self.__scene_jobs = [cmds.scriptJob(event=[event, self.on_new_scene])
+                                 for event in ("SceneOpened", "NewSceneOpened")]
         else:
             self.close()
 
@@ -139,7 +295,7 @@ class ControlRoom(QDialog):
         Test if Arnold is loaded and display a warning popup if it is not
         :return: is arnold renderer loaded
         """
-        arnold_renderer_loaded = pm.objExists("defaultArnoldRenderOptions")
+        arnold_renderer_loaded = SceneBackend.get_instance().exists("defaultArnoldRenderOptions")
         if not arnold_renderer_loaded:
             msg = QMessageBox()
             msg.setWindowTitle("Error Control Room with Arnold Renderer")
@@ -172,12 +328,30 @@ class ControlRoom(QDialog):
             pos = self.__prefs["window_pos"]
             self.__ui_pos = QPoint(pos["x"], pos["y"])
 
+    def showEvent(self, arg__1: QShowEvent) -> None:
+        """
+        Add callbacks and refresh the fields that may have changed while the window was hidden
+        :return:
+        """
+        if self.__is_ui_created and not self.__callbacks_added:
+            if self.__is_scene_stale:
+                PresetManager.get_instance().retrieve_presets()
+                if not self.__rebind_scene():
+                    QTimer.singleShot(0, self.hide)
+                    return
+            self.__add_callbacks()
+            if self.__was_hidden:
+                self.__on_render_layer_changed()
+
     def hideEvent(self, arg__1: QCloseEvent) -> None:
         """
         Remove callbacks and save preferences
         :return:
         """
-        self.__remove_callbacks()
+        self.__refresh_scheduler.cancel()
+        if self.__callbacks_added:
+            self.__remove_callbacks()
+            self.__was_hidden = True
         self.__save_prefs()
 
     def __create_ui(self):
@@ -186,6 +360,7 @@ class ControlRoom(QDialog):
         :return:
         """
         # Reinit attributes of the UI
+        self.setStyleSheet(_FIELDS_STYLESHEET)
         self.setMinimumWidth(self.__ui_min_width)
         self.setFixedHeight(self.__ui_height)
         self.resize(self.__ui_width, self.__ui_height)
@@ -202,6 +377,9 @@ class ControlRoom(QDialog):
         parts_lyt = QVBoxLayout()
         parts_lyt.setSpacing(5)
         parts_lyt.setAlignment(Qt.AlignTop)
+        # Cameras edited by the camera parts (a single row shared by all of them)
+        self.__ui_camera_set = CameraSetWidget()
+        parts_lyt.addWidget(self.__ui_camera_set)
         for part in self.__parts:
             parts_lyt.addLayout(part.create_ui())
         main_lyt.addLayout(parts_lyt)
@@ -214,19 +392,250 @@ class ControlRoom(QDialog):
         Refresh the ui according to the model attribute
         :return:
         """
+        self.__ui_camera_set.refresh()
         for part in self.__parts:
             part.refresh_ui()
         self.__preset_part.refresh_ui()
 
+    def request_hovered_preset(self, preset):
+        """
+        Preview a hovered preset once the mouse stays on it for the hover intent delay
+        :param preset
+        :return:
+        """
+        self.__pending_hovered_preset = preset
+        self.__hover_timer.start()
+
+    def __on_hover_intent(self):
+        """
+        On hover intent delay elapsed preview the pending hovered preset
+        :return:
+        """
+        if self.__pending_hovered_preset is not self.__hovered_preset:
+            self.set_hovered_preset(self.__pending_hovered_preset)
+
     def set_hovered_preset(self, preset):
         """
         Setter of the hovered preset
         :param preset
         :return:
         """
+        self.__hover_timer.stop()
+        self.__pending_hovered_preset = preset
+        self.__refresh_scheduler.request_preset(self.__hovered_preset)
         self.__hovered_preset = preset
-        for part in self.__parts:
-            part.refresh_ui()
+        self.__refresh_scheduler.request_preset(self.__hovered_preset)
+
+    def on_plug_changed(self, plug):
+        """
+        On a plug changed in the scene refresh only the fields depending on it
+        :param plug
+        :return:
+        """
+        self.__attribute_snapshot.invalidate(plug)
+        self.__invalidate_preset_diffs(self.__dirty_tracker.get_preset_keys_for_plug(plug))
+        self.__refresh_scheduler.request_plug(plug)
+
+    def __on_render_layer_changed(self):
+        """
+        On render layer changed resolve the new layer and its overrides once then refresh all the fields with it
+        (the values of the overridden plugs change so invalidate the cached values)
+        :return:
+        """
+        self.__layer_context = LayerContext()
+        self.__attribute_snapshot.invalidate_all()
+        self.__invalidate_preset_diffs()
+        self.__refresh_scheduler.request_all()
+
+    def __on_cameras_changed(self, cam):
+        """
+        On render camera or camera set changed the scene values of the camera fields change (the parts move to the
+        primary camera)
+        :param cam: primary camera
+        :return:
+        """
+        if self.__ui_camera_set is not None:
+            self.__ui_camera_set.refresh()
+        self.__invalidate_preset_diffs()
+        self.__refresh_scheduler.request_all()
+
+    def get_layer_context(self):
+        """
+        Getter of the context of the visible layer
+        :return: layer context
+        """
+        return self.__layer_context
+
+    def get_attr(self, plug):
+        """
+        Getter of the value of a plug from the attribute snapshot
+        :param plug
+        :return: value
+        """
+        return self.__attribute_snapshot.get(plug)
+
+    def set_attr(self, plug, value, undoable=True):
+        """
+        Set the value of a plug through the scene backend unless the plug already has this value
+        :param plug
+        :param value
+        :param undoable: whether the change is recorded in the undo queue
+        :return: whether the value has been written
+        """
+        if not values_differ(self.__get_current_value(plug), value):
+            # No-op write : it would still dirty the DG, fire callbacks and add an undo entry
+            self.__nb_writes_elided += 1
+            return False
+        if undoable:
+            SceneBackend.get_instance().set(plug, value)
+        else:
+            SceneBackend.get_instance().set_without_undo(plug, value)
+        self.__nb_writes += 1
+        self.__attribute_snapshot.invalidate(plug)
+        return True
+
+    def set_attrs(self, plugs, value, chunk_name="controlRoomSetAttrs"):
+        """
+        Set the same value on several plugs as a single undoable change (the plugs already having the value are
+        skipped)
+        :param plugs
+        :param value
+        :param chunk_name: name of the undo chunk
+        :return: number of plugs written
+        """
+        nb_written = 0
+        scene_backend = SceneBackend.get_instance()
+        scene_backend.open_undo_chunk(chunk_name)
+        try:
+            for plug in plugs:
+                if self.set_attr(plug, value):
+                    nb_written += 1
+        finally:
+            scene_backend.close_undo_chunk()
+        return nb_written
+
+    def __get_current_value(self, plug):
+        """
+        Getter of the current value of a plug to compare with a value to write. The cached value is only trusted when
+        the changes of the plug are watched, otherwise the value is read from the scene
+        :param plug
+        :return: value or None if it can't be read
+        """
+        try:
+            if self.__callback_hub.is_watched(plug):
+                return self.get_attr(plug)
+            return SceneBackend.get_instance().get(plug)
+        except:
+            return None
+
+    def get_write_stats(self):
+        """
+        Getter of the statistics of the writes
+        :return: stats (plugs written and writes elided because the plug already had the value)
+        """
+        return {
+            "written": self.__nb_writes,
+            "elided": self.__nb_writes_elided,
+        }
+
+    def invalidate_attr(self, plug=None):
+        """
+        Invalidate the cached value of a plug (or of all plugs if None) after writing it
+        :param plug
+        :return:
+        """
+        if plug is None:
+            self.__attribute_snapshot.invalidate_all()
+        else:
+            self.__attribute_snapshot.invalidate(plug)
+
+    def get_write_pipeline(self):
+        """
+        Getter of the write pipeline of the dragged sliders
+        :return: write pipeline
+        """
+        return self.__write_pipeline
+
+    def get_callback_hub(self):
+        """
+        Getter of the callback hub
+        :return: callback hub
+        """
+        return self.__callback_hub
+
+    def get_attribute_snapshot_stats(self):
+        """
+        Getter of the statistics of the attribute snapshot
+        :return: stats
+        """
+        return self.__attribute_snapshot.get_stats()
+
+    def request_refresh(self, refresher):
+        """
+        Request a refresh function to be called on the next flush of the refresh scheduler
+        :param refresher
+        :return:
+        """
+        self.__refresh_scheduler.request(refresher)
+
+    def get_refresh_stats(self):
+        """
+        Getter of the statistics of the last flushes of the refresh scheduler
+        :return: stats
+        """
+        return self.__refresh_scheduler.get_stats()
+
+    def __invalidate_preset_diffs(self, preset_keys=None):
+        """
+        Invalidate the differences of the presets containing some keys (all the presets if None)
+        :param preset_keys
+        :return:
+        """
+        self.__scene_preset = None
+        if preset_keys is None:
+            self.__preset_diffs.clear()
+            return
+        for preset_id, (preset, diff) in list(self.__preset_diffs.items()):
+            for part_name, key in preset_keys:
+                if preset.contains(part_name, key):
+                    del self.__preset_diffs[preset_id]
+                    break
+
+    def get_scene_preset(self):
+        """
+        Getter of the scene values in the form of a preset (computed once)
+        :return: scene preset
+        """
+        if self.__scene_preset is None:
+            self.__scene_preset = Preset(name="scene")
+            for part in self.__parts:
+                part.add_to_preset(self.__scene_preset)
+        return self.__scene_preset
+
+    def get_preset_diff(self, preset):
+        """
+        Getter of the differences between a preset and the scene (computed once and cached)
+        :param preset
+        :return: dict of (part_name, key) -> differs
+        """
+        preset_id = id(preset)
+        if preset_id in self.__preset_diffs:
+            return self.__preset_diffs[preset_id][1]
+        scene_preset = self.get_scene_preset()
+        diff = {}
+        for part_name, fields in preset.items():
+            for key, value in fields.items():
+                if scene_preset.contains(part_name, key):
+                    diff[(part_name, key)] = values_differ(value, scene_preset.get(part_name, key))
+        self.__preset_diffs[preset_id] = (preset, diff)
+        return diff
+
+    def refresh_dirty(self):
+        """
+        Refresh now the fields marked dirty
+        :return:
+        """
+        self.__refresh_scheduler.flush()
 
     def get_hovered_preset(self):
         """
@@ -235,43 +644,126 @@ class ControlRoom(QDialog):
         """
         return self.__hovered_preset
 
-    def get_stylesheet_color_for_field(self, part_name, field_name, val, override=None):
+    def get_field_state(self, part_name, field_name, val, override=None):
         """
-        Get the right color for a filed according to the state of the hovered preset and the value
+        Get the state of a field according to the hovered preset, the value and the override
         :param part_name
         :param field_name
         :param val
         :param override
-        :return:
+        :return: "preset-diff", "preset", "override" or ""
         """
         if self.__hovered_preset and self.__hovered_preset.contains(part_name, field_name):
-            if self.__hovered_preset.get(part_name, field_name) != val:
-                ss_color = "color:" + cr.PRESET_CONTAINS_AND_DIFFERENT_LABEL_COLOR
+            diff = self.get_preset_diff(self.__hovered_preset)
+            if (part_name, field_name) in diff:
+                is_different = diff[(part_name, field_name)]
+            else:
+                is_different = values_differ(self.__hovered_preset.get(part_name, field_name), val)
+            if is_different:
+                state = "preset-diff"
             else:
-                ss_color = "color:" + cr.PRESET_CONTAINS_LABEL_COLOR
+                state = "preset"
         elif override is not None:
-            ss_color = "color:" + cr.OVERRIDE_LABEL_COLOR
+            state = "override"
         else:
-            ss_color = ""
-        return ss_color
+            state = ""
+        return state
 
     def on_new_scene(self):
         """
-        On new scene hide and close the control room
+        On new scene rebind the model to it once back in the event loop (the window is kept)
+        :return:
+        """
+        self.__is_scene_stale = True
+        PresetManager.get_instance().invalidate_presets()
+        QTimer.singleShot(0, self.__on_scene_stale)
+
+    def __on_scene_stale(self):
+        """
+        Rebind the model to the scene opened if the window is shown (else it is done when the window is shown again)
+        :return:
+        """
+        if not self.__is_scene_stale or not self.isVisible():
+            return
+        # The presets of the new scene are retrieved before the callbacks are removed so that the changes not saved
+        # of the previous scene are not flushed in the new one
+        PresetManager.get_instance().retrieve_presets()
+        if self.__callbacks_added:
+            self.__remove_callbacks()
+        if not self.__rebind_scene():
+            self.hide()
+            return
+        self.__add_callbacks()
+        self.__on_render_layer_changed()
+
+    def __rebind_scene(self):
+        """
+        Drop everything bound to the previous scene (the nodes resolved, the overrides, the values and the hovered
+        preset)
+        :return: whether Arnold is loaded in the new scene
+        """
+        self.__is_scene_stale = False
+        SceneBackend.get_instance().clear_cache()
+        OverrideIndex.get_instance().invalidate()
+        SceneContext.get_instance().invalidate()
+        self.__attribute_snapshot.invalidate_all()
+        self.__invalidate_preset_diffs()
+        self.set_hovered_preset(None)
+        if not ControlRoom.test_arnold_renderer():
+            return False
+        # The parts read again the state they cached from the previous scene
+        for part in self.__parts:
+            part.rebind()
+        self.__preset_part.rebind()
+        return True
+
+    def __kill_scene_jobs(self):
+        """
+        Kill the scene jobs (when the window is replaced by a new one)
+        :return:
+        """
+        for scene_job in self.__scene_jobs:
+            try:
+                cmds.scriptJob(kill=scene_job)
+            except:
+                pass
+        self.__scene_jobs = []
+
+    def __on_visible(self):
+        """
+        On the window painted after show_instance record its time to visible
         :return:
         """
-        self.hide()
-        self.close()
+        if self.__visible_start_time is None:
+            return
+        self.__show_stats["time_to_visible"] = time.perf_counter() - self.__visible_start_time
+        self.__visible_start_time = None
+
+    def get_show_stats(self):
+        """
+        Getter of the statistics of the last show_instance (constructed or not, dockable and time to visible in
+        seconds)
+        :return: stats
+        """
+        return self.__show_stats
 
     def __add_callbacks(self):
         """
         Add the callbacks of all parts
         :return:
         """
-        self.__new_scene_callback = pm.scriptJob(runOnce=True, event=["SceneOpened", self.on_new_scene])
+        render_setup.instance().addActiveLayerObserver(self.__on_render_layer_changed)
+        self.__layer_observer_added = True
+        OverrideIndex.get_instance().add_callbacks()
+        # The cameras are indexed before the parts look for the render camera
+        scene_context = SceneContext.get_instance()
+        scene_context.add_callbacks()
+        scene_context.subscribe(self.__on_cameras_changed)
         for part in self.__parts:
             part.add_callbacks()
         self.__preset_part.add_callbacks()
+        self.__callback_hub.add_callbacks()
+        self.__callbacks_added = True
 
     def __remove_callbacks(self):
         """
@@ -281,6 +773,105 @@ class ControlRoom(QDialog):
         for part in self.__parts:
             part.remove_callbacks()
         self.__preset_part.remove_callbacks()
+        if self.__layer_observer_added:
+            try:
+                render_setup.instance().removeActiveLayerObserver(self.__on_render_layer_changed)
+            except:
+                pass
+            self.__layer_observer_added = False
+        OverrideIndex.get_instance().remove_callbacks()
+        scene_context = SceneContext.get_instance()
+        scene_context.unsubscribe(self.__on_cameras_changed)
+        scene_context.remove_callbacks()
+        self.__callback_hub.remove_callbacks()
+        self.__callbacks_added = False
+
+    def get_fields(self):
+        """
+        Getter of the fields of all the parts stored on a plug
+        :return: list of (part_name, key in the preset, plug)
+        """
+        fields = []
+        for part in self.__parts:
+            fields.extend(part.get_fields())
+        return fields
+
+    @staticmethod
+    def is_overridable(plug):
+        """
+        Getter of whether a plug can be overridden in the render settings collection of a layer (the camera
+        attributes can't)
+        :param plug
+        :return: is overridable
+        """
+        return not SceneContext.get_instance().is_camera(plug.split(".", 1)[0])
+
+    def edit_layer_overrides(self, edits):
+        """
+        Create, update or remove render settings overrides in any layers in one batch without switching the visible
+        layer : the writes are in a single undo chunk and the fields are refreshed once at the end, only if the
+        visible layer has been edited
+        :param edits: list of (layer name, plug, value) with a value None to remove the override
+        :return: stats (overrides set, overrides removed, edits skipped, layers edited and time spent in seconds)
+        """
+        start_time = time.perf_counter()
+        render_setup_instance = render_setup.instance()
+        override_index = OverrideIndex.get_instance()
+        # Layers resolved once by name (the default layer isn't listed as it can't have overrides)
+        layers_by_name = {layer.name(): layer for layer in render_setup_instance.getRenderLayers()}
+        default_layer_name = render_setup_instance.getDefaultRenderLayer().name()
+        layer_names_edited = set()
+        nb_set = 0
+        nb_removed = 0
+        nb_skipped = 0
+        scene_backend = SceneBackend.get_instance()
+        self.__callback_hub.suspend()
+        scene_backend.open_undo_chunk("controlRoomEditLayerOverrides")
+        try:
+            for layer_name, plug, value in edits:
+                layer = layers_by_name.get(layer_name)
+                if layer is None or layer_name == default_layer_name or not self.is_overridable(plug):
+                    # Layer deleted since the edit was requested or default layer
+                    nb_skipped += 1
+                    continue
+                layer_names_edited.add(layer_name)
+                obj_name, attr_name = plug.split(".", 1)
+                if value is None:
+                    override = override_index.retrieve(obj_name, attr_name, layer)
+                    if override is not None:
+                        override_index.remove(override)
+                        nb_removed += 1
+                else:
+                    override_index.set_value(obj_name, attr_name, value, layer)
+                    nb_set += 1
+        finally:
+            scene_backend.close_undo_chunk()
+            self.__callback_hub.resume()
+        if render_setup_instance.getVisibleRenderLayer().name() in layer_names_edited:
+            self.__on_render_layer_changed()
+            self.__refresh_scheduler.flush()
+        return {
+            "overrides_set": nb_set,
+            "overrides_removed": nb_removed,
+            "skipped": nb_skipped,
+            "layers": len(layer_names_edited),
+            "time": time.perf_counter() - start_time,
+        }
+
+    def apply_preset_to_layers(self, preset, layer_names):
+        """
+        Apply a preset to several layers as overrides in one batch (only the fields stored on a plug that can be
+        overridden)
+        :param preset
+        :param layer_names
+        :return: stats (see edit_layer_overrides)
+        """
+        edits = []
+        for part_name, key, plug in self.get_fields():
+            if preset.contains(part_name, key) and self.is_overridable(plug):
+                value = preset.get(part_name, key)
+                edits.extend((layer_name, plug, value) for layer_name in layer_names)
+        return self.edit_layer_overrides(edits)
 
     def generate_preset(self, preset_name):
         """
@@ -300,11 +891,40 @@ class ControlRoom(QDialog):
 
     def apply_preset(self, preset):
         """
-        Apply a preset to all parts
+        Apply a preset to all parts in one transaction : the plug changes are not dispatched while applying, all the
+        writes are in a single undo chunk and the UI is refreshed once at the end
         :param preset:
-        :return:
+        :return: stats (plugs written, writes elided, plug changes ignored and time spent in seconds)
+        """
+        start_time = time.perf_counter()
+        nb_writes_start = self.__nb_writes
+        nb_writes_elided_start = self.__nb_writes_elided
+        scene_backend = SceneBackend.get_instance()
+        self.__callback_hub.suspend()
+        scene_backend.open_undo_chunk("controlRoomApplyPreset")
+        try:
+            for part in self.__parts:
+                part.apply(preset)
+            self.__preset_part.apply(preset)
+        finally:
+            scene_backend.close_undo_chunk()
+            nb_ignored = self.__callback_hub.resume()
+        self.__attribute_snapshot.invalidate_all()
+        self.__invalidate_preset_diffs()
+        self.__refresh_scheduler.request_all()
+        self.__refresh_scheduler.flush()
+        self.__preset_part.refresh_ui()
+        self.__apply_preset_stats = {
+            "plugs_written": self.__nb_writes - nb_writes_start,
+            "writes_elided": self.__nb_writes_elided - nb_writes_elided_start,
+            "changes_ignored": nb_ignored,
+            "time": time.perf_counter() - start_time,
+        }
+        return self.__apply_preset_stats
+
+    def get_apply_preset_stats(self):
         """
-        for part in self.__parts:
-            part.apply(preset)
-        self.__preset_part.apply(preset)
-        self.__refresh_ui()
+        Getter of the statistics of the last preset applied
+        :return: stats (plugs written, writes elided, plug changes ignored and time spent in seconds) or None
+        """
+        return self.__apply_preset_stats
@@ -58,6 +58,14 @@ class ControlRoomPart(ABC):
         """
         pass
 
+    def register_fields(self, dirty_tracker):
+        """
+        Register the refresh functions of the part with the plugs and preset keys they depend on
+        :param dirty_tracker
+        :return:
+        """
+        pass
+
     @abstractmethod
     def add_callbacks(self):
         """
@@ -74,6 +82,20 @@ class ControlRoomPart(ABC):
         """
         pass
 
+    def rebind(self):
+        """
+        Read again the scene state cached by the part when the window is bound to a new scene
+        :return:
+        """
+        pass
+
+    def get_fields(self):
+        """
+        Getter of the fields of the part stored on a plug (the fields computed from several plugs are not listed)
+        :return: list of (part_name, key in the preset, plug)
+        """
+        return []
+
     @abstractmethod
     def add_to_preset(self, preset):
         """
@@ -0,0 +1,89 @@
+import json
+import os
+
+from common.utils import *
+from .Preset import *
+
+
+class DefaultPresetLibrary:
+    def __init__(self, directories):
+        """
+        Constructor
+        :param directories: directories walked recursively for the preset files
+        """
+        self.__directories = directories
+        # Compiled presets by path with the mtime and the size of their file : (mtime, size, preset)
+        self.__cache = {}
+        self.__nb_parsed = 0
+
+    def __list_files(self):
+        """
+        List the preset files of the directories and their subdirectories
+        :return: list of (path, mtime, size) in the order of the library
+        """
+        files = []
+        for directory in self.__directories:
+            if not os.path.isdir(directory):
+                continue
+            for dir_path, dir_names, file_names in os.walk(directory):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    if file_name.startswith("."):
+                        continue
+                    path = os.path.join(dir_path, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((path, stat.st_mtime_ns, stat.st_size))
+        return files
+
+    def __compile(self, path):
+        """
+        Parse a preset file
+        :param path
+        :return: preset or None if the file is not a valid preset
+        """
+        self.__nb_parsed += 1
+        try:
+            with open(path, "r") as f:
+                return Preset.create_from_existant(json.load(f))
+        except:
+            print_warning("Error while trying to parse a default preset : " + path)
+            return None
+
+    def scan(self):
+        """
+        Scan the library : only the files added or modified since the last scan are parsed
+        :return: presets, whether the library changed
+        """
+        changed = False
+        new_cache = {}
+        for path, mtime, size in self.__list_files():
+            cached = self.__cache.get(path)
+            if cached is not None and cached[0] == mtime and cached[1] == size:
+                new_cache[path] = cached
+            else:
+                new_cache[path] = (mtime, size, self.__compile(path))
+                changed = True
+        if len(new_cache.keys() - self.__cache.keys()) > 0 or len(self.__cache.keys() - new_cache.keys()) > 0:
+            changed = True
+        self.__cache = new_cache
+        presets = []
+        names = set()
+        for path, (mtime, size, preset) in new_cache.items():
+            if preset is None:
+                continue
+            if preset.get_name() in names:
+                print_warning("A default preset named " + preset.get_name() + " already exists : " + path)
+                continue
+            names.add(preset.get_name())
+            presets.append(preset)
+        return presets, changed
+
+    def get_nb_parsed(self):
+        """
+        Getter of the number of files parsed since the creation of the library
+        :return: number of files parsed
+        """
+        return self.__nb_parsed
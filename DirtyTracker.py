@@ -0,0 +1,143 @@
+class DirtyTracker:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Refresh functions by plug ("node.attribute") and by preset key (part_name, key)
+        self.__refreshers_by_plug = {}
+        self.__refreshers_by_preset_key = {}
+        self.__refreshers = {}
+        # Dict used as an ordered set
+        self.__dirty = {}
+
+    def register(self, refresher, plugs=None, preset_keys=None):
+        """
+        Register a refresh function with the plugs and the preset keys it depends on
+        :param refresher
+        :param plugs
+        :param preset_keys: list of (part_name, key)
+        :return:
+        """
+        plugs = [] if plugs is None else plugs
+        preset_keys = [] if preset_keys is None else preset_keys
+        self.__refreshers[refresher] = (list(plugs), list(preset_keys))
+        for plug in plugs:
+            self.__refreshers_by_plug.setdefault(plug, {})[refresher] = None
+        for preset_key in preset_keys:
+            self.__refreshers_by_preset_key.setdefault(preset_key, {})[refresher] = None
+
+    def unregister(self, refresher):
+        """
+        Unregister a refresh function
+        :param refresher
+        :return:
+        """
+        if refresher not in self.__refreshers:
+            return
+        plugs, preset_keys = self.__refreshers.pop(refresher)
+        for plug in plugs:
+            self.__refreshers_by_plug.get(plug, {}).pop(refresher, None)
+        for preset_key in preset_keys:
+            self.__refreshers_by_preset_key.get(preset_key, {}).pop(refresher, None)
+        self.__dirty.pop(refresher, None)
+
+    def clear(self):
+        """
+        Unregister all the refresh functions
+        :return:
+        """
+        self.__refreshers_by_plug.clear()
+        self.__refreshers_by_preset_key.clear()
+        self.__refreshers.clear()
+        self.__dirty.clear()
+
+    def mark(self, refresher):
+        """
+        Mark dirty a refresh function
+        :param refresher
+        :return: number of refresh functions marked
+        """
+        self.__dirty[refresher] = None
+        return 1
+
+    def mark_plug(self, plug):
+        """
+        Mark dirty the refresh functions depending on a plug
+        :param plug
+        :return: number of refresh functions marked
+        """
+        refreshers = self.__refreshers_by_plug.get(plug, {})
+        self.__dirty.update(refreshers)
+        return len(refreshers)
+
+    def mark_preset_key(self, part_name, key):
+        """
+        Mark dirty the refresh functions depending on a preset key
+        :param part_name
+        :param key
+        :return: number of refresh functions marked
+        """
+        refreshers = self.__refreshers_by_preset_key.get((part_name, key), {})
+        self.__dirty.update(refreshers)
+        return len(refreshers)
+
+    def mark_preset(self, preset):
+        """
+        Mark dirty the refresh functions depending on any key of a preset
+        :param preset
+        :return: number of refresh functions marked
+        """
+        nb_marked = 0
+        if preset is None:
+            return nb_marked
+        for part_name, fields in preset.items():
+            for key in fields.keys():
+                nb_marked += self.mark_preset_key(part_name, key)
+        return nb_marked
+
+    def mark_all(self):
+        """
+        Mark dirty all the refresh functions
+        :return: number of refresh functions marked
+        """
+        self.__dirty.update(dict.fromkeys(self.__refreshers))
+        return len(self.__refreshers)
+
+    def has_dirty(self):
+        """
+        Getter of whether some refresh functions are dirty
+        :return: has dirty
+        """
+        return len(self.__dirty) > 0
+
+    def get_plugs(self):
+        """
+        Getter of all the plugs registered
+        :return: plugs
+        """
+        return list(self.__refreshers_by_plug.keys())
+
+    def get_preset_keys_for_plug(self, plug):
+        """
+        Getter of the preset keys of the refresh functions depending on a plug
+        :param plug
+        :return: preset keys
+        """
+        preset_keys = []
+        for refresher in self.__refreshers_by_plug.get(plug, {}):
+            preset_keys.extend(self.__refreshers[refresher][1])
+        return preset_keys
+
+    def refresh_dirty(self):
+        """
+        Call the dirty refresh functions only
+        :return: number of refresh functions called
+        """
+        dirty = list(self.__dirty.keys())
+        self.__dirty.clear()
+        for refresher in dirty:
+            try:
+                refresher()
+            except:
+                pass
+        return len(dirty)
@@ -1,4 +1,5 @@
 from enum import Enum
+from functools import partial
 import maya.OpenMaya as OpenMaya
 
 from PySide2 import QtCore
@@ -8,7 +9,7 @@ from PySide2.QtWidgets import *
 from PySide2.QtCore import *
 from PySide2.QtGui import *
 
-import pymel.core as pm
+import maya.cmds as cmds
 from common.utils import *
 
 from .ControlRoom import *
@@ -46,8 +47,6 @@ class FormSlider:
         self.__max = max
         self.__mmax = mmax if mmax is not None else max
         self.__mult = 1000 if self.__type == FormSliderType.FloatSlider else 1
-        self.__callback = None
-        self.__layer_callback = None
         self.__override = None
         self.__action_add_override = QAction(text="Add Override")
         self.__action_add_override.triggered.connect(self.__create_override)
@@ -83,7 +82,7 @@ class FormSlider:
         :return:
         """
         obj_attr = self.__field_name.split(".")
-        self.__override = cr.ControlRoom.retrieve_override(obj_attr[0], obj_attr[1])
+        self.__override = self.__control_room.get_layer_context().get_override(obj_attr[0], obj_attr[1])
 
     def __on_slider_value_changed(self, value):
         """
@@ -91,13 +90,36 @@ class FormSlider:
         :param value:
         :return:
         """
-        if self.__type is FormSliderType.IntSlider:
-            value = int(value)
-        else:
-            value = value / self.__mult
+        value = self.__slider_to_value(value)
         self.__ui_value_line_edit.setText(str(value))
         if not self.__preset_hovered:
-            pm.setAttr(self.__field_name, value)
+            # Rate limited during a drag, written right away otherwise
+            self.__control_room.get_write_pipeline().update(self.__field_name, value)
+
+    def __on_slider_pressed(self):
+        """
+        On slider pressed begin the drag of the field
+        :return:
+        """
+        self.__control_room.get_write_pipeline().begin(self.__field_name)
+
+    def __on_slider_released(self):
+        """
+        On slider released commit the final value as a single undoable change
+        :return:
+        """
+        self.__control_room.get_write_pipeline().commit(
+            self.__field_name, self.__slider_to_value(self.__ui_slider.value()))
+
+    def __slider_to_value(self, value):
+        """
+        Convert a value of the slider to a value of the field
+        :param value
+        :return: value
+        """
+        if self.__type is FormSliderType.IntSlider:
+            return int(value)
+        return value / self.__mult
 
     #
     def __on_edit_value_changed(self):
@@ -109,7 +131,7 @@ class FormSlider:
         value = float(str_value)
         self.__ui_slider.setValue(value)
         if not self.__preset_hovered:
-            pm.setAttr(self.__field_name, value)
+            self.__control_room.set_attr(self.__field_name, value)
 
     def generate_ui(self):
         """
@@ -146,6 +168,8 @@ class FormSlider:
         self.__ui_slider.setMaximum(self.__max * self.__mult)
         self.__ui_slider.setMinimum(self.__min * self.__mult)
         self.__ui_slider.valueChanged.connect(self.__on_slider_value_changed)
+        self.__ui_slider.sliderPressed.connect(self.__on_slider_pressed)
+        self.__ui_slider.sliderReleased.connect(self.__on_slider_released)
         self.__ui_slider.setContextMenuPolicy(Qt.ActionsContextMenu)
         self.__ui_slider.addAction(self.__action_add_override)
         self.__ui_slider.addAction(self.__action_remove_override)
@@ -160,7 +184,10 @@ class FormSlider:
         :return:
         """
         try:
-            val = pm.getAttr(self.__field_name)
+            if self.__ui_slider.isSliderDown():
+                # The slider is being dragged : it drives the value
+                return
+            val = self.__control_room.get_attr(self.__field_name)
             if val >= self.__max:
                 self.__ui_slider.setMaximum(val * self.__mult)
 
@@ -169,41 +196,55 @@ class FormSlider:
                 self.__preset_hovered = True
                 val_displayed = hovered_preset.get(self.__part_name, self.__key_preset)
                 self.__ui_slider.setValue(val_displayed * self.__mult)
-                self.__ui_value_line_edit.setText(str(round(val_displayed,3)))
+                self.__set_text(str(round(val_displayed,3)))
                 self.__preset_hovered = False
             else:
                 self.__ui_slider.setValue(val * self.__mult)
-                self.__ui_value_line_edit.setText(str(round(val,3)))
+                self.__set_text(str(round(val,3)))
 
-            visible_layer = render_setup.instance().getVisibleRenderLayer()
-            is_default_layer = visible_layer.name() == "defaultRenderLayer"
+            self.__retrieve_override()
+            is_default_layer = self.__control_room.get_layer_context().is_default()
             self.__action_add_override.setEnabled(not is_default_layer and self.__override is None)
             self.__action_remove_override.setEnabled(not is_default_layer and self.__override is not None)
 
-            stylesheet_bg = "background-color:" + cr.OVERRIDE_BG_COLOR if self.__override is not None else ""
-            stylesheet_lbl = self.__control_room.get_stylesheet_color_for_field(
+            state = self.__control_room.get_field_state(
                 self.__part_name, self.__key_preset, val, self.__override)
-            self.__ui_background_widget.setStyleSheet("QWidget#widget_form_slider{" + stylesheet_bg + "}")
-            self.__ui_lbl_widget.setStyleSheet("QLabel{" + stylesheet_lbl + "}")
-            self.__retrieve_override()
+            self.__control_room.set_widget_state(self.__ui_background_widget,
+                                                 "override" if self.__override is not None else "")
+            self.__control_room.set_widget_state(self.__ui_lbl_widget, state)
         except:
             pass
 
+    def __set_text(self, text):
+        """
+        Set the text of the line edit if it changed
+        :param text
+        :return:
+        """
+        if self.__ui_value_line_edit.text() != text:
+            self.__ui_value_line_edit.setText(text)
+
+    def register_fields(self, dirty_tracker):
+        """
+        Register the refresh of the slider with its plug and its preset key
+        :param dirty_tracker
+        :return:
+        """
+        dirty_tracker.register(self.refresh_ui, [self.__field_name], [(self.__part_name, self.__key_preset)])
+
     def add_callbacks(self):
         """
         Add callbacks
         :return:
         """
-        self.__callback = pm.scriptJob(attributeChange=[self.__field_name, self.refresh_ui])
-        self.__layer_callback = pm.scriptJob(event=["renderLayerManagerChange", self.refresh_ui])
+        self.__control_room.get_callback_hub().subscribe(self.__field_name, self.__control_room.on_plug_changed)
 
     def remove_callbacks(self):
         """
         remove callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__callback)
-        pm.scriptJob(kill=self.__layer_callback)
+        self.__control_room.get_callback_hub().unsubscribe(self.__field_name, self.__control_room.on_plug_changed)
 
     def get_key_preset_and_field(self):
         """
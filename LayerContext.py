@@ -0,0 +1,56 @@
+import maya.app.renderSetup.model.renderSetup as render_setup
+
+from .OverrideIndex import *
+
+_DEFAULT_LAYER_NAME = "defaultRenderLayer"
+
+
+class LayerContext:
+    def __init__(self, layer=None):
+        """
+        Constructor : resolve the layer and index its overrides once
+        :param layer: visible layer if None
+        """
+        if layer is None:
+            layer = render_setup.instance().getVisibleRenderLayer()
+        self.__layer = layer
+        self.__name = layer.name()
+        self.__is_default = self.__name == _DEFAULT_LAYER_NAME
+        self.__nb_overrides = OverrideIndex.get_instance().index_layer(layer)
+
+    def get_layer(self):
+        """
+        Getter of the layer
+        :return: layer
+        """
+        return self.__layer
+
+    def get_name(self):
+        """
+        Getter of the name of the layer
+        :return: name
+        """
+        return self.__name
+
+    def is_default(self):
+        """
+        Getter of whether the layer is the default render layer (where overrides can't be created)
+        :return: is default layer
+        """
+        return self.__is_default
+
+    def get_nb_overrides(self):
+        """
+        Getter of the number of overrides indexed when the context was resolved
+        :return: number of overrides
+        """
+        return self.__nb_overrides
+
+    def get_override(self, obj_name, attr_name):
+        """
+        Getter of the override for an attribute of an object in the layer
+        :param obj_name
+        :param attr_name
+        :return: override
+        """
+        return OverrideIndex.get_instance().retrieve(obj_name, attr_name, self.__layer)
@@ -0,0 +1,556 @@
+import csv
+import json
+import time
+from functools import partial
+
+import maya.OpenMayaUI as omui
+import maya.app.renderSetup.model.renderSetup as render_setup
+
+from PySide2 import QtCore
+from PySide2.QtWidgets import *
+from PySide2.QtCore import *
+from PySide2.QtGui import *
+
+from shiboken2 import wrapInstance
+
+from common.utils import *
+
+import control_room.ControlRoom as cr
+
+from .OverrideIndex import *
+from .PresetManager import *
+from .backends.SceneBackend import *
+
+_DIFFERENT_FG_COLOR = "#35C8DF"
+_UNRESOLVED_FG_COLOR = "#707070"
+_VISIBLE_LAYER_SUFFIX = " (visible)"
+_UNRESOLVED_TOOLTIP = "Overridden in the visible layer : the value outside the overrides is only known from a layer " \
+                      "that doesn't override it"
+
+
+def _format_value(value):
+    """
+    Format a field value for a cell or a CSV export
+    :param value
+    :return: text
+    """
+    if value is None:
+        return "?"
+    if type(value) is float:
+        return str(round(value, 3))
+    if type(value) in (list, tuple):
+        return ", ".join(_format_value(elem) for elem in value)
+    return str(value)
+
+
+class LayerMatrix:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Fields as (part_name, key in the preset, plug)
+        self.__fields = []
+        # Names of the layers (the default layer first) and name of the visible one
+        self.__layer_names = []
+        self.__visible_layer_name = None
+        # Cells by layer then by field : (value or None if unresolved, is overridden)
+        self.__cells = []
+        self.__time = 0
+
+    def compute(self, fields):
+        """
+        Resolve the effective value of every field in every render layer in one pass, without switching the visible
+        layer : the scene values are read in one batch and the absolute overrides of each layer are indexed in one
+        traversal. A field not overridden in a layer has the value outside the overrides
+        :param fields: list of (part_name, key in the preset, plug)
+        :return:
+        """
+        start_time = time.perf_counter()
+        render_setup_instance = render_setup.instance()
+        layers = [render_setup_instance.getDefaultRenderLayer()] + list(render_setup_instance.getRenderLayers())
+        visible_layer_name = render_setup_instance.getVisibleRenderLayer().name()
+        scene_values = SceneBackend.get_instance().get_many([plug for _, _, plug in fields])
+        override_index = OverrideIndex.get_instance()
+        overrides_by_layer = []
+        visible_overrides = {}
+        for layer in layers:
+            overrides = override_index.get_overrides(layer)
+            overrides_by_layer.append(overrides)
+            if layer.name() == visible_layer_name:
+                visible_overrides = overrides
+        # Values outside the overrides : the scene values unless an enabled override of the visible layer applies
+        base_values = []
+        for _, _, plug in fields:
+            override = visible_overrides.get(tuple(plug.split(".", 1)))
+            base_values.append(None if override is not None and override.isEnabled() else scene_values.get(plug))
+        cells = []
+        for layer, overrides in zip(layers, overrides_by_layer):
+            is_visible = layer.name() == visible_layer_name
+            row = []
+            for (_, _, plug), base_value in zip(fields, base_values):
+                override = overrides.get(tuple(plug.split(".", 1)))
+                if override is not None and override.isEnabled():
+                    row.append((scene_values.get(plug) if is_visible else override.getAttrValue(), True))
+                elif is_visible:
+                    row.append((scene_values.get(plug), False))
+                else:
+                    row.append((base_value, False))
+            cells.append(row)
+        self.__fields = list(fields)
+        self.__layer_names = [layer.name() for layer in layers]
+        self.__visible_layer_name = visible_layer_name
+        self.__cells = cells
+        self.__time = time.perf_counter() - start_time
+
+    def get_fields(self):
+        """
+        Getter of the fields
+        :return: list of (part_name, key in the preset, plug)
+        """
+        return self.__fields
+
+    def get_layer_names(self):
+        """
+        Getter of the names of the layers
+        :return: names
+        """
+        return self.__layer_names
+
+    def get_visible_layer_name(self):
+        """
+        Getter of the name of the visible layer when the matrix was computed
+        :return: name
+        """
+        return self.__visible_layer_name
+
+    def get_cell(self, row, column):
+        """
+        Getter of the value of a field in a layer
+        :param row: layer
+        :param column: field
+        :return: value or None if unresolved, is overridden
+        """
+        return self.__cells[row][column]
+
+    def get_layer_name(self, row):
+        """
+        Getter of the name of the layer of a row
+        :param row
+        :return: name
+        """
+        return self.__layer_names[row]
+
+    @staticmethod
+    def is_default_layer(row):
+        """
+        Getter of whether the layer of a row is the default layer (where overrides can't be created)
+        :param row
+        :return: is default layer
+        """
+        return row == 0
+
+    def is_column_different(self, column):
+        """
+        Getter of whether the values of a field are not the same in all the layers
+        :param column
+        :return: is different
+        """
+        values = [row[column][0] for row in self.__cells]
+        return any(value != values[0] for value in values)
+
+    def get_stats(self):
+        """
+        Getter of the statistics of the last computation
+        :return: stats
+        """
+        return {
+            "layers": len(self.__layer_names),
+            "fields": len(self.__fields),
+            "overrides": sum(1 for row in self.__cells for _, is_overridden in row if is_overridden),
+            "time": self.__time,
+        }
+
+    def export_csv(self, path):
+        """
+        Export the matrix to a CSV file : a row by layer and two columns by field (value and whether it is overridden)
+        :param path
+        :return:
+        """
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            header = ["layer"]
+            for part_name, field_name, _ in self.__fields:
+                header.append(part_name + "." + field_name)
+                header.append(part_name + "." + field_name + ".overridden")
+            writer.writerow(header)
+            for layer_name, row in zip(self.__layer_names, self.__cells):
+                line = [layer_name]
+                for value, is_overridden in row:
+                    line.append("" if value is None else _format_value(value))
+                    line.append(is_overridden)
+                writer.writerow(line)
+
+    def export_json(self, path):
+        """
+        Export the matrix to a JSON file
+        :param path
+        :return:
+        """
+        data = {
+            "visible_layer": self.__visible_layer_name,
+            "fields": [{"part": part_name, "field": field_name, "plug": plug}
+                       for part_name, field_name, plug in self.__fields],
+            "layers": [],
+        }
+        for layer_name, row in zip(self.__layer_names, self.__cells):
+            values = {}
+            for (part_name, field_name, _), (value, is_overridden) in zip(self.__fields, row):
+                values[part_name + "." + field_name] = {
+                    "value": list(value) if type(value) is tuple else value,
+                    "overridden": is_overridden,
+                }
+            data["layers"].append({"name": layer_name, "values": values})
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2)
+
+
+class LayerMatrixModel(QAbstractTableModel):
+    # Row, column and value of a cell edited
+    override_edited = Signal(int, int, object)
+
+    def __init__(self, layer_matrix, is_overridable, parent=None):
+        """
+        Constructor
+        :param layer_matrix
+        :param is_overridable: function telling whether a plug can be overridden
+        :param parent
+        """
+        super(LayerMatrixModel, self).__init__(parent)
+        self.__layer_matrix = layer_matrix
+        self.__is_overridable = is_overridable
+
+    def is_editable(self, row, column):
+        """
+        Getter of whether the override of a field in a layer can be edited
+        :param row
+        :param column
+        :return: is editable
+        """
+        value = self.__layer_matrix.get_cell(row, column)[0]
+        return not self.__layer_matrix.is_default_layer(row) and type(value) in (bool, int, float) and \
+            self.__is_overridable(self.__layer_matrix.get_fields()[column][2])
+
+    def flags(self, index):
+        """
+        Getter of the flags of a cell (editable to override the field in the layer)
+        :param index
+        :return: flags
+        """
+        flags = super(LayerMatrixModel, self).flags(index)
+        if index.isValid() and self.is_editable(index.row(), index.column()):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """
+        Request the override of a field in a layer with the value edited
+        :param index
+        :param value
+        :param role
+        :return: accepted
+        """
+        if role != Qt.EditRole or not index.isValid() or not self.is_editable(index.row(), index.column()):
+            return False
+        current_value = self.__layer_matrix.get_cell(index.row(), index.column())[0]
+        value = type(current_value)(value)
+        if value != current_value:
+            self.override_edited.emit(index.row(), index.column(), value)
+        return True
+
+    def reset(self):
+        """
+        Notify the views that the matrix has been computed again
+        :return:
+        """
+        self.beginResetModel()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Getter of the number of layers
+        :param parent
+        :return: number of rows
+        """
+        return 0 if parent.isValid() else len(self.__layer_matrix.get_layer_names())
+
+    def columnCount(self, parent=QModelIndex()):
+        """
+        Getter of the number of fields
+        :param parent
+        :return: number of columns
+        """
+        return 0 if parent.isValid() else len(self.__layer_matrix.get_fields())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """
+        Getter of the names of the fields and of the layers
+        :param section
+        :param orientation
+        :param role
+        :return: data
+        """
+        if orientation == Qt.Horizontal:
+            part_name, field_name, plug = self.__layer_matrix.get_fields()[section]
+            if role == Qt.DisplayRole:
+                return part_name + "\n" + field_name
+            if role == Qt.ToolTipRole:
+                return plug
+            if role == Qt.ForegroundRole and self.__layer_matrix.is_column_different(section):
+                return QColor(_DIFFERENT_FG_COLOR)
+            return None
+        if role == Qt.DisplayRole:
+            layer_name = self.__layer_matrix.get_layer_names()[section]
+            if layer_name == self.__layer_matrix.get_visible_layer_name():
+                return layer_name + _VISIBLE_LAYER_SUFFIX
+            return layer_name
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Getter of the value of a field in a layer (highlighted if it is overridden)
+        :param index
+        :param role
+        :return: data
+        """
+        if not index.isValid():
+            return None
+        value, is_overridden = self.__layer_matrix.get_cell(index.row(), index.column())
+        if role == Qt.DisplayRole:
+            return _format_value(value)
+        if role == Qt.EditRole:
+            return value
+        if role == Qt.BackgroundRole and is_overridden:
+            return QColor(cr.OVERRIDE_BG_COLOR)
+        if role == Qt.ForegroundRole and value is None:
+            return QColor(_UNRESOLVED_FG_COLOR)
+        if role == Qt.ToolTipRole:
+            if value is None:
+                return _UNRESOLVED_TOOLTIP
+            return "Overridden" if is_overridden else None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+
+class LayerMatrixDialog(QDialog):
+    def __init__(self, control_room):
+        """
+        Constructor
+        :param control_room
+        """
+        super(LayerMatrixDialog, self).__init__(wrapInstance(int(omui.MQtUtil.mainWindow()), QWidget))
+
+        # Model attributes
+        self.__control_room = control_room
+        self.__layer_matrix = LayerMatrix()
+        self.__matrix_model = LayerMatrixModel(self.__layer_matrix, self.__control_room.is_overridable)
+        self.__matrix_model.override_edited.connect(self.__on_override_edited)
+
+        # UI attributes
+        self.__ui_width = 900
+        self.__ui_height = 500
+        self.__ui_min_width = 400
+        self.__ui_min_height = 250
+        self.__ui_pos = QDesktopWidget().availableGeometry().center() - QPoint(self.__ui_width, self.__ui_height) / 2
+
+        # name the window
+        self.setWindowTitle("Render Layers Matrix")
+        # make the window a "tool" in Maya's eyes so that it stays on top when you click off
+        self.setWindowFlags(QtCore.Qt.Tool)
+        # Makes the object get deleted from memory, not just hidden, when it is closed.
+        self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+
+        self.__create_ui()
+        self.__refresh_ui()
+
+    def __create_ui(self):
+        """
+        Create the ui
+        :return:
+        """
+        # Reinit attributes of the UI
+        self.setMinimumSize(self.__ui_min_width, self.__ui_min_height)
+        self.resize(self.__ui_width, self.__ui_height)
+        self.move(self.__ui_pos)
+
+        # Main Layout
+        main_lyt = QVBoxLayout()
+        self.setLayout(main_lyt)
+        main_lyt.setContentsMargins(5, 8, 5, 8)
+
+        top_lyt = QHBoxLayout()
+        main_lyt.addLayout(top_lyt)
+        self.__ui_only_different_cb = QCheckBox("Only the fields that differ between the layers")
+        self.__ui_only_different_cb.stateChanged.connect(self.__refresh_columns)
+        top_lyt.addWidget(self.__ui_only_different_cb, 1)
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.__refresh_ui)
+        top_lyt.addWidget(refresh_btn)
+        export_csv_btn = QPushButton("Export CSV")
+        export_csv_btn.clicked.connect(self.__export_csv)
+        top_lyt.addWidget(export_csv_btn)
+        export_json_btn = QPushButton("Export JSON")
+        export_json_btn.clicked.connect(self.__export_json)
+        top_lyt.addWidget(export_json_btn)
+
+        # Grid of the fields by layer (double click on a cell to override the field in the layer)
+        self.__ui_table = QTableView()
+        self.__ui_table.setModel(self.__matrix_model)
+        self.__ui_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.__ui_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.__ui_table.setEditTriggers(QAbstractItemView.DoubleClicked)
+        self.__ui_table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.__ui_table.customContextMenuRequested.connect(self.__on_context_menu)
+        main_lyt.addWidget(self.__ui_table, 1)
+
+        # Preset applied to the layers selected
+        apply_lyt = QHBoxLayout()
+        main_lyt.addLayout(apply_lyt)
+        apply_lyt.addWidget(QLabel("Preset"))
+        self.__ui_preset_cbb = QComboBox()
+        apply_lyt.addWidget(self.__ui_preset_cbb, 1)
+        apply_preset_btn = QPushButton("Apply to the selected layers as overrides")
+        apply_preset_btn.clicked.connect(self.__apply_preset)
+        apply_lyt.addWidget(apply_preset_btn)
+
+        self.__ui_lbl_stats = QLabel()
+        main_lyt.addWidget(self.__ui_lbl_stats)
+
+    def __refresh_ui(self):
+        """
+        Compute the matrix again and refresh the ui
+        :return:
+        """
+        preset_name = self.__ui_preset_cbb.currentText()
+        self.__ui_preset_cbb.clear()
+        preset_manager = PresetManager.get_instance()
+        for preset in preset_manager.get_default_presets() + preset_manager.get_presets():
+            self.__ui_preset_cbb.addItem(preset.get_name(), preset)
+        self.__ui_preset_cbb.setCurrentText(preset_name)
+        try:
+            self.__layer_matrix.compute(self.__control_room.get_fields())
+        except Exception as e:
+            # The matrix computed before (if any) is kept
+            self.__ui_lbl_stats.setText("The render layers matrix can't be computed : " + str(e))
+            print_warning(["The render layers matrix can't be computed", str(e)])
+            return
+        self.__matrix_model.reset()
+        self.__ui_table.resizeColumnsToContents()
+        self.__refresh_columns()
+        stats = self.__layer_matrix.get_stats()
+        self.__ui_lbl_stats.setText(str(stats["layers"]) + " layers, " + str(stats["fields"]) + " fields, " +
+                                    str(stats["overrides"]) + " overrides resolved in " +
+                                    str(round(stats["time"] * 1000)) + " ms")
+
+    def __refresh_columns(self):
+        """
+        Hide the fields with the same value in all the layers if asked
+        :return:
+        """
+        only_different = self.__ui_only_different_cb.isChecked()
+        for column in range(self.__matrix_model.columnCount()):
+            self.__ui_table.setColumnHidden(
+                column, only_different and not self.__layer_matrix.is_column_different(column))
+
+    def __get_selected_layer_names(self):
+        """
+        Getter of the names of the layers selected (the default layer is skipped as it can't have overrides)
+        :return: names
+        """
+        rows = sorted(index.row() for index in self.__ui_table.selectionModel().selectedRows())
+        return [self.__layer_matrix.get_layer_name(row) for row in rows
+                if not self.__layer_matrix.is_default_layer(row)]
+
+    def __edit_overrides(self, edits):
+        """
+        Edit overrides in one batch then compute the matrix again
+        :param edits: list of (layer name, plug, value) with a value None to remove the override
+        :return:
+        """
+        self.__control_room.edit_layer_overrides(edits)
+        self.__refresh_ui()
+
+    def __on_override_edited(self, row, column, value):
+        """
+        On a cell edited override the field in the layer
+        :param row
+        :param column
+        :param value
+        :return:
+        """
+        plug = self.__layer_matrix.get_fields()[column][2]
+        # Once back in the event loop as the matrix is computed again
+        QTimer.singleShot(0, partial(self.__edit_overrides, [(self.__layer_matrix.get_layer_name(row), plug, value)]))
+
+    def __on_context_menu(self, pos):
+        """
+        Display the menu to remove the override of the cell under the mouse
+        :param pos
+        :return:
+        """
+        index = self.__ui_table.indexAt(pos)
+        if not index.isValid():
+            return
+        is_overridden = self.__layer_matrix.get_cell(index.row(), index.column())[1]
+        menu = QMenu(self)
+        action_remove_override = menu.addAction("Remove Override")
+        action_remove_override.setEnabled(is_overridden and not self.__layer_matrix.is_default_layer(index.row()))
+        if menu.exec_(self.__ui_table.viewport().mapToGlobal(pos)) == action_remove_override:
+            plug = self.__layer_matrix.get_fields()[index.column()][2]
+            self.__edit_overrides([(self.__layer_matrix.get_layer_name(index.row()), plug, None)])
+
+    def __apply_preset(self):
+        """
+        Apply the preset chosen to the layers selected as overrides in one batch
+        :return:
+        """
+        preset = self.__ui_preset_cbb.currentData()
+        layer_names = self.__get_selected_layer_names()
+        if preset is None or len(layer_names) == 0:
+            return
+        stats = self.__control_room.apply_preset_to_layers(preset, layer_names)
+        self.__refresh_ui()
+        self.__ui_lbl_stats.setText("Preset " + preset.get_name() + " applied to " + str(stats["layers"]) +
+                                    " layers : " + str(stats["overrides_set"]) + " overrides set in " +
+                                    str(round(stats["time"] * 1000)) + " ms")
+
+    def __export_csv(self):
+        """
+        Export the matrix to a CSV file chosen by the user
+        :return:
+        """
+        path, _ = QFileDialog.getSaveFileName(self, "Export the matrix", "render_layers_matrix.csv", "CSV (*.csv)")
+        if path:
+            self.__export(self.__layer_matrix.export_csv, path)
+
+    def __export_json(self):
+        """
+        Export the matrix to a JSON file chosen by the user
+        :return:
+        """
+        path, _ = QFileDialog.getSaveFileName(self, "Export the matrix", "render_layers_matrix.json", "JSON (*.json)")
+        if path:
+            self.__export(self.__layer_matrix.export_json, path)
+
+    def __export(self, export_function, path):
+        """
+        Export the matrix reporting the file errors (unwritable path or locked file)
+        :param export_function
+        :param path
+        :return:
+        """
+        try:
+            export_function(path)
+        except OSError as e:
+            self.__ui_lbl_stats.setText("The render layers matrix can't be exported : " + str(e))
+            print_warning(["The render layers matrix can't be exported", str(e)])
@@ -0,0 +1,219 @@
+import maya.OpenMaya as OpenMaya
+
+import maya.app.renderSetup.model.override as maya_override
+import maya.app.renderSetup.model.renderSetup as render_setup
+import maya.app.renderSetup.model.utils as render_setup_utils
+
+_OVERRIDE_TYPE = "absUniqueOverride"
+
+
+class OverrideIndex:
+    # ################################################### Singleton ####################################################
+    __instance = None
+
+    @staticmethod
+    def get_instance():
+        """
+        Getter of the instance for the Singleton pattern
+        :return: instance of OverrideIndex
+        """
+        if OverrideIndex.__instance is None:
+            OverrideIndex.__instance = OverrideIndex()
+        return OverrideIndex.__instance
+
+    # ################################################### Singleton ####################################################
+
+    def __init__(self):
+        # Overrides by layer name then by (node, attribute)
+        self.__layers = {}
+        self.__callbacks = []
+        self.__observing = False
+        self.__editing = False
+        self.__hits = 0
+        self.__misses = 0
+        self.__builds = 0
+        self.__invalidations = 0
+
+    def __build_layer(self, layer):
+        """
+        Index all the absolute overrides of a layer in one traversal
+        :param layer
+        :return: overrides of the layer by (node, attribute)
+        """
+        overrides = {}
+        for override in render_setup_utils.getOverridesRecursive(layer):
+            if override.typeName() == _OVERRIDE_TYPE:
+                key = (override.targetNodeName(), override.attributeName())
+                if key not in overrides:
+                    overrides[key] = override
+        self.__layers[layer.name()] = overrides
+        self.__builds += 1
+        return overrides
+
+    def __get_layer_overrides(self, layer):
+        """
+        Getter of the indexed overrides of a layer (built if needed)
+        :param layer
+        :return: overrides of the layer by (node, attribute)
+        """
+        overrides = self.__layers.get(layer.name())
+        if overrides is None:
+            overrides = self.__build_layer(layer)
+        return overrides
+
+    def get_overrides(self, layer):
+        """
+        Getter of the overrides of a layer (indexed in one traversal if needed)
+        :param layer
+        :return: overrides by (node, attribute), not to be modified
+        """
+        return self.__get_layer_overrides(layer)
+
+    def index_layer(self, layer):
+        """
+        Index all the overrides of a layer again
+        :param layer
+        :return: number of overrides indexed
+        """
+        self.invalidate(layer.name())
+        return len(self.__get_layer_overrides(layer))
+
+    def retrieve(self, obj_name, attr_name, layer=None):
+        """
+        Retrieve the override for an attribute of an object
+        :param obj_name
+        :param attr_name
+        :param layer: visible layer if None
+        :return: override
+        """
+        if layer is None:
+            layer = render_setup.instance().getVisibleRenderLayer()
+        overrides = self.__get_layer_overrides(layer)
+        override = overrides.get((obj_name, attr_name))
+        if override is None:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+        return override
+
+    def create(self, obj_name, attr_name, layer=None):
+        """
+        Create an override for an attribute of an object and index it
+        :param obj_name
+        :param attr_name
+        :param layer: visible layer if None
+        :return: override
+        """
+        if layer is None:
+            layer = render_setup.instance().getVisibleRenderLayer()
+        overrides = self.__get_layer_overrides(layer)
+        self.__editing = True
+        try:
+            override = layer.renderSettingsCollectionInstance().createAbsoluteOverride(obj_name, attr_name)
+        finally:
+            self.__editing = False
+        overrides[(obj_name, attr_name)] = override
+        return override
+
+    def set_value(self, obj_name, attr_name, value, layer=None):
+        """
+        Set the value of the override for an attribute of an object (created if the layer has none). A layer not
+        visible is edited without being applied to the scene
+        :param obj_name
+        :param attr_name
+        :param value
+        :param layer: visible layer if None
+        :return: override
+        """
+        override = self.retrieve(obj_name, attr_name, layer)
+        if override is None:
+            override = self.create(obj_name, attr_name, layer)
+        override.setAttrValue(value)
+        return override
+
+    def remove(self, override):
+        """
+        Remove an override and drop it from the index
+        :param override
+        :return:
+        """
+        if override is None:
+            return
+        key = (override.targetNodeName(), override.attributeName())
+        for overrides in self.__layers.values():
+            if overrides.get(key) is override:
+                del overrides[key]
+        self.__editing = True
+        try:
+            maya_override.delete(override)
+        finally:
+            self.__editing = False
+
+    def invalidate(self, layer_name=None):
+        """
+        Invalidate the index of a layer or of all the layers
+        :param layer_name
+        :return:
+        """
+        if layer_name is None:
+            self.__layers.clear()
+        else:
+            self.__layers.pop(layer_name, None)
+        self.__invalidations += 1
+
+    def get_stats(self):
+        """
+        Getter of the statistics of the index
+        :return: stats
+        """
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "builds": self.__builds,
+            "invalidations": self.__invalidations,
+            "layers_indexed": len(self.__layers),
+        }
+
+    def reset_stats(self):
+        """
+        Reset the statistics of the index
+        :return:
+        """
+        self.__hits = 0
+        self.__misses = 0
+        self.__builds = 0
+        self.__invalidations = 0
+
+    def __on_override_node_changed(self, *args):
+        """
+        On an override node created or deleted outside the Control Room invalidate the index
+        :return:
+        """
+        if not self.__editing:
+            self.invalidate()
+
+    def add_callbacks(self):
+        """
+        Add the override node callbacks that keep the index up to date
+        :return:
+        """
+        if self.__observing:
+            return
+        self.__callbacks.append(
+            OpenMaya.MDGMessage.addNodeAddedCallback(self.__on_override_node_changed, _OVERRIDE_TYPE))
+        self.__callbacks.append(
+            OpenMaya.MDGMessage.addNodeRemovedCallback(self.__on_override_node_changed, _OVERRIDE_TYPE))
+        self.__observing = True
+
+    def remove_callbacks(self):
+        """
+        Remove the override node callbacks
+        :return:
+        """
+        if not self.__observing:
+            return
+        for callback in self.__callbacks:
+            OpenMaya.MMessage.removeCallback(callback)
+        self.__callbacks = []
+        self.__observing = False
+        self.invalidate()
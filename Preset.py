@@ -3,6 +3,15 @@ from common.utils import *
 
 class Preset:
 
+    @staticmethod
+    def sanitize_name(name):
+        """
+        Sanitize a preset name (no spaces)
+        :param name
+        :return: name sanitized
+        """
+        return name.replace(" ", "_")
+
     @classmethod
     def create_from_existant(cls, preset_dict):
         """
@@ -17,7 +26,21 @@ class Preset:
             del preset_dict["active"]
         else:
             active = False
-        return cls(name, preset_dict, active)
+        return cls(name, preset_dict, active=active)
+
+    @classmethod
+    def create_lazy(cls, name, fields_loader, active=False):
+        """
+        Create a preset whose fields are loaded the first time they are accessed
+        :param name
+        :param fields_loader: function returning the fields
+        :param active
+        :return: preset
+        """
+        preset = cls(name, active=active)
+        preset.__fields = None
+        preset.__fields_loader = fields_loader
+        return preset
 
     def __init__(self, name, fields=None, fields_saved = None, active=False):
         """
@@ -27,10 +50,40 @@ class Preset:
         :param fields_saved
         :param active
         """
-        self.__name = name.replace(" ", "_")
+        self.__name = Preset.sanitize_name(name)
         self.__fields = {} if fields is None or type(fields) is not dict else fields
         self.__fields_saved = {} if fields_saved is None or type(fields_saved) is not dict else fields_saved
         self.__active = active
+        self.__fields_loader = None
+
+    def __get_fields(self):
+        """
+        Getter of the fields (loaded once on the first access for the lazy presets). A failed load is not kept : the
+        preset stays not loaded and no field is returned
+        :return: fields
+        """
+        if self.__fields is None:
+            fields = self.__fields_loader()
+            if type(fields) is not dict:
+                return {}
+            self.__fields = fields
+            self.__fields_loader = None
+        return self.__fields
+
+    def load(self):
+        """
+        Load the fields now if they are not loaded yet
+        :return: whether the fields are loaded
+        """
+        self.__get_fields()
+        return self.is_loaded()
+
+    def is_loaded(self):
+        """
+        Getter of whether the fields are loaded
+        :return: is loaded
+        """
+        return self.__fields is not None
 
     # ###################################################### dict ######################################################
 
@@ -42,9 +95,10 @@ class Preset:
         :param value
         :return:
         """
-        if part_name not in self.__fields:
-            self.__fields[part_name] = {}
-        self.__fields[part_name][key] = value
+        fields = self.__get_fields()
+        if part_name not in fields:
+            fields[part_name] = {}
+        fields[part_name][key] = value
 
     def get(self, part_name, key):
         """
@@ -53,7 +107,7 @@ class Preset:
         :param key
         :return: attribute value
         """
-        return self.__fields[part_name][key]
+        return self.__get_fields()[part_name][key]
 
     def contains(self, part_name, key):
         """
@@ -62,38 +116,46 @@ class Preset:
         :param key
         :return: contains
         """
-        return part_name in self.__fields and key in self.__fields[part_name]
+        fields = self.__get_fields()
+        return part_name in fields and key in fields[part_name]
 
     def keys(self):
         """
         Getter of the keys
         :return: keys
         """
-        return self.__fields.keys()
+        return self.__get_fields().keys()
 
     def values(self):
         """
         Getter of the values
         :return: values
         """
-        return self.__fields.values()
+        return self.__get_fields().values()
 
     def items(self):
         """
         Getter of the items
         :return: items
         """
-        return self.__fields.items()
+        return self.__get_fields().items()
 
     # ###################################################### dict ######################################################
 
     def __eq__(self, other):
         """
-        Equals function
+        Equals function (by identity as the name of a preset changes when it is renamed)
         :param other
         :return: equals
         """
-        return other.__name == self.__name
+        return other is self
+
+    def __hash__(self):
+        """
+        Hash function (by identity as the equality)
+        :return: hash
+        """
+        return object.__hash__(self)
 
     def set_active(self, active):
         """
@@ -119,18 +181,19 @@ class Preset:
 
     def set_name(self, name):
         """
-        Setter of the name
+        Setter of the name (sanitized). Only the PresetManager renames the presets it stores as it keeps them sorted by
+        name (see PresetManager.rename_preset)
         :param name
         :return:
         """
-        self.__name = name
+        self.__name = Preset.sanitize_name(name)
 
     def to_preset_array(self):
         """
         Generate an array from the preset
         :return: array preset
         """
-        preset_dict = self.__fields.copy()
+        preset_dict = self.__get_fields().copy()
         preset_dict["name"] = self.__name
         preset_dict["active"] = self.__active
         return preset_dict
@@ -142,10 +205,10 @@ class Preset:
         :return:
         """
         to_pop = []
-        for part, fields in self.__fields.items():
+        for part, fields in self.__get_fields().items():
             for field in fields.keys():
                 item = {"part":part, "field": field}
                 if item not in filter_dict:
                     to_pop.append(item)
         for item in to_pop:
-            self.__fields[item["part"]].pop(item["field"])
\ No newline at end of file
+            self.__get_fields()[item["part"]].pop(item["field"])
\ No newline at end of file
@@ -0,0 +1,363 @@
+from functools import partial
+
+from PySide2 import QtCore
+from PySide2.QtWidgets import *
+from PySide2.QtCore import *
+from PySide2.QtGui import *
+
+# Roles of the preset list model
+PRESET_ROLE = Qt.UserRole
+IS_DEFAULT_ROLE = Qt.UserRole + 1
+# (is exact, fields differing) for the preset matching the scene, None for the others
+MATCH_ROLE = Qt.UserRole + 2
+
+_CARD_WIDTH = 120
+_CARD_HEIGHT = 66
+_CARD_MARGIN = 3
+_CARD_COLOR = "#383838"
+_CARD_HOVERED_COLOR = "#444444"
+_BUTTON_COLOR = "#5D5D5D"
+_BUTTON_SIZE = 24
+_BUTTON_SPACING = 5
+_EXACT_MATCH_COLOR = "#6ABF69"
+_NEAREST_MATCH_COLOR = "#D9A441"
+
+# Pixmaps loaded once and shared by all the cards by path
+_PIXMAP_CACHE = {}
+
+
+def get_cached_pixmap(path):
+    """
+    Getter of a pixmap loaded once and shared
+    :param path
+    :return: pixmap
+    """
+    if path not in _PIXMAP_CACHE:
+        _PIXMAP_CACHE[path] = QPixmap(path)
+    return _PIXMAP_CACHE[path]
+
+
+def get_preset_key(preset, is_default):
+    """
+    Getter of the key identifying a preset in the browser
+    :param preset
+    :param is_default
+    :return: key
+    """
+    return is_default, preset.get_name()
+
+
+class PresetListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        """
+        Constructor
+        :param parent
+        """
+        super(PresetListModel, self).__init__(parent)
+        # List of (preset, is_default) in the display order
+        self.__entries = []
+        # Key of the preset matching the scene and its match
+        self.__match_key = None
+        self.__match = None
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Getter of the number of presets
+        :param parent
+        :return: number of rows
+        """
+        return 0 if parent.isValid() else len(self.__entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Getter of the data of a preset
+        :param index
+        :param role
+        :return: data
+        """
+        if not index.isValid() or index.row() >= len(self.__entries):
+            return None
+        preset, is_default = self.__entries[index.row()]
+        if role == Qt.DisplayRole:
+            return preset.get_name()
+        if role == PRESET_ROLE:
+            return preset
+        if role == IS_DEFAULT_ROLE:
+            return is_default
+        if role == MATCH_ROLE:
+            return self.__match if get_preset_key(preset, is_default) == self.__match_key else None
+        return None
+
+    def get_key(self, row):
+        """
+        Getter of the key of the preset of a row
+        :param row
+        :return: key
+        """
+        preset, is_default = self.__entries[row]
+        return get_preset_key(preset, is_default)
+
+    def __emit_key_changed(self, key):
+        """
+        Notify the views that the data of the preset of a key changed
+        :param key
+        :return:
+        """
+        for row in range(len(self.__entries)):
+            if self.get_key(row) == key:
+                model_index = self.index(row)
+                self.dataChanged.emit(model_index, model_index)
+                return
+
+    def set_match(self, key, match):
+        """
+        Setter of the preset matching the scene
+        :param key: None if no preset matches
+        :param match: (is exact, fields differing)
+        :return:
+        """
+        if key == self.__match_key and match == self.__match:
+            return
+        previous_key = self.__match_key
+        self.__match_key = key
+        self.__match = match
+        if previous_key is not None and previous_key != key:
+            self.__emit_key_changed(previous_key)
+        if key is not None:
+            self.__emit_key_changed(key)
+
+    def insert_entry(self, row, entry):
+        """
+        Insert a preset at a row
+        :param row
+        :param entry: (preset, is_default)
+        :return:
+        """
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.__entries.insert(row, entry)
+        self.endInsertRows()
+
+    def remove_entry(self, row):
+        """
+        Remove the preset of a row
+        :param row
+        :return:
+        """
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.__entries[row]
+        self.endRemoveRows()
+
+    def sync(self, entries):
+        """
+        Update the model to the given presets with incremental removals and insertions (the rows of the presets
+        still there are kept)
+        :param entries: list of (preset, is_default) in the display order
+        :return:
+        """
+        new_keys = set(get_preset_key(preset, is_default) for preset, is_default in entries)
+        for row in reversed(range(len(self.__entries))):
+            if self.get_key(row) not in new_keys:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.__entries[row]
+                self.endRemoveRows()
+        for row, entry in enumerate(entries):
+            if row < len(self.__entries) and self.get_key(row) == get_preset_key(*entry):
+                if self.__entries[row][0] is not entry[0]:
+                    # Same preset saved again
+                    self.__entries[row] = entry
+                    model_index = self.index(row)
+                    self.dataChanged.emit(model_index, model_index)
+                continue
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.__entries.insert(row, entry)
+            self.endInsertRows()
+        if len(self.__entries) > len(entries):
+            # Presets moved in the order
+            self.beginRemoveRows(QModelIndex(), len(entries), len(self.__entries) - 1)
+            del self.__entries[len(entries):]
+            self.endRemoveRows()
+
+
+class PresetFilterProxyModel(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        """
+        Constructor
+        :param parent
+        """
+        super(PresetFilterProxyModel, self).__init__(parent)
+        # Keys of the presets kept (None to keep all the presets)
+        self.__keys = None
+
+    def set_keys(self, keys):
+        """
+        Setter of the keys of the presets kept
+        :param keys: None to keep all the presets
+        :return:
+        """
+        self.__keys = keys
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        """
+        Getter of whether a preset is kept
+        :param source_row
+        :param source_parent
+        :return: accepted
+        """
+        return self.__keys is None or self.sourceModel().get_key(source_row) in self.__keys
+
+
+class PresetItemDelegate(QStyledItemDelegate):
+    apply_requested = Signal(object)
+    delete_requested = Signal(object)
+
+    def __init__(self, apply_pixmap, delete_pixmap, parent=None):
+        """
+        Constructor
+        :param apply_pixmap
+        :param delete_pixmap
+        :param parent
+        """
+        super(PresetItemDelegate, self).__init__(parent)
+        self.__apply_pixmap = apply_pixmap
+        self.__delete_pixmap = delete_pixmap
+
+    def sizeHint(self, option, index):
+        """
+        Getter of the size of a card
+        :param option
+        :param index
+        :return: size
+        """
+        return QSize(_CARD_WIDTH, _CARD_HEIGHT)
+
+    @staticmethod
+    def __get_card_rect(option):
+        """
+        Getter of the rect of a card
+        :param option
+        :return: rect
+        """
+        return option.rect.adjusted(0, _CARD_MARGIN, 0, -_CARD_MARGIN)
+
+    def __get_button_rects(self, option):
+        """
+        Getter of the rects of the apply and delete buttons of a card
+        :param option
+        :return: apply rect, delete rect
+        """
+        card_rect = self.__get_card_rect(option)
+        left = card_rect.center().x() - (2 * _BUTTON_SIZE + _BUTTON_SPACING) // 2
+        top = card_rect.bottom() - _BUTTON_SIZE - 8
+        apply_rect = QRect(left, top, _BUTTON_SIZE, _BUTTON_SIZE)
+        delete_rect = QRect(left + _BUTTON_SIZE + _BUTTON_SPACING, top, _BUTTON_SIZE, _BUTTON_SIZE)
+        return apply_rect, delete_rect
+
+    @staticmethod
+    def __draw_button(painter, rect, pixmap, icon_size, enabled):
+        """
+        Draw a button of a card
+        :param painter
+        :param rect
+        :param pixmap
+        :param icon_size
+        :param enabled
+        :return:
+        """
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(_BUTTON_COLOR))
+        painter.drawRoundedRect(rect, 2, 2)
+        icon_rect = QRect(0, 0, icon_size, icon_size)
+        icon_rect.moveCenter(rect.center())
+        painter.setOpacity(1.0 if enabled else 0.35)
+        painter.drawPixmap(icon_rect, pixmap)
+        painter.setOpacity(1.0)
+
+    def paint(self, painter, option, index):
+        """
+        Paint a card
+        :param painter
+        :param option
+        :param index
+        :return:
+        """
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        card_rect = self.__get_card_rect(option)
+        match = index.data(MATCH_ROLE)
+        if match is None:
+            painter.setPen(Qt.NoPen)
+        else:
+            painter.setPen(QPen(QColor(_EXACT_MATCH_COLOR if match[0] else _NEAREST_MATCH_COLOR), 2))
+        painter.setBrush(QColor(_CARD_HOVERED_COLOR if option.state & QStyle.State_MouseOver else _CARD_COLOR))
+        painter.drawRoundedRect(card_rect.adjusted(1, 1, -1, -1), 4, 4)
+        # Name
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(option.palette.color(QPalette.Text))
+        name_rect = QRect(card_rect.left(), card_rect.top() + 6, card_rect.width(), QFontMetrics(font).height() + 2)
+        painter.drawText(name_rect, Qt.AlignCenter, index.data(Qt.DisplayRole))
+        # Match with the scene (= if exact, ~ and the number of fields differing if nearest)
+        if match is not None:
+            painter.setFont(option.font)
+            painter.setPen(QColor(_EXACT_MATCH_COLOR if match[0] else _NEAREST_MATCH_COLOR))
+            match_rect = card_rect.adjusted(0, 4, -6, 0)
+            painter.drawText(match_rect, Qt.AlignTop | Qt.AlignRight, "=" if match[0] else "~" + str(len(match[1])))
+        # Actions
+        apply_rect, delete_rect = self.__get_button_rects(option)
+        self.__draw_button(painter, apply_rect, self.__apply_pixmap, 18, True)
+        self.__draw_button(painter, delete_rect, self.__delete_pixmap, 16, not index.data(IS_DEFAULT_ROLE))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        """
+        On click on a button of a card request the action (once back in the event loop as it may change the model)
+        :param event
+        :param model
+        :param option
+        :param index
+        :return: event handled
+        """
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            apply_rect, delete_rect = self.__get_button_rects(option)
+            preset = index.data(PRESET_ROLE)
+            if apply_rect.contains(event.pos()):
+                QTimer.singleShot(0, partial(self.apply_requested.emit, preset))
+                return True
+            if delete_rect.contains(event.pos()) and not index.data(IS_DEFAULT_ROLE):
+                QTimer.singleShot(0, partial(self.delete_requested.emit, preset))
+                return True
+        return super(PresetItemDelegate, self).editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        """
+        Display the tooltips of the buttons of a card
+        :param event
+        :param view
+        :param option
+        :param index
+        :return: event handled
+        """
+        if event.type() == QEvent.ToolTip:
+            apply_rect, delete_rect = self.__get_button_rects(option)
+            if apply_rect.contains(event.pos()):
+                QToolTip.showText(event.globalPos(), "Apply the preset", view)
+                return True
+            if delete_rect.contains(event.pos()):
+                if index.data(IS_DEFAULT_ROLE):
+                    QToolTip.showText(event.globalPos(), "Default presets can't be removed", view)
+                else:
+                    QToolTip.showText(event.globalPos(), "Delete the preset", view)
+                return True
+            match = index.data(MATCH_ROLE)
+            if match is not None:
+                if match[0]:
+                    QToolTip.showText(event.globalPos(), "Matches the scene", view)
+                else:
+                    fields_differing = [part_name + "." + field_name for part_name, field_name in match[1]]
+                    QToolTip.showText(event.globalPos(),
+                                      "Nearest preset to the scene, differs on :\n" + "\n".join(fields_differing),
+                                      view)
+                return True
+        return super(PresetItemDelegate, self).helpEvent(event, view, option, index)
@@ -0,0 +1,165 @@
+from PySide2.QtWidgets import *
+from PySide2.QtCore import *
+from PySide2.QtGui import *
+
+from .PresetMatcher import get_field_components, values_differ
+
+_DIFFERENT_BG_COLOR = "#2E5A66"
+_MISSING_FG_COLOR = "#707070"
+
+
+def _format_value(value):
+    """
+    Format a field value for a cell
+    :param value
+    :return: text
+    """
+    if type(value) is float:
+        return str(round(value, 3))
+    if type(value) in (list, tuple):
+        return ", ".join(_format_value(elem) for elem in value)
+    return str(value)
+
+
+class PresetComparisonModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        """
+        Constructor
+        :param parent
+        """
+        super(PresetComparisonModel, self).__init__(parent)
+        # A row by preset (the scene first) and a column by (part_name, field_name) of the union of their fields
+        self.__presets = []
+        self.__fields = []
+        # Cells by row : (value, numeric components) or None if the preset has no value for the field
+        self.__cells = []
+        # Cells differing from the scene and columns whose values are not the same for all the presets
+        self.__different_cells = set()
+        self.__different_columns = set()
+
+    def set_presets(self, scene_preset, presets):
+        """
+        Compute the grid of the presets aligned on the union of their fields in one pass
+        :param scene_preset
+        :param presets
+        :return:
+        """
+        self.beginResetModel()
+        self.__presets = [scene_preset] + list(presets)
+        columns = {}
+        rows = []
+        for preset in self.__presets:
+            row = {}
+            for part_name, fields in preset.items():
+                for field_name, value in fields.items():
+                    field = (part_name, field_name)
+                    if field not in columns:
+                        columns[field] = len(columns)
+                    row[columns[field]] = (value, get_field_components(value))
+            rows.append(row)
+        self.__fields = list(columns.keys())
+        self.__cells = [[row.get(column) for column in range(len(self.__fields))] for row in rows]
+        self.__different_cells = set()
+        self.__different_columns = set()
+        for column in range(len(self.__fields)):
+            first_cell = None
+            for row_index, row in enumerate(self.__cells):
+                cell = row[column]
+                if cell is None:
+                    continue
+                if first_cell is None:
+                    first_cell = cell
+                elif values_differ(first_cell[0], cell[0]):
+                    self.__different_columns.add(column)
+                scene_cell = self.__cells[0][column]
+                if row_index > 0 and scene_cell is not None and values_differ(scene_cell[0], cell[0]):
+                    self.__different_cells.add((row_index, column))
+        self.endResetModel()
+
+    def is_column_different(self, column):
+        """
+        Getter of whether the values of a field are not the same for all the presets
+        :param column
+        :return: is different
+        """
+        return column in self.__different_columns
+
+    def get_sort_key(self, row, column):
+        """
+        Getter of the key to sort the presets by a field (the presets without the field last)
+        :param row
+        :param column
+        :return: sort key
+        """
+        cell = self.__cells[row][column]
+        if cell is None:
+            return 2, []
+        if cell[1] is not None:
+            return 0, cell[1]
+        return 1, str(cell[0])
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Getter of the number of presets (with the scene)
+        :param parent
+        :return: number of rows
+        """
+        return 0 if parent.isValid() else len(self.__presets)
+
+    def columnCount(self, parent=QModelIndex()):
+        """
+        Getter of the number of fields
+        :param parent
+        :return: number of columns
+        """
+        return 0 if parent.isValid() else len(self.__fields)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """
+        Getter of the names of the fields and of the presets
+        :param section
+        :param orientation
+        :param role
+        :return: data
+        """
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            part_name, field_name = self.__fields[section]
+            return part_name + "\n" + field_name
+        return self.__presets[section].get_name()
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Getter of the value of a field of a preset (highlighted if it differs from the scene)
+        :param index
+        :param role
+        :return: data
+        """
+        if not index.isValid():
+            return None
+        cell = self.__cells[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return "-" if cell is None else _format_value(cell[0])
+        if role == Qt.BackgroundRole and (index.row(), index.column()) in self.__different_cells:
+            return QColor(_DIFFERENT_BG_COLOR)
+        if role == Qt.ForegroundRole and cell is None:
+            return QColor(_MISSING_FG_COLOR)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+
+class PresetComparisonProxyModel(QSortFilterProxyModel):
+    def lessThan(self, source_left, source_right):
+        """
+        Compare two presets on the field of the sorted column (the scene stays first)
+        :param source_left
+        :param source_right
+        :return: less than
+        """
+        if source_left.row() == 0 or source_right.row() == 0:
+            return (source_left.row() == 0) == (self.sortOrder() == Qt.AscendingOrder)
+        model = self.sourceModel()
+        return model.get_sort_key(source_left.row(), source_left.column()) < \
+            model.get_sort_key(source_right.row(), source_right.column())
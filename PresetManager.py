@@ -1,10 +1,11 @@
-import json
-import base64
 import os.path
+from bisect import bisect_left
 
-import pymel.core as pm
 from common.utils import *
 from .Preset import *
+from .PresetStorage import *
+from .DefaultPresetLibrary import *
+from .StudioPresetLibrary import *
 
 
 class PresetManager:
@@ -26,37 +27,115 @@ class PresetManager:
     # ################################################### Singleton ####################################################
 
     def __init__(self):
+        # Presets sorted by name and their names (kept in order on insert)
         self.__presets = []
+        self.__preset_names = []
+        # Presets indexed by name
+        self.__presets_by_name = {}
         self.__default_presets = []
+        self.__default_preset_library = DefaultPresetLibrary(
+            [os.path.join(os.path.dirname(__file__), "default_preset")])
+        self.__studio_preset_library = StudioPresetLibrary()
         self.__active_preset = None
+        # Callbacks called with (event, preset, index) on "added", "removed", "activated" and "reset"
+        self.__listeners = []
+        self.__storage = PresetStorage()
+        # Names of the presets changed since the last flush and whether their save has been requested
+        self.__dirty_names = set()
+        self.__is_save_pending = False
+
+    def add_listener(self, callback):
+        """
+        Add a callback called on the changes of the presets
+        :param callback
+        :return:
+        """
+        if callback not in self.__listeners:
+            self.__listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """
+        Remove a callback called on the changes of the presets
+        :param callback
+        :return:
+        """
+        if callback in self.__listeners:
+            self.__listeners.remove(callback)
+
+    def __notify(self, event, preset=None, index=None):
+        """
+        Call the listeners on a change
+        :param event
+        :param preset
+        :param index: index of the preset in the presets sorted by name
+        :return:
+        """
+        for callback in list(self.__listeners):
+            callback(event, preset, index)
 
     def clear(self):
         """
         Clear the presets
         :return:
         """
+        self.__clear()
+        self.__notify("reset")
+
+    def __clear(self):
+        """
+        Clear the presets without notifying the listeners
+        :return:
+        """
         self.__presets.clear()
+        self.__preset_names.clear()
+        self.__presets_by_name.clear()
         self.__active_preset = None
 
+    def __insert(self, preset):
+        """
+        Insert a preset at its place in the order by name
+        :param preset
+        :return: index
+        """
+        index = bisect_left(self.__preset_names, preset.get_name())
+        self.__presets.insert(index, preset)
+        self.__preset_names.insert(index, preset.get_name())
+        self.__presets_by_name[preset.get_name()] = preset
+        return index
+
+    def __pop(self, preset):
+        """
+        Remove a preset from the order by name
+        :param preset
+        :return: index or None if the preset is not stored
+        """
+        name = preset.get_name()
+        if self.__presets_by_name.get(name) is not preset:
+            return None
+        index = bisect_left(self.__preset_names, name)
+        del self.__presets[index]
+        del self.__preset_names[index]
+        del self.__presets_by_name[name]
+        if self.__active_preset is preset:
+            self.__active_preset = None
+        return index
+
     def add_preset(self, preset_to_add):
         """
-        Add a preset
+        Add a preset (replace the preset with the same name)
         :param preset_to_add
         :return:
         """
-        to_remove = None
-        for preset in self.__presets:
-            if preset.get_name() == preset_to_add.get_name():
-                to_remove = preset
-                break
-        if to_remove is not None:
-            self.remove_preset(to_remove)
+        existing_preset = self.__presets_by_name.get(preset_to_add.get_name())
+        if existing_preset is preset_to_add:
+            return
+        if existing_preset is not None:
+            self.remove_preset(existing_preset)
+        index = self.__insert(preset_to_add)
+        self.__dirty_names.add(preset_to_add.get_name())
+        self.__notify("added", preset_to_add, index)
         if preset_to_add.is_active():
-            for curr_preset in self.__presets:
-                curr_preset.set_active(False)
-
-        if preset_to_add not in self.__presets:
-            self.__presets.append(preset_to_add)
+            self.set_preset_active(preset_to_add)
 
     def remove_preset(self, preset_to_remove):
         """
@@ -65,7 +144,27 @@ class PresetManager:
         :return:
         """
         if preset_to_remove is not None:
-            self.__presets.remove(preset_to_remove)
+            index = self.__pop(preset_to_remove)
+            if index is not None:
+                self.__dirty_names.add(preset_to_remove.get_name())
+                self.__notify("removed", preset_to_remove, index)
+
+    def rename_preset(self, preset, name):
+        """
+        Rename a preset (replace the preset with the new name)
+        :param preset
+        :param name
+        :return:
+        """
+        name = Preset.sanitize_name(name)
+        if preset.get_name() == name:
+            return
+        is_active = self.__active_preset is preset
+        self.remove_preset(preset)
+        preset.set_name(name)
+        self.add_preset(preset)
+        if is_active:
+            self.set_preset_active(preset)
 
     def set_preset_active(self, active_preset):
         """
@@ -73,46 +172,94 @@ class PresetManager:
         :param active_preset
         :return:
         """
-        # Set all presets to inactive except the wanted one
-        if active_preset is not None:
-            for preset in self.__presets:
-                preset.set_active(preset is active_preset)
+        # Only the previous active preset has to be set inactive
+        if active_preset is None or active_preset is self.__active_preset:
+            return
+        if self.__active_preset is not None:
+            self.__active_preset.set_active(False)
+            self.__dirty_names.add(self.__active_preset.get_name())
+        active_preset.set_active(True)
+        self.__dirty_names.add(active_preset.get_name())
+        self.__active_preset = active_preset
+        self.__notify("activated", active_preset, self.get_preset_index(active_preset))
+
+    def get_active_preset(self):
+        """
+        Getter of the active preset
+        :return: active preset
+        """
+        return self.__active_preset
+
+    def get_preset(self, name):
+        """
+        Getter of a preset by name
+        :param name
+        :return: preset or None
+        """
+        return self.__presets_by_name.get(name)
+
+    def get_preset_index(self, preset):
+        """
+        Getter of the index of a preset in the presets sorted by name
+        :param preset
+        :return: index or None if the preset is not stored
+        """
+        if self.__presets_by_name.get(preset.get_name()) is not preset:
+            return None
+        return bisect_left(self.__preset_names, preset.get_name())
 
     def retrieve_presets(self):
         """
-        Retrieve the existing presets in the scene
+        Retrieve the existing presets in the scene (the changes not flushed are dropped)
         :return:
         """
-        self.clear()
-        if "presets" in pm.fileInfo:
-            found_active = False
-            json_presets = pm.fileInfo["presets"].replace("\\\"", "\"")
-            try:
-                arr_json_presets = json.loads(json_presets)
-                for json_preset in arr_json_presets:
-                    preset = Preset.create_from_existant(json_preset)
-                    if preset.is_active() and not found_active:
-                        self.__active_preset = preset
-                    self.__presets.append(preset)
-            except:
-                print_warning("Error while trying to parse an existing preset")
+        self.__clear()
+        self.__dirty_names.clear()
+        self.__is_save_pending = False
+        found_active = False
+        for preset in self.__storage.load():
+            if preset.get_name() in self.__presets_by_name:
+                continue
+            if preset.is_active():
+                if found_active:
+                    preset.set_active(False)
+                else:
+                    self.__active_preset = preset
+                    found_active = True
+            self.__insert(preset)
+        self.__notify("reset")
+
+    def invalidate_presets(self):
+        """
+        Invalidate the presets on scene change (until they are retrieved from the new scene)
+        :return:
+        """
+        self.__storage.invalidate()
 
     def save_presets(self):
         """
-        Save presets in the scene
+        Request the save of the presets changed in the scene. They are written by flush_presets just before the
+        scene is saved
+        :return:
+        """
+        self.__is_save_pending = True
+
+    def flush_presets(self):
+        """
+        Write the presets changed since the last flush if their save has been requested
         :return:
         """
-        arr_json_presets = []
-        for preset in self.__presets:
-            arr_json_presets.append(preset.to_preset_array())
-        pm.fileInfo["presets"] = json.dumps(arr_json_presets)
+        if not self.__is_save_pending:
+            return
+        self.__storage.write(self.__presets, self.__dirty_names)
+        self.__dirty_names.clear()
+        self.__is_save_pending = False
 
     def get_presets(self):
         """
         Getter of the presets
-        :return: presets
+        :return: presets sorted by name (not to be modified)
         """
-        self.__presets.sort(key=lambda x: x.get_name())
         return self.__presets
 
     def get_default_presets(self):
@@ -124,20 +271,29 @@ class PresetManager:
 
     def retrieve_default_presets(self):
         """
-        Retrieve all the default presets
+        Retrieve all the default presets : the presets of the package then the presets of the show, of the sequence
+        and of the shot from the local cache (a preset of a layer replaces the preset with the same name of the
+        previous layers). Only the files added or modified since the last retrieval are parsed
+        :return: whether the default presets changed
+        """
+        package_presets, package_changed = self.__default_preset_library.scan()
+        studio_presets, studio_changed = self.__studio_preset_library.load()
+        if not package_changed and not studio_changed:
+            return False
+        default_presets_by_name = {}
+        for preset in package_presets + studio_presets:
+            default_presets_by_name[preset.get_name()] = preset
+        self.__default_presets = list(default_presets_by_name.values())
+        self.__notify("reset")
+        return True
+
+    def refresh_studio_presets(self):
+        """
+        Refresh the local cache of the studio presets in the background (retrieved by the next call to
+        retrieve_default_presets)
         :return:
         """
-        self.__default_presets = []
-        default_preset_dir = os.path.join(os.path.dirname(__file__), "default_preset")
-        for preset_filename in os.listdir(default_preset_dir):
-            preset_path = os.path.join(default_preset_dir, preset_filename)
-            try:
-                if os.path.isfile(preset_path):
-                    with open(preset_path, "r") as f:
-                        preset_json = f.read().replace("\\\"", "\"").replace("\\n", "")
-                        self.__default_presets.append(Preset.create_from_existant(json.loads(preset_json)))
-            except:
-                print_warning("Error while trying to parse a default preset : "+preset_path)
+        self.__studio_preset_library.start_refresh()
 
     def has_preset_with_name(self, name):
         """
@@ -145,7 +301,4 @@ class PresetManager:
         :param name
         :return: has preset with name
         """
-        for preset in self.__presets:
-            if preset.get_name() == name:
-                return True
-        return False
+        return name in self.__presets_by_name
@@ -0,0 +1,239 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Parts whose fields are compared to find the preset matching the scene
+MATCHED_PARTS = ("sampling", "adaptive_sampling", "motion_blur", "image_size", "feature_overrides")
+
+# Precision of the comparison of the values (the precision of the UI), the same for the matching, the comparison of
+# the presets and the fields state
+FIELD_TOLERANCE = 1e-3
+
+
+def get_field_components(value):
+    """
+    Getter of the numeric components of a field value (bools as 0 or 1, a component by element for compound values)
+    :param value
+    :return: components or None if the value is not numeric
+    """
+    values = value if type(value) in (list, tuple) else [value]
+    components = []
+    for elem in values:
+        if type(elem) not in (bool, int, float):
+            return None
+        components.append(float(elem))
+    return components
+
+
+def values_differ(value_a, value_b):
+    """
+    Getter of whether two field values differ (numeric values component by component at the precision of the UI)
+    :param value_a
+    :param value_b
+    :return: differ
+    """
+    components_a = get_field_components(value_a)
+    components_b = get_field_components(value_b)
+    if components_a is not None and components_b is not None:
+        return len(components_a) != len(components_b) or \
+            any(abs(a - b) > FIELD_TOLERANCE for a, b in zip(components_a, components_b))
+    return value_a != value_b
+
+
+class PresetMatcher:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Presets compiled and their rows in the matrix (in the same order)
+        self.__presets = []
+        self.__rows = []
+        # Presets not loaded yet, compiled later by compile_pending to not load them all at once
+        self.__pending_presets = []
+        # Order of the presets given to set_presets by id to choose between presets as near from the scene
+        self.__orders = {}
+        # Slot of the first component by (part_name, field_name) and number of components
+        self.__slots = {}
+        self.__nb_slots = 0
+        # Matrix of the rows as an array (built from the rows when needed if NumPy is available)
+        self.__matrix = None
+        # Fields of each slot to report the differences
+        self.__slot_fields = []
+
+    def __add_slot(self, part_name, field_name, nb_components):
+        """
+        Add the slots of a field to the layout (and to the rows already compiled)
+        :param part_name
+        :param field_name
+        :param nb_components
+        :return:
+        """
+        self.__slots[(part_name, field_name)] = (self.__nb_slots, nb_components)
+        self.__nb_slots += nb_components
+        self.__slot_fields.extend([(part_name, field_name)] * nb_components)
+        for row in self.__rows:
+            row.extend([float("nan")] * nb_components)
+
+    def __compile(self, preset):
+        """
+        Compile a preset in a row of the matrix
+        :param preset
+        :return:
+        """
+        components_by_field = {}
+        for part_name, fields in preset.items():
+            if part_name not in MATCHED_PARTS:
+                continue
+            for field_name, value in fields.items():
+                components = get_field_components(value)
+                if components is None:
+                    continue
+                if (part_name, field_name) not in self.__slots:
+                    self.__add_slot(part_name, field_name, len(components))
+                if self.__slots[(part_name, field_name)][1] == len(components):
+                    components_by_field[(part_name, field_name)] = components
+        row = [float("nan")] * self.__nb_slots
+        for field, components in components_by_field.items():
+            first_slot = self.__slots[field][0]
+            row[first_slot:first_slot + len(components)] = components
+        self.__presets.append(preset)
+        self.__rows.append(row)
+        self.__matrix = None
+
+    def set_presets(self, presets):
+        """
+        Set the presets to compare to the scene. Only the rows of the presets added are compiled, the presets not
+        loaded yet are kept pending until compile_pending
+        :param presets
+        :return:
+        """
+        orders = {id(preset): order for order, preset in enumerate(presets)}
+        if orders == self.__orders:
+            return
+        self.__orders = orders
+        kept = [(preset, row) for preset, row in zip(self.__presets, self.__rows) if id(preset) in orders]
+        if len(kept) != len(self.__presets):
+            self.__presets = [preset for preset, row in kept]
+            self.__rows = [row for preset, row in kept]
+            self.__matrix = None
+        self.__pending_presets = [preset for preset in self.__pending_presets if id(preset) in orders]
+        known_ids = set(id(preset) for preset in self.__presets + self.__pending_presets)
+        for preset in presets:
+            if id(preset) in known_ids:
+                continue
+            if preset.is_loaded():
+                self.__compile(preset)
+            else:
+                self.__pending_presets.append(preset)
+
+    def get_nb_pending(self):
+        """
+        Getter of the number of presets not compiled because not loaded yet
+        :return: number of presets pending
+        """
+        return len(self.__pending_presets)
+
+    def compile_pending(self, max_count):
+        """
+        Load and compile some of the presets pending
+        :param max_count: maximum number of presets compiled
+        :return: number of presets compiled
+        """
+        nb_compiled = 0
+        while len(self.__pending_presets) > 0 and nb_compiled < max_count:
+            preset = self.__pending_presets.pop(0)
+            if preset.load():
+                self.__compile(preset)
+                nb_compiled += 1
+        return nb_compiled
+
+    def __get_matrix(self):
+        """
+        Getter of the matrix of the rows (an array built again only if the rows changed when NumPy is available)
+        :return: matrix
+        """
+        if np is None:
+            return self.__rows
+        if self.__matrix is None:
+            self.__matrix = np.array(self.__rows, dtype=float).reshape(len(self.__rows), self.__nb_slots)
+        return self.__matrix
+
+    def __get_scene_vector(self, scene_preset):
+        """
+        Getter of the values of the scene in the layout of the slots
+        :param scene_preset
+        :return: vector (NaN where the scene has no value)
+        """
+        vector = [float("nan")] * self.__nb_slots
+        for (part_name, field_name), (first_slot, nb_components) in self.__slots.items():
+            if not scene_preset.contains(part_name, field_name):
+                continue
+            components = get_field_components(scene_preset.get(part_name, field_name))
+            if components is not None and len(components) == nb_components:
+                vector[first_slot:first_slot + nb_components] = components
+        return vector
+
+    def __get_differences(self, scene_vector):
+        """
+        Compute in one pass the number of fields of each preset differing from the scene and the sum of the relative
+        differences (to choose between the presets with the same number of fields differing)
+        :param scene_vector
+        :return: list of (number of components differing, relative difference, number of components compared)
+        """
+        matrix = self.__get_matrix()
+        if np is not None:
+            scene = np.array(scene_vector, dtype=float)
+            compared = ~np.isnan(matrix) & ~np.isnan(scene)
+            delta = np.where(compared, np.abs(matrix - scene), 0.0)
+            scale = np.maximum(np.abs(scene), 1.0)
+            differing = delta > FIELD_TOLERANCE
+            return list(zip(differing.sum(axis=1).tolist(), (delta / scale).sum(axis=1).tolist(),
+                            compared.sum(axis=1).tolist()))
+        differences = []
+        for row in matrix:
+            nb_differing = 0
+            relative_difference = 0.0
+            nb_compared = 0
+            for value, scene_value in zip(row, scene_vector):
+                if value != value or scene_value != scene_value:
+                    continue
+                nb_compared += 1
+                delta = abs(value - scene_value)
+                if delta > FIELD_TOLERANCE:
+                    nb_differing += 1
+                relative_difference += delta / max(abs(scene_value), 1.0)
+            differences.append((nb_differing, relative_difference, nb_compared))
+        return differences
+
+    def find_nearest(self, scene_preset):
+        """
+        Find the preset matching the scene exactly or the nearest one
+        :param scene_preset
+        :return: preset, is exact, fields differing ; or None if no preset can be compared
+        """
+        if len(self.__presets) == 0 or self.__nb_slots == 0:
+            return None
+        scene_vector = self.__get_scene_vector(scene_preset)
+        best_index = None
+        best_difference = None
+        for index, (nb_differing, relative_difference, nb_compared) in \
+                enumerate(self.__get_differences(scene_vector)):
+            if nb_compared == 0:
+                continue
+            difference = (nb_differing, relative_difference, self.__orders[id(self.__presets[index])])
+            if best_difference is None or difference < best_difference:
+                best_index = index
+                best_difference = difference
+        if best_index is None:
+            return None
+        preset = self.__presets[best_index]
+        row = self.__rows[best_index]
+        fields_differing = []
+        for slot, scene_value in enumerate(scene_vector):
+            value = float(row[slot])
+            field = self.__slot_fields[slot]
+            if value == value and scene_value == scene_value and abs(value - scene_value) > FIELD_TOLERANCE \
+                    and field not in fields_differing:
+                fields_differing.append(field)
+        return preset, len(fields_differing) == 0, fields_differing
@@ -0,0 +1,154 @@
+import re
+from bisect import bisect_left
+
+
+class PresetSearchIndex:
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Presets indexed by key
+        self.__presets = {}
+        # Lowercase names by key (for the fuzzy matches)
+        self.__names = {}
+        # Tokens by key and keys by token (words of the name, of the parts and of the fields)
+        self.__tokens = {}
+        self.__keys_by_token = {}
+        # Tokens sorted for the prefix lookups (None when it has to be sorted again)
+        self.__sorted_tokens = None
+        # Keys of the presets whose fields are not indexed yet (not loaded until a search needs them)
+        self.__keys_fields_pending = set()
+
+    @staticmethod
+    def __tokenize(text):
+        """
+        Split a text in lowercase tokens : the whole text and its words
+        :param text
+        :return: tokens
+        """
+        text = text.lower()
+        return [text] + [word for word in re.split(r"[_\W]+", text) if word]
+
+    def __get_field_tokens(self, preset):
+        """
+        Getter of the tokens of the parts and of the fields of a preset
+        :param preset
+        :return: tokens
+        """
+        tokens = set()
+        for part_name, fields in preset.items():
+            tokens.update(self.__tokenize(part_name))
+            for field_name in fields.keys():
+                tokens.update(self.__tokenize(field_name))
+        return tokens
+
+    def __add_tokens(self, key, tokens):
+        """
+        Index tokens of a preset
+        :param key
+        :param tokens
+        :return:
+        """
+        self.__tokens[key].update(tokens)
+        for token in tokens:
+            self.__keys_by_token.setdefault(token, set()).add(key)
+        self.__sorted_tokens = None
+
+    def add(self, key, preset):
+        """
+        Index a preset (the fields of a preset not loaded are indexed on the first search)
+        :param key
+        :param preset
+        :return:
+        """
+        self.remove(key)
+        self.__presets[key] = preset
+        self.__names[key] = preset.get_name().lower()
+        self.__tokens[key] = set()
+        self.__add_tokens(key, self.__tokenize(preset.get_name()))
+        if preset.is_loaded():
+            self.__add_tokens(key, self.__get_field_tokens(preset))
+        else:
+            self.__keys_fields_pending.add(key)
+
+    def remove(self, key):
+        """
+        Remove a preset from the index
+        :param key
+        :return:
+        """
+        if key not in self.__presets:
+            return
+        for token in self.__tokens.pop(key):
+            keys = self.__keys_by_token[token]
+            keys.discard(key)
+            if len(keys) == 0:
+                del self.__keys_by_token[token]
+        del self.__presets[key]
+        del self.__names[key]
+        self.__keys_fields_pending.discard(key)
+        self.__sorted_tokens = None
+
+    def sync(self, presets_by_key):
+        """
+        Update the index to the given presets : only the new or replaced presets are indexed
+        :param presets_by_key
+        :return: whether the index changed
+        """
+        changed = False
+        for key in [key for key in self.__presets if key not in presets_by_key]:
+            self.remove(key)
+            changed = True
+        for key, preset in presets_by_key.items():
+            if self.__presets.get(key) is not preset:
+                self.add(key, preset)
+                changed = True
+        return changed
+
+    def __get_prefix_keys(self, term):
+        """
+        Getter of the keys of the presets having a token starting with a term
+        :param term
+        :return: keys
+        """
+        if self.__sorted_tokens is None:
+            self.__sorted_tokens = sorted(self.__keys_by_token.keys())
+        keys = set()
+        index = bisect_left(self.__sorted_tokens, term)
+        while index < len(self.__sorted_tokens) and self.__sorted_tokens[index].startswith(term):
+            keys.update(self.__keys_by_token[self.__sorted_tokens[index]])
+            index += 1
+        return keys
+
+    def __get_fuzzy_keys(self, term):
+        """
+        Getter of the keys of the presets whose name contains the characters of a term in order
+        :param term
+        :return: keys
+        """
+        keys = set()
+        for key, name in self.__names.items():
+            chars = iter(name)
+            if all(char in chars for char in term):
+                keys.add(key)
+        return keys
+
+    def search(self, query):
+        """
+        Search the presets matching every term of a query by prefix (name, parts and fields) or fuzzily (name)
+        :param query
+        :return: keys of the presets matching or None if the query is empty
+        """
+        terms = query.lower().split()
+        if len(terms) == 0:
+            return None
+        for key in self.__keys_fields_pending:
+            self.__add_tokens(key, self.__get_field_tokens(self.__presets[key]))
+        self.__keys_fields_pending.clear()
+        result = None
+        for term in terms:
+            keys = self.__get_prefix_keys(term) | self.__get_fuzzy_keys(term)
+            result = keys if result is None else result & keys
+            if len(result) == 0:
+                break
+        return result
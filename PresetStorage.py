@@ -0,0 +1,297 @@
+import base64
+import json
+import os.path
+import zlib
+from functools import partial
+
+from common.utils import *
+from .Preset import *
+from .backends.SceneBackend import *
+
+# Version of the format of the presets stored (the older versions can be loaded, not the newer ones)
+# 2 : a key by preset, 3 : name of the active preset in the index and sidecar file with a line by preset
+PRESETS_FORMAT_VERSION = 3
+
+# Key of the index of the presets and prefix of the key of each preset in the file info of the scene
+_INDEX_KEY = "controlRoomPresets"
+_PRESET_KEY_PREFIX = "controlRoomPreset_"
+# Key of the presets in the version 1 (all the presets in a single escaped JSON string)
+_LEGACY_KEY = "presets"
+
+# Environment variables to store the presets uncompressed ("0") and in a file next to the scene ("1")
+_ENV_COMPRESSION = "CONTROL_ROOM_PRESETS_COMPRESSION"
+_ENV_SIDECAR = "CONTROL_ROOM_PRESETS_SIDECAR"
+_SIDECAR_SUFFIX = ".presets.json"
+
+# Prefixes of the encoded values (base64 so that no quote has to be escaped in the scene file)
+_COMPRESSED_PREFIX = "z:"
+_PLAIN_PREFIX = "b:"
+
+_STORAGE_FILE_INFO = "fileInfo"
+_STORAGE_SIDECAR = "sidecar"
+
+
+class PresetStorage:
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.__compress = os.environ.get(_ENV_COMPRESSION, "1") != "0"
+        self.__use_sidecar = os.environ.get(_ENV_SIDECAR, "0") == "1"
+        # Names of the presets stored in the file info of the scene (to remove the keys not used anymore)
+        self.__stored_names = set()
+        self.__has_legacy_key = False
+        # Incremented by each load and scene change : the lazy presets of a previous generation refuse to load
+        self.__generation = 0
+
+    def __encode(self, data):
+        """
+        Encode data to a string without quotes
+        :param data
+        :return: encoded string
+        """
+        raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        if self.__compress:
+            return _COMPRESSED_PREFIX + base64.b64encode(zlib.compress(raw)).decode("ascii")
+        return _PLAIN_PREFIX + base64.b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def __decode(value):
+        """
+        Decode a string encoded by __encode
+        :param value
+        :return: data
+        """
+        if value.startswith(_COMPRESSED_PREFIX):
+            raw = zlib.decompress(base64.b64decode(value[len(_COMPRESSED_PREFIX):]))
+        elif value.startswith(_PLAIN_PREFIX):
+            raw = base64.b64decode(value[len(_PLAIN_PREFIX):])
+        else:
+            raise ValueError("Unknown preset encoding")
+        return json.loads(raw.decode("utf-8"))
+
+    @staticmethod
+    def __get_sidecar_path():
+        """
+        Getter of the path of the file next to the scene
+        :return: path or None if the scene has never been saved
+        """
+        scene_path = SceneBackend.get_instance().get_scene_path()
+        if scene_path is None:
+            return None
+        return os.path.splitext(scene_path)[0] + _SIDECAR_SUFFIX
+
+    def __load_legacy(self, file_info_presets):
+        """
+        Load the presets stored in the version 1
+        :param file_info_presets
+        :return: preset dicts
+        """
+        try:
+            return json.loads(file_info_presets.replace("\\\"", "\""))
+        except:
+            print_warning("Error while trying to parse an existing preset")
+            return []
+
+    def __load_fields(self, name, load_preset_dict):
+        """
+        Load the fields of a lazy preset
+        :param name
+        :param load_preset_dict: function returning the dict of the preset or None if it can't be read
+        :return: fields or None if they can't be loaded
+        """
+        try:
+            preset_dict = load_preset_dict()
+        except:
+            print_warning("Error while trying to parse an existing preset : " + name)
+            return None
+        if preset_dict is None:
+            return None
+        preset_dict.pop("name", None)
+        preset_dict.pop("active", None)
+        return preset_dict
+
+    def __load_sidecar(self, version):
+        """
+        Load the presets stored in the file next to the scene. Only the header is parsed, the line of a preset is
+        parsed when its fields are accessed
+        :param version
+        :return: presets
+        """
+        sidecar_path = self.__get_sidecar_path()
+        if sidecar_path is None or not os.path.isfile(sidecar_path):
+            print_warning("The presets file of the scene has not been found")
+            return []
+        try:
+            with open(sidecar_path, "r") as f:
+                if version < 3:
+                    return self.__create_presets(json.load(f)["presets"])
+                lines = f.read().split("\n")
+            header = json.loads(lines[0])
+        except:
+            print_warning("Error while trying to parse the presets file : " + sidecar_path)
+            return []
+        presets = []
+        for line_index, name in enumerate(header["names"], 1):
+            presets.append(Preset.create_lazy(
+                name, partial(self.__load_fields, name, partial(json.loads, lines[line_index])),
+                name == header["active"]))
+        return presets
+
+    def __read_file_info_preset(self, key, generation):
+        """
+        Read and decode a preset stored in the file info of the scene it was indexed from
+        :param key
+        :param generation: generation of the load that indexed the preset
+        :return: preset dict or None if the scene changed or the key is missing
+        """
+        if generation != self.__generation:
+            print_warning("The preset " + key[len(_PRESET_KEY_PREFIX):] + " belongs to a previous scene, not loaded")
+            return None
+        value = SceneBackend.get_instance().get_file_info(key)
+        if value is None:
+            print_warning("The preset " + key[len(_PRESET_KEY_PREFIX):] + " is not stored in the scene anymore")
+            return None
+        return self.__decode(value)
+
+    def __load_file_info(self, index):
+        """
+        Load the presets stored in the file info of the scene. Only the index is parsed, the key of a preset is read
+        and parsed when its fields are accessed
+        :param index
+        :return: presets
+        """
+        backend = SceneBackend.get_instance()
+        self.__stored_names.update(index["names"])
+        if "active" not in index:
+            # Version 2 : the active state is only in the presets
+            preset_dicts = []
+            for name in index["names"]:
+                value = backend.get_file_info(_PRESET_KEY_PREFIX + name)
+                try:
+                    preset_dicts.append(self.__decode(value))
+                except:
+                    print_warning("Error while trying to parse an existing preset : " + name)
+            return self.__create_presets(preset_dicts)
+        presets = []
+        for name in index["names"]:
+            load_preset_dict = partial(self.__read_file_info_preset, _PRESET_KEY_PREFIX + name, self.__generation)
+            presets.append(Preset.create_lazy(
+                name, partial(self.__load_fields, name, load_preset_dict), name == index["active"]))
+        return presets
+
+    @staticmethod
+    def __create_presets(preset_dicts):
+        """
+        Create the presets from their dicts
+        :param preset_dicts
+        :return: presets
+        """
+        presets = []
+        for preset_dict in preset_dicts:
+            try:
+                presets.append(Preset.create_from_existant(preset_dict))
+            except:
+                print_warning("Error while trying to parse an existing preset")
+        return presets
+
+    def load(self):
+        """
+        Load the presets of the scene (the fields of the presets in the current format are loaded on demand)
+        :return: presets
+        """
+        backend = SceneBackend.get_instance()
+        self.__generation += 1
+        self.__stored_names = set()
+        file_info_legacy = backend.get_file_info(_LEGACY_KEY)
+        self.__has_legacy_key = file_info_legacy is not None
+        file_info_index = backend.get_file_info(_INDEX_KEY)
+        if file_info_index is None:
+            return [] if file_info_legacy is None else self.__create_presets(self.__load_legacy(file_info_legacy))
+        try:
+            index = self.__decode(file_info_index)
+        except:
+            print_warning("Error while trying to parse the index of the presets")
+            return []
+        if index["version"] > PRESETS_FORMAT_VERSION:
+            print_warning(["The presets have been saved by a newer version of the Control Room",
+                           "They have not been loaded"])
+            return []
+        if index["storage"] == _STORAGE_SIDECAR:
+            return self.__load_sidecar(index["version"])
+        return self.__load_file_info(index)
+
+    def invalidate(self):
+        """
+        Invalidate the presets loaded as the scene changed : the lazy presets not loaded yet won't be read from the
+        new scene
+        :return:
+        """
+        self.__generation += 1
+
+    def __write_sidecar(self, presets):
+        """
+        Write all the presets in the file next to the scene
+        :param presets
+        :return: success
+        """
+        sidecar_path = self.__get_sidecar_path()
+        if sidecar_path is None:
+            print_warning("The scene has never been saved, the presets are stored in the scene")
+            return False
+        active_preset = next((preset for preset in presets if preset.is_active()), None)
+        header = {
+            "version": PRESETS_FORMAT_VERSION,
+            "active": None if active_preset is None else active_preset.get_name(),
+            "names": [preset.get_name() for preset in presets],
+        }
+        try:
+            with open(sidecar_path, "w") as f:
+                # A line by preset so that a preset is parsed only when its fields are accessed
+                f.write(json.dumps(header))
+                for preset in presets:
+                    f.write("\n" + json.dumps(preset.to_preset_array(), separators=(",", ":")))
+            return True
+        except:
+            print_warning("Error while trying to write the presets file : " + sidecar_path)
+            return False
+
+    def write(self, presets, dirty_names):
+        """
+        Write the presets changed. In the file info only the keys of the presets changed are written
+        :param presets: all the presets
+        :param dirty_names: names of the presets added, changed or removed since the last write
+        :return:
+        """
+        backend = SceneBackend.get_instance()
+        presets_by_name = {preset.get_name(): preset for preset in presets}
+        if self.__use_sidecar and self.__write_sidecar(presets):
+            storage = _STORAGE_SIDECAR
+            names_to_write = set()
+        else:
+            storage = _STORAGE_FILE_INFO
+            # The presets not stored in the file info yet (previous version, sidecar file) are written too
+            names_to_write = set(dirty_names) | (presets_by_name.keys() - self.__stored_names)
+        for name in names_to_write:
+            if name in presets_by_name:
+                preset = presets_by_name[name]
+                if not preset.load():
+                    # Its fields can't be read anymore : its key is kept as it is
+                    continue
+                backend.set_file_info(_PRESET_KEY_PREFIX + name, self.__encode(preset.to_preset_array()))
+                self.__stored_names.add(name)
+        for name in list(self.__stored_names):
+            if name not in presets_by_name or storage != _STORAGE_FILE_INFO:
+                backend.remove_file_info(_PRESET_KEY_PREFIX + name)
+                self.__stored_names.discard(name)
+        active_preset = next((preset for preset in presets if preset.is_active()), None)
+        index = {
+            "version": PRESETS_FORMAT_VERSION,
+            "storage": storage,
+            "active": None if active_preset is None else active_preset.get_name(),
+            "names": [preset.get_name() for preset in presets] if storage == _STORAGE_FILE_INFO else [],
+        }
+        backend.set_file_info(_INDEX_KEY, self.__encode(index))
+        if self.__has_legacy_key:
+            backend.remove_file_info(_LEGACY_KEY)
+            self.__has_legacy_key = False
@@ -0,0 +1,97 @@
+import time
+from collections import deque
+
+from PySide2.QtCore import *
+
+# Number of flushes kept in the statistics
+_NB_FLUSH_STATS = 50
+
+
+class RefreshScheduler:
+    def __init__(self, dirty_tracker):
+        """
+        Constructor
+        :param dirty_tracker
+        """
+        self.__dirty_tracker = dirty_tracker
+        self.__nb_requests = 0
+        self.__flush_stats = deque(maxlen=_NB_FLUSH_STATS)
+        # Single shot timer of interval 0 : flush once on the next tick of the Qt event loop
+        self.__timer = QTimer()
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(0)
+        self.__timer.timeout.connect(self.flush)
+
+    def __schedule(self, nb_requests):
+        """
+        Count some requests and schedule a flush if there is not one pending
+        :param nb_requests
+        :return:
+        """
+        self.__nb_requests += nb_requests
+        if self.__dirty_tracker.has_dirty() and not self.__timer.isActive():
+            self.__timer.start()
+
+    def request(self, refresher):
+        """
+        Request the refresh of a refresh function
+        :param refresher
+        :return:
+        """
+        self.__schedule(self.__dirty_tracker.mark(refresher))
+
+    def request_plug(self, plug):
+        """
+        Request the refresh of the refresh functions depending on a plug
+        :param plug
+        :return:
+        """
+        self.__schedule(self.__dirty_tracker.mark_plug(plug))
+
+    def request_preset(self, preset):
+        """
+        Request the refresh of the refresh functions depending on the keys of a preset
+        :param preset
+        :return:
+        """
+        self.__schedule(self.__dirty_tracker.mark_preset(preset))
+
+    def request_all(self):
+        """
+        Request the refresh of all the refresh functions
+        :return:
+        """
+        self.__schedule(self.__dirty_tracker.mark_all())
+
+    def flush(self):
+        """
+        Call once every refresh function requested since the last flush
+        :return:
+        """
+        self.__timer.stop()
+        start_time = time.perf_counter()
+        nb_refreshed = self.__dirty_tracker.refresh_dirty()
+        nb_requests = self.__nb_requests
+        self.__nb_requests = 0
+        if nb_requests == 0 and nb_refreshed == 0:
+            return
+        self.__flush_stats.append({
+            "requests": nb_requests,
+            "refreshed": nb_refreshed,
+            "merged": max(nb_requests - nb_refreshed, 0),
+            "time": time.perf_counter() - start_time,
+        })
+
+    def cancel(self):
+        """
+        Cancel the pending flush
+        :return:
+        """
+        self.__timer.stop()
+
+    def get_stats(self):
+        """
+        Getter of the statistics of the last flushes
+        :return: list of stats (requests received, refreshed, merged and time spent in seconds)
+        """
+        return list(self.__flush_stats)
@@ -0,0 +1,418 @@
+from enum import Enum
+from functools import partial
+
+import maya.OpenMaya as OpenMaya
+import maya.cmds as cmds
+import maya.utils
+
+from .backends.SceneBackend import *
+
+_CAMERA_TYPE = "camera"
+_RENDERABLE_ATTR = "renderable"
+
+
+class CameraSetMode(Enum):
+    """
+    Cameras edited by the camera parts
+    """
+    RenderCamera = 0
+    Renderable = 1
+    Selection = 2
+    Pattern = 3
+
+
+class SceneContext:
+    # ################################################### Singleton ####################################################
+    __instance = None
+
+    @staticmethod
+    def get_instance():
+        """
+        Getter of the instance for the Singleton pattern
+        :return: instance of SceneContext
+        """
+        if SceneContext.__instance is None:
+            SceneContext.__instance = SceneContext()
+        return SceneContext.__instance
+
+    # ################################################### Singleton ####################################################
+
+    def __init__(self):
+        # Renderable state by camera shape in the order of the scan (None when it has to be scanned again)
+        self.__renderable_by_camera = None
+        self.__render_camera = None
+        # Cameras edited by the parts : mode, cameras picked (Selection) and name pattern (Pattern)
+        self.__camera_set_mode = CameraSetMode.RenderCamera
+        self.__picked_cameras = []
+        self.__camera_set_pattern = ""
+        # Cameras matching the pattern, resolved when the pattern or the cameras of the scene change
+        self.__pattern_cameras = []
+        # First camera of the set (the one displayed by the parts) as last notified
+        self.__primary_camera = None
+        # Callbacks of the camera nodes and cameras by hash of their node, callbacks of the DG and of the renames
+        self.__camera_callbacks = {}
+        self.__cameras_by_hash = {}
+        self.__callbacks = []
+        self.__observing = False
+        # Callbacks called with the new primary camera when the render camera or the camera set changes
+        self.__subscribers = []
+        self.__nb_scans = 0
+
+    def __scan(self):
+        """
+        Index all the cameras and their renderable state in one batch
+        :return:
+        """
+        scene_backend = SceneBackend.get_instance()
+        cameras = scene_backend.ls(_CAMERA_TYPE)
+        values = scene_backend.get_many([camera + "." + _RENDERABLE_ATTR for camera in cameras])
+        self.__renderable_by_camera = {camera: bool(values.get(camera + "." + _RENDERABLE_ATTR, False))
+                                       for camera in cameras}
+        self.__nb_scans += 1
+        self.__resolve_pattern()
+        self.__update_render_camera()
+
+    def __update_render_camera(self):
+        """
+        Update the render camera (the first renderable camera) and notify the subscribers if it or the primary camera
+        changed
+        :return:
+        """
+        render_camera = None
+        for camera, renderable in self.__renderable_by_camera.items():
+            if renderable:
+                render_camera = camera
+                break
+        if render_camera != self.__render_camera:
+            self.__render_camera = render_camera
+            self.__notify()
+        elif self.get_primary_camera() != self.__primary_camera:
+            self.__notify()
+
+    def __notify(self):
+        """
+        Notify the subscribers with the primary camera
+        :return:
+        """
+        self.__primary_camera = self.get_primary_camera()
+        for callback in list(self.__subscribers):
+            callback(self.__primary_camera)
+
+    def get_render_camera(self):
+        """
+        Getter of the render camera (scanned only if the cameras are not indexed)
+        :return: camera shape or None
+        """
+        if self.__renderable_by_camera is None:
+            self.__scan()
+        return self.__render_camera
+
+    def get_renderable_cameras(self):
+        """
+        Getter of the renderable cameras
+        :return: camera shapes
+        """
+        if self.__renderable_by_camera is None:
+            self.__scan()
+        return [camera for camera, renderable in self.__renderable_by_camera.items() if renderable]
+
+    def set_camera_set(self, mode, pattern=None):
+        """
+        Setter of the cameras edited by the parts. The Selection mode picks the cameras selected now (or under the
+        transforms selected)
+        :param mode: CameraSetMode
+        :param pattern: name pattern with wildcards of the Pattern mode (the current one is kept if None)
+        :return:
+        """
+        self.__camera_set_mode = mode
+        if mode == CameraSetMode.Selection:
+            self.__picked_cameras = cmds.ls(selection=True, dag=True, type=_CAMERA_TYPE) or []
+        if pattern is not None:
+            self.__camera_set_pattern = pattern
+        self.__resolve_pattern()
+        self.__notify()
+
+    def __resolve_pattern(self):
+        """
+        Resolve the cameras matching the pattern of the Pattern mode (once by change of the pattern or of the cameras
+        instead of on every access)
+        :return:
+        """
+        self.__pattern_cameras = []
+        if self.__camera_set_mode != CameraSetMode.Pattern:
+            return
+        for pattern in self.__camera_set_pattern.split():
+            try:
+                matches = cmds.ls(pattern, dag=True, type=_CAMERA_TYPE) or []
+            except RuntimeError:
+                continue
+            self.__pattern_cameras.extend(camera for camera in matches if camera not in self.__pattern_cameras)
+
+    def get_camera_set_mode(self):
+        """
+        Getter of the mode of the camera set
+        :return: CameraSetMode
+        """
+        return self.__camera_set_mode
+
+    def get_camera_set_pattern(self):
+        """
+        Getter of the name pattern of the camera set
+        :return: pattern
+        """
+        return self.__camera_set_pattern
+
+    def get_edited_cameras(self):
+        """
+        Getter of the cameras of the set edited by the parts
+        :return: camera shapes
+        """
+        if self.__renderable_by_camera is None:
+            self.__scan()
+        if self.__camera_set_mode == CameraSetMode.Renderable:
+            return self.get_renderable_cameras()
+        if self.__camera_set_mode == CameraSetMode.Selection:
+            # The cameras deleted since they were picked are dropped
+            return [camera for camera in self.__picked_cameras if camera in self.__renderable_by_camera]
+        if self.__camera_set_mode == CameraSetMode.Pattern:
+            return list(self.__pattern_cameras)
+        return [] if self.__render_camera is None else [self.__render_camera]
+
+    def get_primary_camera(self):
+        """
+        Getter of the primary camera : the first camera of the set, displayed by the parts
+        :return: camera shape or None if the set is empty
+        """
+        cameras = self.get_edited_cameras()
+        return cameras[0] if len(cameras) > 0 else None
+
+    def is_camera(self, name):
+        """
+        Getter of whether a node is a camera shape
+        :param name
+        :return: is camera
+        """
+        if self.__renderable_by_camera is None:
+            self.__scan()
+        return name in self.__renderable_by_camera
+
+    def invalidate(self):
+        """
+        Invalidate the index of the cameras (scanned again on the next access)
+        :return:
+        """
+        self.__renderable_by_camera = None
+
+    def subscribe(self, callback):
+        """
+        Subscribe a callback to the changes of the render camera and of the camera set. The callback receives the
+        primary camera
+        :param callback
+        :return:
+        """
+        if callback not in self.__subscribers:
+            self.__subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Unsubscribe a callback from the changes of the cameras
+        :param callback
+        :return:
+        """
+        if callback in self.__subscribers:
+            self.__subscribers.remove(callback)
+
+    def get_stats(self):
+        """
+        Getter of the statistics of the context
+        :return: stats
+        """
+        return {
+            "scans": self.__nb_scans,
+            "cameras": 0 if self.__renderable_by_camera is None else len(self.__renderable_by_camera),
+            "camera_callbacks": len(self.__camera_callbacks),
+            "camera_set": self.__camera_set_mode.name,
+        }
+
+    # ################################################### Callbacks ####################################################
+
+    @staticmethod
+    def __get_camera_name(node):
+        """
+        Getter of the name of a camera shape as listed by ls
+        :param node: MObject
+        :return: name
+        """
+        return OpenMaya.MFnDagNode(node).partialPathName()
+
+    def __add_camera_callback(self, camera, node):
+        """
+        Add the renderable changed callback of a camera node (the camera is found by the hash of its node so the
+        callback is kept when the camera is renamed)
+        :param camera
+        :param node: MObject
+        :return:
+        """
+        node_hash = OpenMaya.MObjectHandle(node).hashCode()
+        self.__cameras_by_hash[node_hash] = camera
+        self.__camera_callbacks[node_hash] = \
+            OpenMaya.MNodeMessage.addAttributeChangedCallback(node, self.__on_camera_attribute_changed)
+
+    def __remove_camera_callback(self, node_hash):
+        """
+        Remove the callback of a camera node
+        :param node_hash
+        :return:
+        """
+        callback = self.__camera_callbacks.pop(node_hash, None)
+        if callback is None:
+            return
+        try:
+            OpenMaya.MMessage.removeCallback(callback)
+        except RuntimeError:
+            pass
+
+    def __on_camera_added(self, node, *args):
+        """
+        On a camera created index it once it is in the DAG (deferred)
+        :param node: MObject
+        :return:
+        """
+        maya.utils.executeDeferred(partial(self.__index_camera, OpenMaya.MObjectHandle(node)))
+
+    def __index_camera(self, handle):
+        """
+        Index a camera created
+        :param handle: MObjectHandle
+        :return:
+        """
+        if not self.__observing or not handle.isValid() or self.__renderable_by_camera is None:
+            return
+        node = handle.object()
+        camera = self.__get_camera_name(node)
+        self.__renderable_by_camera[camera] = OpenMaya.MFnDependencyNode(node).findPlug(_RENDERABLE_ATTR).asBool()
+        self.__add_camera_callback(camera, node)
+        self.__resolve_pattern()
+        self.__update_render_camera()
+
+    def __on_camera_removed(self, node, *args):
+        """
+        On a camera deleted remove it from the index
+        :param node: MObject
+        :return:
+        """
+        node_hash = OpenMaya.MObjectHandle(node).hashCode()
+        camera = self.__cameras_by_hash.pop(node_hash, None)
+        self.__remove_camera_callback(node_hash)
+        if camera is None or self.__renderable_by_camera is None:
+            return
+        self.__renderable_by_camera.pop(camera, None)
+        # The node is still listed by ls while its removal is notified so it is only dropped from the cameras resolved
+        if camera in self.__pattern_cameras:
+            self.__pattern_cameras.remove(camera)
+        self.__update_render_camera()
+
+    def __on_camera_attribute_changed(self, msg, plug, other_plug, *args):
+        """
+        On the renderable attribute of a camera set update the index
+        :param msg
+        :param plug
+        :param other_plug
+        :return:
+        """
+        if not msg & OpenMaya.MNodeMessage.kAttributeSet:
+            return
+        if OpenMaya.MFnAttribute(plug.attribute()).name() != _RENDERABLE_ATTR:
+            return
+        camera = self.__cameras_by_hash.get(OpenMaya.MObjectHandle(plug.node()).hashCode())
+        if self.__renderable_by_camera is not None and camera in self.__renderable_by_camera:
+            self.__renderable_by_camera[camera] = plug.asBool()
+            self.__update_render_camera()
+
+    def __on_node_renamed(self, node, previous_name, *args):
+        """
+        On a node renamed rename the camera in the index if it is an indexed camera (deferred as the pattern is
+        resolved again with ls)
+        :param node: MObject
+        :param previous_name
+        :return:
+        """
+        if OpenMaya.MObjectHandle(node).hashCode() in self.__cameras_by_hash:
+            maya.utils.executeDeferred(partial(self.__rename_camera, OpenMaya.MObjectHandle(node)))
+
+    def __rename_camera(self, handle):
+        """
+        Rename a camera in the index keeping its order and in the cameras picked
+        :param handle: MObjectHandle
+        :return:
+        """
+        if not self.__observing or not handle.isValid() or self.__renderable_by_camera is None:
+            return
+        node_hash = handle.hashCode()
+        camera = self.__cameras_by_hash.get(node_hash)
+        new_camera = self.__get_camera_name(handle.object())
+        if camera is None or camera == new_camera:
+            return
+        self.__cameras_by_hash[node_hash] = new_camera
+        self.__renderable_by_camera = {(new_camera if cam == camera else cam): renderable
+                                       for cam, renderable in self.__renderable_by_camera.items()}
+        self.__picked_cameras = [new_camera if cam == camera else cam for cam in self.__picked_cameras]
+        self.__resolve_pattern()
+        self.__update_render_camera()
+
+    def __reconcile(self):
+        """
+        Reconcile the index kept while the callbacks were removed with the cameras of the scene (the renderable state
+        of all the cameras is read again in one batch as it was not observed)
+        :return:
+        """
+        scene_backend = SceneBackend.get_instance()
+        cameras = scene_backend.ls(_CAMERA_TYPE)
+        values = scene_backend.get_many([camera + "." + _RENDERABLE_ATTR for camera in cameras])
+        self.__renderable_by_camera = {camera: bool(values.get(camera + "." + _RENDERABLE_ATTR, False))
+                                       for camera in cameras}
+        self.__resolve_pattern()
+        self.__update_render_camera()
+
+    def add_callbacks(self):
+        """
+        Add the callbacks that keep the index of the cameras up to date (the cameras are scanned only if the index
+        has been invalidated)
+        :return:
+        """
+        if self.__observing:
+            return
+        if self.__renderable_by_camera is None:
+            self.__scan()
+        else:
+            self.__reconcile()
+        for camera in self.__renderable_by_camera.keys():
+            try:
+                selection = OpenMaya.MSelectionList()
+                selection.add(camera)
+                node = OpenMaya.MObject()
+                selection.getDependNode(0, node)
+                self.__add_camera_callback(camera, node)
+            except RuntimeError:
+                pass
+        self.__callbacks.append(OpenMaya.MDGMessage.addNodeAddedCallback(self.__on_camera_added, _CAMERA_TYPE))
+        self.__callbacks.append(OpenMaya.MDGMessage.addNodeRemovedCallback(self.__on_camera_removed, _CAMERA_TYPE))
+        # A single callback for the renames of all the nodes
+        self.__callbacks.append(
+            OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject.kNullObj, self.__on_node_renamed))
+        self.__observing = True
+
+    def remove_callbacks(self):
+        """
+        Remove the callbacks of the cameras (the index is kept, it is invalidated when a scene is opened)
+        :return:
+        """
+        if not self.__observing:
+            return
+        for callback in self.__callbacks:
+            OpenMaya.MMessage.removeCallback(callback)
+        self.__callbacks = []
+        for node_hash in list(self.__camera_callbacks.keys()):
+            self.__remove_camera_callback(node_hash)
+        self.__cameras_by_hash.clear()
+        self.__observing = False
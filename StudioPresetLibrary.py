@@ -0,0 +1,280 @@
+import hashlib
+import json
+import os
+import threading
+
+from PySide2.QtCore import *
+
+from common.utils import *
+from .Preset import *
+
+# Environment variables of the shared root of the presets, of the context and of the local cache
+_ENV_PRESETS_ROOT = "CONTROL_ROOM_PRESETS_ROOT"
+_ENV_SHOW = "CONTROL_ROOM_SHOW"
+_ENV_SEQUENCE = "CONTROL_ROOM_SEQUENCE"
+_ENV_SHOT = "CONTROL_ROOM_SHOT"
+_ENV_PRESETS_CACHE = "CONTROL_ROOM_PRESETS_CACHE"
+_DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "control_room", "presets")
+
+# File listing the presets of a layer with the hash of their content
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+_PRESET_EXTENSION = ".preset"
+
+
+def get_content_hash(content):
+    """
+    Getter of the hash of the content of a preset file
+    :param content: bytes
+    :return: hash
+    """
+    return hashlib.sha1(content).hexdigest()
+
+
+def _write_json_atomic(path, data):
+    """
+    Write a json file so that a reader never reads it partially written
+    :param path
+    :param data
+    :return:
+    """
+    tmp_path = path + ".tmp" + str(os.getpid())
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def generate_manifest(directory):
+    """
+    Generate the manifest of a layer directory by reading all its presets
+    :param directory
+    :return: manifest
+    """
+    presets = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(_PRESET_EXTENSION):
+            continue
+        with open(os.path.join(directory, file_name), "rb") as f:
+            presets.append({"path": file_name, "hash": get_content_hash(f.read())})
+    return {"version": MANIFEST_VERSION, "presets": presets}
+
+
+def write_manifest(directory):
+    """
+    Write the manifest of a layer directory (to run by the pipeline each time the presets of a layer change)
+    :param directory
+    :return: manifest
+    """
+    manifest = generate_manifest(directory)
+    _write_json_atomic(os.path.join(directory, MANIFEST_FILENAME), manifest)
+    return manifest
+
+
+class StudioPresetRefresher(QRunnable):
+    def __init__(self, library):
+        """
+        Constructor
+        :param library
+        """
+        super(StudioPresetRefresher, self).__init__()
+        self.__library = library
+
+    def run(self):
+        """
+        Refresh the local cache of the library in the thread pool
+        :return:
+        """
+        self.__library.refresh()
+
+
+class StudioPresetLibrary:
+    def __init__(self, root=None, show=None, sequence=None, shot=None, cache_dir=None):
+        """
+        Constructor (the arguments not given are read from the environment)
+        :param root: shared directory of the presets
+        :param show
+        :param sequence
+        :param shot
+        :param cache_dir: local directory of the cache
+        """
+        self.__root = os.environ.get(_ENV_PRESETS_ROOT) if root is None else root
+        self.__context = [
+            os.environ.get(_ENV_SHOW) if show is None else show,
+            os.environ.get(_ENV_SEQUENCE) if sequence is None else sequence,
+            os.environ.get(_ENV_SHOT) if shot is None else shot,
+        ]
+        self.__cache_dir = os.environ.get(_ENV_PRESETS_CACHE, _DEFAULT_CACHE_DIR) if cache_dir is None else cache_dir
+        # Presets compiled by content hash
+        self.__presets_by_hash = {}
+        # Entries (layer, path, hash) of the last load to detect the changes
+        self.__loaded_entries = None
+        self.__refresh_lock = threading.Lock()
+        # Warnings of the refresh (run in a worker thread where Maya can't be called) printed by the next load
+        self.__pending_warnings = []
+        self.__warnings_lock = threading.Lock()
+
+    def get_layer_directories(self):
+        """
+        Getter of the directories of the layers from the least to the most specific (show, sequence then shot)
+        :return: directories
+        """
+        directories = []
+        if not self.__root:
+            return directories
+        directory = self.__root
+        for name in self.__context:
+            if not name:
+                break
+            directory = os.path.join(directory, name)
+            directories.append(directory)
+        return directories
+
+    def __get_object_path(self, content_hash):
+        """
+        Getter of the path of a preset in the local cache
+        :param content_hash
+        :return: path
+        """
+        return os.path.join(self.__cache_dir, "objects", content_hash + _PRESET_EXTENSION)
+
+    def __get_local_manifest_path(self, directory):
+        """
+        Getter of the path of the local copy of the manifest of a layer
+        :param directory
+        :return: path
+        """
+        return os.path.join(self.__cache_dir, "manifests", get_content_hash(directory.encode("utf-8")) + ".json")
+
+    @staticmethod
+    def __read_shared_manifest(directory):
+        """
+        Read the manifest of a layer on the share (or list the layer if it has none)
+        :param directory
+        :return: manifest or None if the layer does not exist
+        """
+        if not os.path.isdir(directory):
+            return None
+        manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+            if manifest.get("version", 0) <= MANIFEST_VERSION:
+                return manifest
+        # No manifest usable : every file has to be read to be hashed
+        return generate_manifest(directory)
+
+    def __add_warning(self, message):
+        """
+        Keep a warning of the refresh to print it from the main thread
+        :param message
+        :return:
+        """
+        with self.__warnings_lock:
+            self.__pending_warnings.append(message)
+
+    def __print_pending_warnings(self):
+        """
+        Print the warnings of the refreshes (from the main thread)
+        :return:
+        """
+        with self.__warnings_lock:
+            warnings = self.__pending_warnings
+            self.__pending_warnings = []
+        for message in warnings:
+            print_warning(message)
+
+    def __fetch(self, directory, entry):
+        """
+        Copy a preset of a layer in the local cache if its content is not there yet
+        :param directory
+        :param entry: entry of the manifest
+        :return:
+        """
+        object_path = self.__get_object_path(entry["hash"])
+        if os.path.isfile(object_path):
+            return
+        with open(os.path.join(directory, entry["path"]), "rb") as f:
+            content = f.read()
+        if get_content_hash(content) != entry["hash"]:
+            self.__add_warning("The manifest of " + directory + " is outdated for " + entry["path"])
+        tmp_path = object_path + ".tmp" + str(os.getpid())
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, object_path)
+
+    def refresh(self):
+        """
+        Refresh the local cache from the share : a read of the manifest by layer and a read of the presets whose
+        content is not cached yet (blocking, run it in a StudioPresetRefresher). Maya is not called : the warnings are
+        printed by the next load
+        :return:
+        """
+        if not self.__refresh_lock.acquire(blocking=False):
+            return
+        try:
+            os.makedirs(os.path.join(self.__cache_dir, "objects"), exist_ok=True)
+            os.makedirs(os.path.join(self.__cache_dir, "manifests"), exist_ok=True)
+            for directory in self.get_layer_directories():
+                try:
+                    manifest = self.__read_shared_manifest(directory)
+                    local_manifest_path = self.__get_local_manifest_path(directory)
+                    if manifest is None:
+                        if os.path.isfile(local_manifest_path):
+                            os.remove(local_manifest_path)
+                        continue
+                    for entry in manifest["presets"]:
+                        self.__fetch(directory, entry)
+                    _write_json_atomic(local_manifest_path, manifest)
+                except:
+                    self.__add_warning("Error while trying to refresh the presets of " + directory)
+        finally:
+            self.__refresh_lock.release()
+
+    def start_refresh(self):
+        """
+        Refresh the local cache in the background
+        :return:
+        """
+        if len(self.get_layer_directories()) > 0:
+            QThreadPool.globalInstance().start(StudioPresetRefresher(self))
+
+    def __compile(self, content_hash):
+        """
+        Getter of a preset of the local cache compiled once by content hash
+        :param content_hash
+        :return: preset or None if the preset is not valid
+        """
+        if content_hash not in self.__presets_by_hash:
+            object_path = self.__get_object_path(content_hash)
+            try:
+                with open(object_path, "r") as f:
+                    self.__presets_by_hash[content_hash] = Preset.create_from_existant(json.load(f))
+            except:
+                print_warning("Error while trying to parse a studio preset : " + object_path)
+                self.__presets_by_hash[content_hash] = None
+        return self.__presets_by_hash[content_hash]
+
+    def load(self):
+        """
+        Load the presets of the layers from the local cache (nothing is read on the share) and print the warnings of
+        the refreshes
+        :return: presets from the least to the most specific layer, whether the library changed
+        """
+        self.__print_pending_warnings()
+        entries = []
+        for layer_index, directory in enumerate(self.get_layer_directories()):
+            local_manifest_path = self.__get_local_manifest_path(directory)
+            if not os.path.isfile(local_manifest_path):
+                continue
+            try:
+                with open(local_manifest_path, "r") as f:
+                    manifest = json.load(f)
+                for entry in manifest["presets"]:
+                    if os.path.isfile(self.__get_object_path(entry["hash"])):
+                        entries.append((layer_index, entry["path"], entry["hash"]))
+            except:
+                print_warning("Error while trying to read the cached manifest of " + directory)
+        changed = entries != self.__loaded_entries
+        self.__loaded_entries = entries
+        presets = [self.__compile(content_hash) for layer_index, path, content_hash in entries]
+        return [preset for preset in presets if preset is not None], changed
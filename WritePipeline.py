@@ -0,0 +1,111 @@
+from PySide2.QtCore import *
+
+# Minimum interval between two writes of a plug being dragged
+_THROTTLE_INTERVAL_MS = 50
+
+
+class WritePipeline:
+    def __init__(self, control_room):
+        """
+        Constructor
+        :param control_room
+        """
+        self.__control_room = control_room
+        # Value of the plugs when their drag began by plug
+        self.__initial_values = {}
+        # Latest value not written yet by plug (latest value wins)
+        self.__pending_values = {}
+        self.__nb_requests = 0
+        self.__nb_writes = 0
+        self.__nb_commits = 0
+        self.__timer = QTimer()
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(_THROTTLE_INTERVAL_MS)
+        self.__timer.timeout.connect(self.__write_pending)
+
+    def is_dragging(self, plug):
+        """
+        Getter of whether a plug is being dragged
+        :param plug
+        :return: is dragging
+        """
+        return plug in self.__initial_values
+
+    def begin(self, plug):
+        """
+        Begin the drag of a plug
+        :param plug
+        :return:
+        """
+        if plug not in self.__initial_values:
+            self.__initial_values[plug] = self.__control_room.get_attr(plug)
+
+    def update(self, plug, value):
+        """
+        Request the write of a value during the drag of a plug. The writes are rate limited and not undoable
+        :param plug
+        :param value
+        :return:
+        """
+        if plug not in self.__initial_values:
+            # Not dragged (keyboard, wheel, click on the groove...) so write right away
+            self.__control_room.set_attr(plug, value)
+            return
+        self.__nb_requests += 1
+        self.__pending_values[plug] = value
+        if not self.__timer.isActive():
+            self.__timer.start()
+
+    def __write_pending(self):
+        """
+        Write the latest values requested
+        :return:
+        """
+        pending_values = self.__pending_values
+        self.__pending_values = {}
+        for plug, value in pending_values.items():
+            self.__control_room.set_attr(plug, value, undoable=False)
+            self.__nb_writes += 1
+
+    def commit(self, plug, value):
+        """
+        End the drag of a plug and write its final value as a single undoable change
+        :param plug
+        :param value
+        :return:
+        """
+        self.__pending_values.pop(plug, None)
+        if len(self.__pending_values) == 0:
+            self.__timer.stop()
+        if plug not in self.__initial_values:
+            self.__control_room.set_attr(plug, value)
+            return
+        initial_value = self.__initial_values.pop(plug)
+        # Restore the initial value silently so that undo goes back to it in one step
+        self.__control_room.set_attr(plug, initial_value, undoable=False)
+        if value != initial_value:
+            self.__control_room.set_attr(plug, value)
+        self.__nb_commits += 1
+
+    def cancel(self, plug):
+        """
+        End the drag of a plug and restore its initial value
+        :param plug
+        :return:
+        """
+        self.__pending_values.pop(plug, None)
+        if len(self.__pending_values) == 0:
+            self.__timer.stop()
+        if plug in self.__initial_values:
+            self.__control_room.set_attr(plug, self.__initial_values.pop(plug), undoable=False)
+
+    def get_stats(self):
+        """
+        Getter of the statistics of the pipeline
+        :return: stats
+        """
+        return {
+            "requests": self.__nb_requests,
+            "writes": self.__nb_writes,
+            "commits": self.__nb_commits,
+        }
@@ -0,0 +1,89 @@
+from .SceneBackend import *
+
+
+class MemorySceneBackend(SceneBackend):
+    def __init__(self, values=None, nodes=None, scene_path=None):
+        """
+        Constructor
+        :param values: values by plug
+        :param nodes: node names by node type
+        :param scene_path
+        """
+        self.__values = {} if values is None else dict(values)
+        self.__nodes = {} if nodes is None else {node_type: list(names) for node_type, names in nodes.items()}
+        self.__locked = set()
+        self.__connected = set()
+        self.__file_info = {}
+        self.__scene_path = scene_path
+
+    def add_node(self, name, node_type):
+        """
+        Add a node
+        :param name
+        :param node_type
+        :return:
+        """
+        self.__nodes.setdefault(node_type, []).append(name)
+
+    def set_locked(self, plug, locked):
+        """
+        Setter of the locked state of a plug
+        :param plug
+        :param locked
+        :return:
+        """
+        if locked:
+            self.__locked.add(plug)
+        else:
+            self.__locked.discard(plug)
+
+    def set_connected(self, plug, connected):
+        """
+        Setter of the connected state of a plug
+        :param plug
+        :param connected
+        :return:
+        """
+        if connected:
+            self.__connected.add(plug)
+        else:
+            self.__connected.discard(plug)
+
+    def get(self, plug):
+        if plug not in self.__values:
+            raise RuntimeError("No object matches name: " + plug)
+        return self.__values[plug]
+
+    def set(self, plug, value):
+        if plug in self.__locked:
+            raise RuntimeError("The attribute '" + plug + "' is locked or connected and cannot be modified.")
+        self.__values[plug] = tuple(value) if type(value) is list else value
+
+    def is_locked(self, plug):
+        return plug in self.__locked
+
+    def is_connected(self, plug):
+        return plug in self.__connected
+
+    def exists(self, name):
+        if name in self.__values:
+            return True
+        for names in self.__nodes.values():
+            if name in names:
+                return True
+        return False
+
+    def ls(self, node_type):
+        return list(self.__nodes.get(node_type, []))
+
+    def get_file_info(self, key):
+        return self.__file_info.get(key)
+
+    def set_file_info(self, key, value):
+        self.__file_info[key] = value
+
+    def remove_file_info(self, key):
+        self.__file_info.pop(key, None)
+
+    def get_scene_path(self):
+        return self.__scene_path
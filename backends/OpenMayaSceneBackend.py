@@ -0,0 +1,136 @@
+import maya.api.OpenMaya as OpenMaya2
+import maya.cmds as cmds
+
+from .SceneBackend import *
+
+_INT_NUMERIC_TYPES = {
+    OpenMaya2.MFnNumericData.kByte,
+    OpenMaya2.MFnNumericData.kChar,
+    OpenMaya2.MFnNumericData.kShort,
+    OpenMaya2.MFnNumericData.kInt,
+    OpenMaya2.MFnNumericData.kInt64,
+}
+
+
+def read_plug_value(mplug, plug_name):
+    """
+    Read the value of a simple plug with the type of its attribute
+    :param mplug
+    :param plug_name: used for the types not handled
+    :return: value
+    """
+    attr = mplug.attribute()
+    if attr.hasFn(OpenMaya2.MFn.kNumericAttribute):
+        numeric_type = OpenMaya2.MFnNumericAttribute(attr).numericType()
+        if numeric_type == OpenMaya2.MFnNumericData.kBoolean:
+            return mplug.asBool()
+        if numeric_type in _INT_NUMERIC_TYPES:
+            return mplug.asInt()
+        if numeric_type == OpenMaya2.MFnNumericData.kFloat:
+            return mplug.asFloat()
+        if numeric_type == OpenMaya2.MFnNumericData.kDouble:
+            return mplug.asDouble()
+    elif attr.hasFn(OpenMaya2.MFn.kEnumAttribute):
+        return mplug.asShort()
+    return cmds.getAttr(plug_name)
+
+
+class OpenMayaSceneBackend(SceneBackend):
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Resolved plugs by name with the handle of their node to detect the deleted nodes
+        self.__mplugs = {}
+
+    def __get_mplug(self, plug):
+        """
+        Getter of the MPlug of a plug (resolved once)
+        :param plug
+        :return: MPlug
+        """
+        if plug in self.__mplugs:
+            handle, mplug = self.__mplugs[plug]
+            if handle.isValid():
+                return mplug
+        selection = OpenMaya2.MSelectionList()
+        selection.add(plug)
+        mplug = selection.getPlug(0)
+        self.__mplugs[plug] = (OpenMaya2.MObjectHandle(mplug.node()), mplug)
+        return mplug
+
+    def get(self, plug):
+        return read_plug_value(self.__get_mplug(plug), plug)
+
+    def get_many(self, plugs):
+        # Resolve all the unknown plugs with a single selection list
+        selection = OpenMaya2.MSelectionList()
+        added = []
+        for plug in plugs:
+            if plug in self.__mplugs and self.__mplugs[plug][0].isValid():
+                continue
+            try:
+                selection.add(plug)
+                added.append(plug)
+            except RuntimeError:
+                # Plug doesn't exist (node deleted, Arnold not loaded...)
+                pass
+        for index, plug in enumerate(added):
+            mplug = selection.getPlug(index)
+            self.__mplugs[plug] = (OpenMaya2.MObjectHandle(mplug.node()), mplug)
+        values = {}
+        for plug in plugs:
+            if plug in self.__mplugs:
+                values[plug] = read_plug_value(self.__mplugs[plug][1], plug)
+        return values
+
+    def set(self, plug, value):
+        # Through cmds to stay undoable
+        if type(value) in (list, tuple):
+            cmds.setAttr(plug, *value)
+        else:
+            cmds.setAttr(plug, value)
+
+    def set_without_undo(self, plug, value):
+        undo_enabled = cmds.undoInfo(query=True, state=True)
+        if undo_enabled:
+            cmds.undoInfo(stateWithoutFlush=False)
+        try:
+            self.set(plug, value)
+        finally:
+            if undo_enabled:
+                cmds.undoInfo(stateWithoutFlush=True)
+
+    def open_undo_chunk(self, name):
+        cmds.undoInfo(openChunk=True, chunkName=name)
+
+    def close_undo_chunk(self):
+        cmds.undoInfo(closeChunk=True)
+
+    def is_locked(self, plug):
+        return self.__get_mplug(plug).isLocked
+
+    def is_connected(self, plug):
+        return self.__get_mplug(plug).isConnected
+
+    def exists(self, name):
+        return cmds.objExists(name)
+
+    def ls(self, node_type):
+        return cmds.ls(type=node_type) or []
+
+    def get_file_info(self, key):
+        values = cmds.fileInfo(key, query=True)
+        return values[0] if values else None
+
+    def set_file_info(self, key, value):
+        cmds.fileInfo(key, value)
+
+    def remove_file_info(self, key):
+        cmds.fileInfo(remove=key)
+
+    def get_scene_path(self):
+        return cmds.file(query=True, sceneName=True) or None
+
+    def clear_cache(self):
+        self.__mplugs.clear()
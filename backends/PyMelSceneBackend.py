@@ -0,0 +1,62 @@
+from .SceneBackend import *
+
+
+class PyMelSceneBackend(SceneBackend):
+    def __init__(self):
+        """
+        Constructor (PyMEL is only imported when this backend is chosen)
+        """
+        import pymel.core as pm
+        self.__pm = pm
+
+    def get(self, plug):
+        return self.__pm.getAttr(plug)
+
+    def set(self, plug, value):
+        if type(value) in (list, tuple):
+            self.__pm.setAttr(plug, *value)
+        else:
+            self.__pm.setAttr(plug, value)
+
+    def set_without_undo(self, plug, value):
+        undo_enabled = self.__pm.undoInfo(query=True, state=True)
+        if undo_enabled:
+            self.__pm.undoInfo(stateWithoutFlush=False)
+        try:
+            self.set(plug, value)
+        finally:
+            if undo_enabled:
+                self.__pm.undoInfo(stateWithoutFlush=True)
+
+    def open_undo_chunk(self, name):
+        self.__pm.undoInfo(openChunk=True, chunkName=name)
+
+    def close_undo_chunk(self):
+        self.__pm.undoInfo(closeChunk=True)
+
+    def is_locked(self, plug):
+        return self.__pm.Attribute(plug).isLocked()
+
+    def is_connected(self, plug):
+        return self.__pm.Attribute(plug).isConnected()
+
+    def exists(self, name):
+        return self.__pm.objExists(name)
+
+    def ls(self, node_type):
+        return [node.name() for node in self.__pm.ls(type=node_type)]
+
+    def get_file_info(self, key):
+        if key in self.__pm.fileInfo:
+            return self.__pm.fileInfo[key]
+        return None
+
+    def set_file_info(self, key, value):
+        self.__pm.fileInfo[key] = value
+
+    def remove_file_info(self, key):
+        if key in self.__pm.fileInfo:
+            del self.__pm.fileInfo[key]
+
+    def get_scene_path(self):
+        return str(self.__pm.sceneName()) or None
@@ -0,0 +1,172 @@
+import os
+from abc import *
+
+# Environment variable to choose the scene backend at startup ("openmaya" or "pymel")
+_ENV_SCENE_BACKEND = "CONTROL_ROOM_SCENE_BACKEND"
+
+
+class SceneBackend(ABC):
+    # ################################################### Singleton ####################################################
+    __instance = None
+
+    @staticmethod
+    def get_instance():
+        """
+        Getter of the backend chosen at startup for the Singleton pattern
+        :return: instance of SceneBackend
+        """
+        if SceneBackend.__instance is None:
+            if os.environ.get(_ENV_SCENE_BACKEND, "openmaya").lower() == "pymel":
+                from .PyMelSceneBackend import PyMelSceneBackend
+                SceneBackend.__instance = PyMelSceneBackend()
+            else:
+                from .OpenMayaSceneBackend import OpenMayaSceneBackend
+                SceneBackend.__instance = OpenMayaSceneBackend()
+        return SceneBackend.__instance
+
+    @staticmethod
+    def set_instance(backend):
+        """
+        Setter of the backend replacing the one chosen from the environment (a MemorySceneBackend for instance)
+        :param backend
+        :return:
+        """
+        SceneBackend.__instance = backend
+
+    # ################################################### Singleton ####################################################
+
+    @abstractmethod
+    def get(self, plug):
+        """
+        Get the value of a plug
+        :param plug: "node.attribute"
+        :return: value
+        """
+        pass
+
+    def get_many(self, plugs):
+        """
+        Get the values of several plugs in one batch
+        :param plugs
+        :return: values by plug (the plugs not readable are missing)
+        """
+        values = {}
+        for plug in plugs:
+            try:
+                values[plug] = self.get(plug)
+            except:
+                pass
+        return values
+
+    @abstractmethod
+    def set(self, plug, value):
+        """
+        Set the value of a plug
+        :param plug: "node.attribute"
+        :param value: a tuple or a list for the compound attributes
+        :return:
+        """
+        pass
+
+    def set_without_undo(self, plug, value):
+        """
+        Set the value of a plug without recording it in the undo queue
+        :param plug: "node.attribute"
+        :param value: a tuple or a list for the compound attributes
+        :return:
+        """
+        self.set(plug, value)
+
+    def open_undo_chunk(self, name):
+        """
+        Open a chunk grouping the next changes in a single undo step
+        :param name
+        :return:
+        """
+        pass
+
+    def close_undo_chunk(self):
+        """
+        Close the chunk opened by open_undo_chunk
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def is_locked(self, plug):
+        """
+        Getter of whether a plug is locked
+        :param plug
+        :return: is locked
+        """
+        pass
+
+    @abstractmethod
+    def is_connected(self, plug):
+        """
+        Getter of whether a plug is connected
+        :param plug
+        :return: is connected
+        """
+        pass
+
+    @abstractmethod
+    def exists(self, name):
+        """
+        Getter of whether a node or a plug exists
+        :param name
+        :return: exists
+        """
+        pass
+
+    @abstractmethod
+    def ls(self, node_type):
+        """
+        List the nodes of a type
+        :param node_type
+        :return: node names
+        """
+        pass
+
+    @abstractmethod
+    def get_file_info(self, key):
+        """
+        Get a value stored in the file info of the scene
+        :param key
+        :return: value or None
+        """
+        pass
+
+    @abstractmethod
+    def set_file_info(self, key, value):
+        """
+        Store a value in the file info of the scene
+        :param key
+        :param value
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def remove_file_info(self, key):
+        """
+        Remove a value stored in the file info of the scene
+        :param key
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def get_scene_path(self):
+        """
+        Getter of the path of the scene
+        :return: path or None if the scene has never been saved
+        """
+        pass
+
+    def clear_cache(self):
+        """
+        Clear the data the backend may cache (plugs resolved...)
+        :return:
+        """
+        pass
@@ -1,12 +1,17 @@
 import importlib
+import os
+import sys
 from common import utils
 
-utils.unload_packages(silent=True, package="control_room")
-importlib.import_module("control_room")
+# The window is kept between the launches : the package is only reloaded on the first launch of the session or if
+# asked (CONTROL_ROOM_RELOAD=1 to test changes of the code)
+if "control_room.ControlRoom" not in sys.modules or os.environ.get("CONTROL_ROOM_RELOAD", "0") == "1":
+    try:
+        control_room.delete_instance()
+    except:
+        pass
+    utils.unload_packages(silent=True, package="control_room")
+    importlib.import_module("control_room")
 from control_room.ControlRoom import ControlRoom
-try:
-    control_room.close()
-except:
-    pass
-control_room = ControlRoom()
-control_room.show()
+# CONTROL_ROOM_DOCKABLE=1 to show it in a workspace control
+control_room = ControlRoom.show_instance(dockable=os.environ.get("CONTROL_ROOM_DOCKABLE", "0") == "1")
@@ -1,6 +1,5 @@
 from ..ControlRoomPart import *
 from ..FormSlider import *
-import pymel.core as pm
 
 
 class AdaptiveSamplingPart(ControlRoomPart):
@@ -18,8 +17,6 @@ class AdaptiveSamplingPart(ControlRoomPart):
                        "defaultArnoldRenderOptions.AAAdaptiveThreshold", "adaptive_treshold", 0, 1),
         ]
         self.__ui_enable_cb = None
-        self.__enable_callback = None
-        self.__layer_callback = None
         self.__adaptive_sampling_override = None
         self.__action_add_adaptive_sampling_override = QAction(text="Add Override")
         self.__action_add_adaptive_sampling_override.triggered.connect(self.__create_adaptive_sampling_override)
@@ -49,8 +46,8 @@ class AdaptiveSamplingPart(ControlRoomPart):
         Retrieve the override for the adaptive sampling field
         :return:
         """
-        self.__adaptive_sampling_override = cr.ControlRoom.retrieve_override("defaultArnoldRenderOptions",
-                                                                             "enableAdaptiveSampling")
+        self.__adaptive_sampling_override = self._control_room.get_layer_context().get_override(
+            "defaultArnoldRenderOptions", "enableAdaptiveSampling")
 
     def populate(self):
         """
@@ -82,18 +79,27 @@ class AdaptiveSamplingPart(ControlRoomPart):
         :return:
         """
         try:
-            adaptive_sampling_enabled = pm.getAttr("defaultArnoldRenderOptions.enableAdaptiveSampling")
+            self.__refresh_adaptive_sampling()
             for fs in self.__form_sliders:
                 fs.refresh_ui()
+        except:
+            pass
 
-            visible_layer = render_setup.instance().getVisibleRenderLayer()
-            is_default_layer = visible_layer.name() == "defaultRenderLayer"
+    def __refresh_adaptive_sampling(self):
+        """
+        Refresh the enable adaptive sampling checkbox
+        :return:
+        """
+        try:
+            adaptive_sampling_enabled = self._control_room.get_attr("defaultArnoldRenderOptions.enableAdaptiveSampling")
+            self.__retrieve_adaptive_sampling_override()
+            is_default_layer = self._control_room.get_layer_context().is_default()
             self.__action_add_adaptive_sampling_override.setEnabled(
                 not is_default_layer and self.__adaptive_sampling_override is None)
             self.__action_remove_adaptive_sampling_override.setEnabled(
                 not is_default_layer and self.__adaptive_sampling_override is not None)
 
-            stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
+            state = self._control_room.get_field_state(
                 self._part_name, "enable_adaptive_sampling",
                 adaptive_sampling_enabled, self.__adaptive_sampling_override)
 
@@ -105,11 +111,22 @@ class AdaptiveSamplingPart(ControlRoomPart):
             else:
                 self.__ui_enable_cb.setChecked(adaptive_sampling_enabled)
 
-            self.__ui_enable_cb.setStyleSheet("QCheckBox{" + stylesheet_lbl + "}")
-            self.__retrieve_adaptive_sampling_override()
+            self._control_room.set_widget_state(self.__ui_enable_cb, state)
         except:
             pass
 
+    def register_fields(self, dirty_tracker):
+        """
+        Register the refresh functions of the part with the plugs and preset keys they depend on
+        :param dirty_tracker
+        :return:
+        """
+        dirty_tracker.register(self.__refresh_adaptive_sampling,
+                               ["defaultArnoldRenderOptions.enableAdaptiveSampling"],
+                               [(self._part_name, "enable_adaptive_sampling")])
+        for fs in self.__form_sliders:
+            fs.register_fields(dirty_tracker)
+
     def __on_enable_changed(self, state):
         """
         On checkbox enable adaptive sampling changed
@@ -117,28 +134,38 @@ class AdaptiveSamplingPart(ControlRoomPart):
         :return:
         """
         if not self._preset_hovered:
-            pm.setAttr("defaultArnoldRenderOptions.enableAdaptiveSampling", state == 2)
+            self._control_room.set_attr("defaultArnoldRenderOptions.enableAdaptiveSampling", state == 2)
 
     def add_callbacks(self):
         """
         Add the callbacks
         :return:
         """
-        self.__enable_callback = pm.scriptJob(
-            attributeChange=["defaultArnoldRenderOptions.enableAdaptiveSampling", self.refresh_ui])
+        self._control_room.get_callback_hub().subscribe("defaultArnoldRenderOptions.enableAdaptiveSampling",
+                                                        self._control_room.on_plug_changed)
         for fs in self.__form_sliders:
             fs.add_callbacks()
-        self.__layer_callback = pm.scriptJob(event=["renderLayerManagerChange", self.refresh_ui])
 
     def remove_callbacks(self):
         """
         Remoave the callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__enable_callback)
+        self._control_room.get_callback_hub().unsubscribe("defaultArnoldRenderOptions.enableAdaptiveSampling",
+                                                          self._control_room.on_plug_changed)
         for fs in self.__form_sliders:
             fs.remove_callbacks()
-        pm.scriptJob(kill=self.__layer_callback)
+
+    def get_fields(self):
+        """
+        Getter of the fields of the part stored on a plug
+        :return: list of (part_name, key in the preset, plug)
+        """
+        fields = [(self._part_name, "enable_adaptive_sampling", "defaultArnoldRenderOptions.enableAdaptiveSampling")]
+        for fs in self.__form_sliders:
+            key, field = fs.get_key_preset_and_field()
+            fields.append((self._part_name, key, field))
+        return fields
 
     def add_to_preset(self, preset):
         """
@@ -146,10 +173,11 @@ class AdaptiveSamplingPart(ControlRoomPart):
         :param preset
         :return:
         """
-        preset.set(self._part_name, "enable_adaptive_sampling", pm.getAttr("defaultArnoldRenderOptions.enableAdaptiveSampling"))
+        preset.set(self._part_name, "enable_adaptive_sampling",
+                   self._control_room.get_attr("defaultArnoldRenderOptions.enableAdaptiveSampling"))
         for fs in self.__form_sliders:
             key, field = fs.get_key_preset_and_field()
-            preset.set(self._part_name, key, pm.getAttr(field))
+            preset.set(self._part_name, key, self._control_room.get_attr(field))
 
     def apply(self, preset):
         """
@@ -158,8 +186,8 @@ class AdaptiveSamplingPart(ControlRoomPart):
         :return:
         """
         if preset.contains(self._part_name, "enable_adaptive_sampling"):
-            pm.setAttr("defaultArnoldRenderOptions.enableAdaptiveSampling", preset.get(self._part_name, "enable_adaptive_sampling"))
+            self._control_room.set_attr("defaultArnoldRenderOptions.enableAdaptiveSampling", preset.get(self._part_name, "enable_adaptive_sampling"))
         for fs in self.__form_sliders:
             key, field = fs.get_key_preset_and_field()
             if preset.contains(self._part_name, key):
-                pm.setAttr(field, preset.get(self._part_name, key))
+                self._control_room.set_attr(field, preset.get(self._part_name, key))
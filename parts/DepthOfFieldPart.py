@@ -1,6 +1,7 @@
 from ..ControlRoom import *
 from ..ControlRoomPart import *
-import pymel.core as pm
+from ..backends.SceneBackend import *
+from ..SceneContext import *
 
 
 class DepthOfFieldPart(ControlRoomPart):
@@ -12,32 +13,28 @@ class DepthOfFieldPart(ControlRoomPart):
         """
         super(DepthOfFieldPart, self).__init__(control_room, "Depth of Field", part_name)
         self.__no_refresh = False
-        self.__cam = None
-        for cam in pm.ls(type="camera"):
-            if cam.renderable.get():
-                self.__cam = cam
-                break
+        # Primary camera of the camera set (displayed, the edits go to all the cameras of the set)
+        self.__cam = SceneContext.get_instance().get_primary_camera()
+        self.__dirty_tracker = None
         self.__ui_dof_cb = None
         self.__ui_lbl_fstop = None
         self.__ui_line_edit_fstop = None
-        self.__camera_dof_callback = None
-        self.__camera_fstop_callback = None
-        if self.__cam is not None : self.add_dynamic_callbacks()
 
     def populate(self):
         """
         Generate the UI content of the DepthOfFieldPart
         :return: content
         """
-        content = QHBoxLayout()
+        content = QVBoxLayout()
         content.setContentsMargins(4, 4, 1, 4)
-
+        dof_lyt = QHBoxLayout()
+        content.addLayout(dof_lyt)
         self.__ui_dof_cb = QCheckBox("Depth of field")
         self.__ui_dof_cb.stateChanged.connect(self.__on_dof_changed)
-        content.addWidget(self.__ui_dof_cb, 1, Qt.AlignLeft)
+        dof_lyt.addWidget(self.__ui_dof_cb, 1, Qt.AlignLeft)
 
         form_layout = QFormLayout()
-        content.addLayout(form_layout, 2)
+        dof_lyt.addLayout(form_layout, 2)
 
         self.__ui_lbl_fstop = QLabel("FStop")
         self.__ui_line_edit_fstop = QLineEdit()
@@ -58,11 +55,11 @@ class DepthOfFieldPart(ControlRoomPart):
         try:
             dof_checked = False
             if self.__cam is not None and not self.__no_refresh:
-                dof_checked = self.__cam.depthOfField.get()
+                dof_checked = self._control_room.get_attr(self.__cam + ".depthOfField")
 
-                stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
+                state = self._control_room.get_field_state(
                     self._part_name, "depth_of_field", dof_checked)
-                self.__ui_dof_cb.setStyleSheet("QCheckBox{" + stylesheet_lbl + "}")
+                self._control_room.set_widget_state(self.__ui_dof_cb, state)
 
                 hovered_preset = self._control_room.get_hovered_preset()
                 if hovered_preset and hovered_preset.contains(self._part_name, "depth_of_field"):
@@ -72,10 +69,10 @@ class DepthOfFieldPart(ControlRoomPart):
                 else:
                     self.__ui_dof_cb.setChecked(dof_checked)
 
-                f_stop = round(self.__cam.fStop.get(), 3)
-                stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
+                f_stop = round(self._control_room.get_attr(self.__cam + ".fStop"), 3)
+                state = self._control_room.get_field_state(
                     self._part_name, "f_stop", f_stop)
-                self.__ui_lbl_fstop.setStyleSheet("QLabel{" + stylesheet_lbl + "}")
+                self._control_room.set_widget_state(self.__ui_lbl_fstop, state)
                 self.__ui_line_edit_fstop.setEnabled(dof_checked)
 
                 if hovered_preset and hovered_preset.contains(self._part_name, "f_stop"):
@@ -84,11 +81,13 @@ class DepthOfFieldPart(ControlRoomPart):
                     self._preset_hovered = False
                 else:
                     self.__ui_line_edit_fstop.setText(str(f_stop))
-            self.__ui_dof_cb.setEnabled(self.__cam is not None and not self.__cam.depthOfField.isLocked()
-                                        and not self.__cam.depthOfField.isConnected())
+            scene_backend = SceneBackend.get_instance()
+            self.__ui_dof_cb.setEnabled(self.__cam is not None
+                                        and not scene_backend.is_locked(self.__cam + ".depthOfField")
+                                        and not scene_backend.is_connected(self.__cam + ".depthOfField"))
             self.__ui_line_edit_fstop.setEnabled(self.__cam is not None and dof_checked
-                                                 and not self.__cam.fStop.isLocked()
-                                                 and not self.__cam.fStop.isConnected())
+                                                 and not scene_backend.is_locked(self.__cam + ".fStop")
+                                                 and not scene_backend.is_connected(self.__cam + ".fStop"))
         except:
             pass
 
@@ -100,7 +99,8 @@ class DepthOfFieldPart(ControlRoomPart):
         """
         if self.__cam is not None and not self._preset_hovered:
             self.__no_refresh = True
-            self.__cam.depthOfField.set(state == 2)
+            self._control_room.set_attrs(self.__get_edited_plugs("depthOfField"), state == 2,
+                                         "controlRoomSetDepthOfField")
             self.__no_refresh = False
 
     def __on_fstop_changed(self):
@@ -110,35 +110,103 @@ class DepthOfFieldPart(ControlRoomPart):
         """
         if self.__cam is not None and not self._preset_hovered:
             self.__no_refresh = True
-            self.__cam.fStop.set(float(self.__ui_line_edit_fstop.text()))
+            self._control_room.set_attrs(self.__get_edited_plugs("fStop"), float(self.__ui_line_edit_fstop.text()),
+                                         "controlRoomSetFStop")
             self.__no_refresh = False
 
-    def add_callbacks(self):
-        # Nothing
-        pass
+    @staticmethod
+    def __get_edited_plugs(attr_name):
+        """
+        Getter of the plugs of an attribute on all the cameras of the set (the locked and connected ones are skipped)
+        :param attr_name
+        :return: plugs
+        """
+        scene_backend = SceneBackend.get_instance()
+        plugs = []
+        for cam in SceneContext.get_instance().get_edited_cameras():
+            plug = cam + "." + attr_name
+            if not scene_backend.is_locked(plug) and not scene_backend.is_connected(plug):
+                plugs.append(plug)
+        return plugs
+
+    def __get_plugs(self):
+        """
+        Getter of the plugs of the camera the part depends on
+        :return: plugs
+        """
+        if self.__cam is None:
+            return []
+        return [self.__cam + ".depthOfField", self.__cam + ".fStop"]
 
-    def add_dynamic_callbacks(self):
+    def register_fields(self, dirty_tracker):
         """
-        Add callbacks to the current camera
+        Register the refresh of the part with the camera plugs and preset keys it depends on
+        :param dirty_tracker
         :return:
         """
-        if self.__cam is not None:
-            self.__camera_dof_callback = pm.scriptJob(
-                attributeChange=[self.__cam + '.depthOfField', self.refresh_ui])
-            self.__camera_fstop_callback = pm.scriptJob(
-                attributeChange=[self.__cam + '.fStop', self.refresh_ui])
+        self.__dirty_tracker = dirty_tracker
+        dirty_tracker.register(self.refresh_ui, self.__get_plugs(),
+                               [(self._part_name, "depth_of_field"), (self._part_name, "f_stop")])
+
+    def __set_cam(self, cam):
+        """
+        Setter of the camera and of the plugs the part depends on
+        :param cam
+        :return:
+        """
+        callback_hub = self._control_room.get_callback_hub()
+        for plug in self.__get_plugs():
+            callback_hub.unsubscribe(plug, self._control_room.on_plug_changed)
+        self.__cam = cam
+        if self.__dirty_tracker is not None:
+            self.__dirty_tracker.unregister(self.refresh_ui)
+            self.register_fields(self.__dirty_tracker)
+
+    def __on_cameras_changed(self, cam):
+        """
+        On render camera or camera set changed move the callbacks to the primary camera and refresh
+        :param cam: primary camera
+        :return:
+        """
+        if cam != self.__cam:
+            self.__set_cam(cam)
+            callback_hub = self._control_room.get_callback_hub()
+            for plug in self.__get_plugs():
+                callback_hub.subscribe(plug, self._control_room.on_plug_changed)
+        self._control_room.request_refresh(self.refresh_ui)
+
+    def add_callbacks(self):
+        """
+        Add callbacks to the primary camera (it may have changed while the callbacks were removed)
+        :return:
+        """
+        scene_context = SceneContext.get_instance()
+        if scene_context.get_primary_camera() != self.__cam:
+            self.__set_cam(scene_context.get_primary_camera())
+        scene_context.subscribe(self.__on_cameras_changed)
+        callback_hub = self._control_room.get_callback_hub()
+        for plug in self.__get_plugs():
+            callback_hub.subscribe(plug, self._control_room.on_plug_changed)
 
     def remove_callbacks(self):
         """
         Remove the callbacks from the current camera
         :return:
         """
-        if self.__camera_dof_callback is not None:
-            pm.scriptJob(kill=self.__camera_dof_callback)
-            self.__camera_dof_callback = None
-        if self.__camera_fstop_callback is not None:
-            pm.scriptJob(kill=self.__camera_fstop_callback)
-            self.__camera_fstop_callback = None
+        SceneContext.get_instance().unsubscribe(self.__on_cameras_changed)
+        callback_hub = self._control_room.get_callback_hub()
+        for plug in self.__get_plugs():
+            callback_hub.unsubscribe(plug, self._control_room.on_plug_changed)
+
+    def get_fields(self):
+        """
+        Getter of the fields of the part stored on a plug (on the primary camera)
+        :return: list of (part_name, key in the preset, plug)
+        """
+        if self.__cam is None:
+            return []
+        return [(self._part_name, "depth_of_field", self.__cam + ".depthOfField"),
+                (self._part_name, "f_stop", self.__cam + ".fStop")]
 
     def add_to_preset(self, preset):
         """
@@ -147,17 +215,18 @@ class DepthOfFieldPart(ControlRoomPart):
         :return:
         """
         if self.__cam is not None:
-            preset.set(self._part_name, "depth_of_field", self.__cam.depthOfField.get())
-            preset.set(self._part_name, "f_stop", self.__cam.fStop.get())
+            preset.set(self._part_name, "depth_of_field",
+                       self._control_room.get_attr(self.__cam + ".depthOfField"))
+            preset.set(self._part_name, "f_stop", self._control_room.get_attr(self.__cam + ".fStop"))
 
     def apply(self, preset):
         """
-        Apply a preset on the part
+        Apply a preset on the part (on all the cameras of the set)
         :param preset
         :return:
         """
-        if self.__cam is not None:
-            if preset.contains(self._part_name, "depth_of_field"):
-                self.__cam.depthOfField.set(preset.get(self._part_name, "depth_of_field"))
-            if preset.contains(self._part_name, "f_stop"):
-                self.__cam.fStop.set(preset.get(self._part_name, "f_stop"))
+        if preset.contains(self._part_name, "depth_of_field"):
+            self._control_room.set_attrs(self.__get_edited_plugs("depthOfField"),
+                                         preset.get(self._part_name, "depth_of_field"))
+        if preset.contains(self._part_name, "f_stop"):
+            self._control_room.set_attrs(self.__get_edited_plugs("fStop"), preset.get(self._part_name, "f_stop"))
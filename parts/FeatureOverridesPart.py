@@ -1,7 +1,7 @@
 import control_room.ControlRoom as cr
 from ..ControlRoom import *
 from ..ControlRoomPart import *
-import pymel.core as pm
+from ..backends.SceneBackend import *
 
 
 class IgnoreFields:
@@ -20,8 +20,6 @@ class IgnoreFields:
         self.__field_name = field_name
         self.__key_preset = key_preset
         self.__checkbox = None
-        self.__callback = None
-        self.__layer_callback = None
         self.__override = None
         self.__preset_hovered = False
         self.__action_add_override = QAction(text="Add Override")
@@ -52,7 +50,7 @@ class IgnoreFields:
         :return:
         """
         obj_attr = self.__field_name.split(".")
-        self.__override = cr.ControlRoom.retrieve_override(obj_attr[0], obj_attr[1])
+        self.__override = self.__control_room.get_layer_context().get_override(obj_attr[0], obj_attr[1])
 
     def __on_state_changed(self, state):
         """
@@ -61,7 +59,7 @@ class IgnoreFields:
         :return:
         """
         if not self.__preset_hovered:
-            pm.setAttr(self.__field_name, state == 2)
+            self.__control_room.set_attr(self.__field_name, state == 2)
 
     def get_key_preset_and_field(self):
         """
@@ -88,9 +86,9 @@ class IgnoreFields:
         :return:
         """
         try:
-            visible_layer = render_setup.instance().getVisibleRenderLayer()
-            is_default_layer = visible_layer.name() == "defaultRenderLayer"
-            val = pm.getAttr(self.__field_name)
+            self.__retrieve_override()
+            is_default_layer = self.__control_room.get_layer_context().is_default()
+            val = self.__control_room.get_attr(self.__field_name)
 
             hovered_preset = self.__control_room.get_hovered_preset()
             if hovered_preset and hovered_preset.contains(self.__part_name, self.__key_preset):
@@ -103,28 +101,33 @@ class IgnoreFields:
             self.__action_add_override.setEnabled(not is_default_layer and self.__override is None)
             self.__action_remove_override.setEnabled(not is_default_layer and self.__override is not None)
 
-            stylesheet_lbl = self.__control_room.get_stylesheet_color_for_field(self.__part_name, self.__key_preset, val, self.__override)
-            self.__checkbox.setStyleSheet("QCheckBox{" + stylesheet_lbl + "}")
-
-            self.__retrieve_override()
+            state = self.__control_room.get_field_state(self.__part_name, self.__key_preset, val, self.__override)
+            self.__control_room.set_widget_state(self.__checkbox, state)
         except:
             pass
 
+    def register_field(self, dirty_tracker):
+        """
+        Register the refresh of the checkbox with its plug and its preset key
+        :param dirty_tracker
+        :return:
+        """
+        preset_keys = [(self.__part_name, self.__key_preset)] if self.__key_preset else []
+        dirty_tracker.register(self.refresh_checkbox, [self.__field_name], preset_keys)
+
     def add_callback(self):
         """
         Add the callbacks
         :return:
         """
-        self.__callback = pm.scriptJob(attributeChange=[self.__field_name, self.refresh_checkbox])
-        self.__layer_callback = pm.scriptJob(event=["renderLayerManagerChange", self.refresh_checkbox])
+        self.__control_room.get_callback_hub().subscribe(self.__field_name, self.__control_room.on_plug_changed)
 
     def remove_callback(self):
         """
         Remove the callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__callback)
-        pm.scriptJob(kill=self.__layer_callback)
+        self.__control_room.get_callback_hub().unsubscribe(self.__field_name, self.__control_room.on_plug_changed)
 
 
 class FeatureOverridesPart(ControlRoomPart):
@@ -152,7 +155,6 @@ class FeatureOverridesPart(ControlRoomPart):
         self.__ui_ignore_aovs_cb = None
         self.__ui_output_denoising_aovs_cb = None
 
-        self.__arnold_render_callback = None
 
     def populate(self):
         """
@@ -173,10 +175,9 @@ class FeatureOverridesPart(ControlRoomPart):
 
         # Ignore AOVs
         self.__ui_ignore_aovs_cb = QCheckBox("AOVs Batch Only")
-        self.__ignore_aovs = pm.getAttr("defaultArnoldRenderOptions.aovMode") == 2
+        self.__retrieve_ignore_aovs()
         self.__ui_ignore_aovs_cb.setChecked(self.__ignore_aovs)
         self.__ui_ignore_aovs_cb.stateChanged.connect(self.__on_state_changed_ignore_aovs)
-        self.__ui_ignore_aovs_cb.setChecked(self.__ignore_aovs)
         right_content.addWidget(self.__ui_ignore_aovs_cb)
 
         # Output denoising
@@ -211,9 +212,8 @@ class FeatureOverridesPart(ControlRoomPart):
         Refresh the ignore aovs field
         :return:
         """
-        stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-            self._part_name, "ignore_aovs", self.__ignore_aovs)
-        self.__ui_ignore_aovs_cb.setStyleSheet("QCheckBox{" + stylesheet_lbl + "}")
+        self._control_room.set_widget_state(self.__ui_ignore_aovs_cb, self._control_room.get_field_state(
+            self._part_name, "ignore_aovs", self.__ignore_aovs))
         hovered_preset = self._control_room.get_hovered_preset()
         if hovered_preset and hovered_preset.contains(self._part_name, "ignore_aovs"):
             self._preset_hovered = True
@@ -227,10 +227,9 @@ class FeatureOverridesPart(ControlRoomPart):
         Refresh the output denoising aov field
         :return:
         """
-        checked = pm.ls("defaultArnoldRenderOptions")[0].outputVarianceAOVs.get()
-        stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-            self._part_name, "output_denoising", checked)
-        self.__ui_output_denoising_aovs_cb.setStyleSheet("QCheckBox{" + stylesheet_lbl + "}")
+        checked = self._control_room.get_attr("defaultArnoldRenderOptions.outputVarianceAOVs")
+        self._control_room.set_widget_state(self.__ui_output_denoising_aovs_cb, self._control_room.get_field_state(
+            self._part_name, "output_denoising", checked))
 
         hovered_preset = self._control_room.get_hovered_preset()
         if hovered_preset and hovered_preset.contains(self._part_name, "output_denoising"):
@@ -240,6 +239,19 @@ class FeatureOverridesPart(ControlRoomPart):
         else:
             self.__ui_output_denoising_aovs_cb.setChecked(checked)
 
+    def register_fields(self, dirty_tracker):
+        """
+        Register the refresh functions of the part with the plugs and preset keys they depend on
+        :param dirty_tracker
+        :return:
+        """
+        for ign_field in self.__ignore_fields:
+            ign_field.register_field(dirty_tracker)
+        dirty_tracker.register(self.__refresh_ignore_aov, ["defaultArnoldRenderOptions.aovMode"],
+                               [(self._part_name, "ignore_aovs")])
+        dirty_tracker.register(self.__refresh_output_denoising_aov, ["defaultArnoldRenderOptions.outputVarianceAOVs"],
+                               [(self._part_name, "output_denoising")])
+
     def __on_state_changed_ignore_aovs(self, state):
         """
         On ignore aov checkbox changed, set value to fields
@@ -248,7 +260,7 @@ class FeatureOverridesPart(ControlRoomPart):
         """
         if not self._preset_hovered:
             self.__ignore_aovs = state == 2
-            pm.setAttr("defaultArnoldRenderOptions.aovMode", 2 if self.__ignore_aovs else 1)
+            self._control_room.set_attr("defaultArnoldRenderOptions.aovMode", 2 if self.__ignore_aovs else 1)
             self.__refresh_ignore_aov()
 
     def __on_state_changed_output_denoising_aovs(self, state):
@@ -259,19 +271,19 @@ class FeatureOverridesPart(ControlRoomPart):
         """
         if not self._preset_hovered:
             enabled = state == 2
-            pm.ls("defaultArnoldRenderOptions")[0].outputVarianceAOVs.set(enabled)
-            if pm.objExists("defaultArnoldDriver"):
+            scene_backend = SceneBackend.get_instance()
+            self._control_room.set_attr("defaultArnoldRenderOptions.outputVarianceAOVs", enabled)
+            if scene_backend.exists("defaultArnoldDriver"):
                 multipart = True
                 if enabled:
                     multipart = False
                 else:
-                    cameras = pm.ls(type="camera")
-                    for cam in cameras:
-                        if cam.ai_translator.get() == "lentil_camera":
+                    for cam in scene_backend.ls("camera"):
+                        if scene_backend.exists(cam + ".ai_translator") and \
+                                scene_backend.get(cam + ".ai_translator") == "lentil_camera":
                             multipart = False
                             break
-                half_driver = pm.ls("defaultArnoldDriver", type="aiAOVDriver")[0]
-                half_driver.multipart.set(multipart)
+                scene_backend.set("defaultArnoldDriver.multipart", multipart)
 
             self.__refresh_output_denoising_aov()
 
@@ -280,8 +292,8 @@ class FeatureOverridesPart(ControlRoomPart):
         Add the callbacks
         :return:
         """
-        self.__arnold_render_callback = pm.scriptJob(
-            attributeChange=['defaultArnoldRenderOptions.outputVarianceAOVs', self.__refresh_output_denoising_aov])
+        self._control_room.get_callback_hub().subscribe("defaultArnoldRenderOptions.outputVarianceAOVs",
+                                                        self._control_room.on_plug_changed)
         for ign_field in self.__ignore_fields:
             ign_field.add_callback()
 
@@ -290,11 +302,39 @@ class FeatureOverridesPart(ControlRoomPart):
         Remove the callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__arnold_render_callback)
+        self._control_room.get_callback_hub().unsubscribe("defaultArnoldRenderOptions.outputVarianceAOVs",
+                                                          self._control_room.on_plug_changed)
 
         for ign_field in self.__ignore_fields:
             ign_field.remove_callback()
 
+    def get_fields(self):
+        """
+        Getter of the fields of the part stored on a plug (AOVs Batch Only is computed from the AOV mode)
+        :return: list of (part_name, key in the preset, plug)
+        """
+        fields = []
+        for ign_field in self.__ignore_fields:
+            key, field = ign_field.get_key_preset_and_field()
+            if key:
+                fields.append((self._part_name, key, field))
+        fields.append((self._part_name, "output_denoising", "defaultArnoldRenderOptions.outputVarianceAOVs"))
+        return fields
+
+    def __retrieve_ignore_aovs(self):
+        """
+        Retrieve whether the AOVs are ignored
+        :return:
+        """
+        self.__ignore_aovs = self._control_room.get_attr("defaultArnoldRenderOptions.aovMode") == 2
+
+    def rebind(self):
+        """
+        Read again the AOV mode of the new scene
+        :return:
+        """
+        self.__retrieve_ignore_aovs()
+
     def add_to_preset(self, preset):
         """
         Add fields to a preset
@@ -304,9 +344,10 @@ class FeatureOverridesPart(ControlRoomPart):
         for ign_field in self.__ignore_fields:
             key, field = ign_field.get_key_preset_and_field()
             if key:
-                preset.set(self._part_name, key, pm.getAttr(field))
+                preset.set(self._part_name, key, self._control_room.get_attr(field))
         preset.set(self._part_name, "ignore_aovs", self.__ignore_aovs)
-        preset.set(self._part_name, "output_denoising", pm.getAttr("defaultArnoldRenderOptions.outputVarianceAOVs"))
+        preset.set(self._part_name, "output_denoising",
+                   self._control_room.get_attr("defaultArnoldRenderOptions.outputVarianceAOVs"))
 
     def apply(self, preset):
         """
@@ -317,9 +358,10 @@ class FeatureOverridesPart(ControlRoomPart):
         for ign_field in self.__ignore_fields:
             key, field = ign_field.get_key_preset_and_field()
             if key and preset.contains(self._part_name, key):
-                pm.setAttr(field, preset.get(self._part_name, key))
+                self._control_room.set_attr(field, preset.get(self._part_name, key))
         if preset.contains(self._part_name, "ignore_aovs"):
             self.__ignore_aovs = preset.get(self._part_name, "ignore_aovs")
-            pm.setAttr("defaultArnoldRenderOptions.aovMode", 2 if self.__ignore_aovs else 1)
+            self._control_room.set_attr("defaultArnoldRenderOptions.aovMode", 2 if self.__ignore_aovs else 1)
         if preset.contains(self._part_name, "output_denoising"):
-            pm.setAttr("defaultArnoldRenderOptions.outputVarianceAOVs", preset.get(self._part_name, "output_denoising"))
+            self._control_room.set_attr("defaultArnoldRenderOptions.outputVarianceAOVs",
+                                        preset.get(self._part_name, "output_denoising"))
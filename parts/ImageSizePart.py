@@ -1,7 +1,8 @@
 import enum
 from ..ControlRoomPart import *
 from ..FormSlider import *
-import pymel.core as pm
+from ..backends.SceneBackend import *
+from ..SceneContext import *
 from functools import partial
 
 # Aspect Ratio datas
@@ -22,15 +23,9 @@ class ImageSizePart(ControlRoomPart):
         :param part_name
         """
         super(ImageSizePart, self).__init__(control_room, "Image Size", part_name)
-        self.__cam = None
-        for cam in pm.ls(type="camera"):
-            if cam.renderable.get():
-                self.__cam = cam
-                break
-        self.__width_callback = None
-        self.__height_callback = None
-        self.__aspect_ratio_callback = None
-        self.__overscan_callback = None
+        # Primary camera of the camera set (displayed, the overscan is set on all the cameras of the set)
+        self.__cam = SceneContext.get_instance().get_primary_camera()
+        self.__dirty_tracker = None
         self.__ratio_selected = None
         self.__is_gate_opaque = False
         self.__is_gate_enabled = False
@@ -49,7 +44,6 @@ class ImageSizePart(ControlRoomPart):
         self.__ui_enable_gate_cb = None
 
         self.__retrieve_aspect_ratio()
-        if self.__cam is not None : self.add_dynamic_callbacks()
 
     def populate(self):
         """
@@ -107,6 +101,8 @@ class ImageSizePart(ControlRoomPart):
         self.__ui_overscan_slider.setMaximum(max * 1000)
         self.__ui_overscan_slider.setMinimum(min * 1000)
         self.__ui_overscan_slider.valueChanged.connect(self.__on_slider_overscan_changed)
+        self.__ui_overscan_slider.sliderPressed.connect(self.__on_slider_overscan_pressed)
+        self.__ui_overscan_slider.sliderReleased.connect(self.__on_slider_overscan_released)
         lyt.addWidget(self.__ui_overscan_line_edit, 1)
         lyt.addWidget(self.__ui_overscan_slider, 3)
         form_lyt.addRow(self.__ui_lbl_overscan, lyt)
@@ -133,7 +129,7 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         if self.__cam is not None and not self._preset_hovered:
-            self.__cam.overscan.set(float(self.__ui_overscan_line_edit.text()))
+            self.__set_overscan(float(self.__ui_overscan_line_edit.text()))
 
     def __on_slider_overscan_changed(self, value):
         """
@@ -141,12 +137,72 @@ class ImageSizePart(ControlRoomPart):
         :param value
         :return:
         """
-        if self.__cam is not None and not self.__cam.overscan.isLocked() and not self.__cam.overscan.isConnected():
+        if self.__is_cam_attr_editable("overscan"):
             value = value / 1000
             if value > 0:
                 self.__ui_overscan_line_edit.setText(str(value))
                 if not self._preset_hovered:
-                    self.__cam.overscan.set(value)
+                    write_pipeline = self._control_room.get_write_pipeline()
+                    if write_pipeline.is_dragging(self.__cam + ".overscan"):
+                        # Rate limited on the primary camera during a drag
+                        write_pipeline.update(self.__cam + ".overscan", value)
+                    else:
+                        self.__set_overscan(value)
+
+    def __on_slider_overscan_pressed(self):
+        """
+        On slider Overscan pressed begin the drag of the overscan
+        :return:
+        """
+        if self.__is_cam_attr_editable("overscan"):
+            self._control_room.get_write_pipeline().begin(self.__cam + ".overscan")
+
+    def __on_slider_overscan_released(self):
+        """
+        On slider Overscan released commit the final value on all the cameras of the set as a single undoable change
+        (only the primary camera follows the drag)
+        :return:
+        """
+        value = self.__ui_overscan_slider.value() / 1000
+        write_pipeline = self._control_room.get_write_pipeline()
+        if self.__cam is not None and write_pipeline.is_dragging(self.__cam + ".overscan"):
+            if value > 0:
+                scene_backend = SceneBackend.get_instance()
+                scene_backend.open_undo_chunk("controlRoomSetOverscan")
+                try:
+                    write_pipeline.commit(self.__cam + ".overscan", value)
+                    self.__set_overscan(value)
+                finally:
+                    scene_backend.close_undo_chunk()
+            else:
+                write_pipeline.cancel(self.__cam + ".overscan")
+
+    def __set_overscan(self, value):
+        """
+        Set the overscan on all the cameras of the set as a single undoable change (the locked and connected ones are
+        skipped)
+        :param value
+        :return:
+        """
+        scene_backend = SceneBackend.get_instance()
+        plugs = []
+        for cam in SceneContext.get_instance().get_edited_cameras():
+            plug = cam + ".overscan"
+            if not scene_backend.is_locked(plug) and not scene_backend.is_connected(plug):
+                plugs.append(plug)
+        self._control_room.set_attrs(plugs, value, "controlRoomSetOverscan")
+
+    def __is_cam_attr_editable(self, attr_name):
+        """
+        Getter of whether an attribute of the camera can be edited (not locked nor connected)
+        :param attr_name
+        :return: is editable
+        """
+        if self.__cam is None:
+            return False
+        scene_backend = SceneBackend.get_instance()
+        plug = self.__cam + "." + attr_name
+        return not scene_backend.is_locked(plug) and not scene_backend.is_connected(plug)
 
     def __on_click_ratio_btn(self, ratio):
         """
@@ -158,9 +214,11 @@ class ImageSizePart(ControlRoomPart):
             self.__ratio_selected = None
         else:
             self.__ratio_selected = ratio
-            pm.setAttr("defaultResolution.deviceAspectRatio", _AspectRatios[self.__ratio_selected]["ratio"])
+            self._control_room.set_attr("defaultResolution.deviceAspectRatio",
+                                        _AspectRatios[self.__ratio_selected]["ratio"])
             self.__update_height()
             self.__retrieve_aspect_ratio()
+        self.__invalidate_resolution()
         self.refresh_ui()
 
     def __on_click_format_btn(self, format):
@@ -170,19 +228,29 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         width = _AspectRatios[self.__ratio_selected][format]
-        pm.setAttr("defaultResolution.width", width)
+        self._control_room.set_attr("defaultResolution.width", width)
         self.__update_height()
         self.__retrieve_aspect_ratio()
+        self.__invalidate_resolution()
         self.refresh_ui()
 
+    def __invalidate_resolution(self):
+        """
+        Invalidate the cached resolution values after writing them
+        :return:
+        """
+        for plug in ["defaultResolution.width", "defaultResolution.height", "defaultResolution.deviceAspectRatio"]:
+            self._control_room.invalidate_attr(plug)
+
     def __update_height(self):
         """
         Update the height
         :return:
         """
         if self.__ratio_selected is not None:
-            pm.setAttr("defaultResolution.height",
-                    pm.getAttr("defaultResolution.width") / _AspectRatios[self.__ratio_selected]["ratio"])
+            self._control_room.set_attr("defaultResolution.height",
+                                        self._control_room.get_attr("defaultResolution.width")
+                                        / _AspectRatios[self.__ratio_selected]["ratio"])
 
     def __update_width(self):
         """
@@ -190,8 +258,9 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         if self.__ratio_selected is not None:
-            pm.setAttr("defaultResolution.width",
-                    pm.getAttr("defaultResolution.height") * _AspectRatios[self.__ratio_selected]["ratio"])
+            self._control_room.set_attr("defaultResolution.width",
+                                        self._control_room.get_attr("defaultResolution.height")
+                                        * _AspectRatios[self.__ratio_selected]["ratio"])
 
     def __retrieve_aspect_ratio(self):
         """
@@ -199,7 +268,7 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         self.__ratio_selected = None
-        aspect_ratio = pm.getAttr("defaultResolution.deviceAspectRatio")
+        aspect_ratio = self._control_room.get_attr("defaultResolution.deviceAspectRatio")
         for name, aspect_ratio_datas in _AspectRatios.items():
             if abs(aspect_ratio - aspect_ratio_datas["ratio"]) < 0.001:
                 self.__ratio_selected = name
@@ -211,9 +280,10 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         if self.__cam is not None:
-            self.__cam.displayGateMaskOpacity.set(1.0 if self.__is_gate_opaque else 0.7)
-            self.__cam.displayGateMaskColor.set((0, 0, 0) if self.__is_gate_opaque else (0.5, 0.5, 0.5))
-            self.__cam.displayResolution.set(self.__is_gate_enabled)
+            self._control_room.set_attr(self.__cam + ".displayGateMaskOpacity", 1.0 if self.__is_gate_opaque else 0.7)
+            self._control_room.set_attr(self.__cam + ".displayGateMaskColor",
+                                        (0, 0, 0) if self.__is_gate_opaque else (0.5, 0.5, 0.5))
+            self._control_room.set_attr(self.__cam + ".displayResolution", self.__is_gate_enabled)
 
     def refresh_ui(self):
         """
@@ -222,11 +292,9 @@ class ImageSizePart(ControlRoomPart):
         """
         try:
             # Width
-            width_retrieved = pm.getAttr("defaultResolution.width")
-            stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-                self._part_name, "width", width_retrieved)
-
-            self.__ui_lbl_width.setStyleSheet("QLabel{"+stylesheet_lbl+"}")
+            width_retrieved = self._control_room.get_attr("defaultResolution.width")
+            self._control_room.set_widget_state(self.__ui_lbl_width, self._control_room.get_field_state(
+                self._part_name, "width", width_retrieved))
 
             hovered_preset = self._control_room.get_hovered_preset()
             if hovered_preset and hovered_preset.contains(self._part_name, "width"):
@@ -239,10 +307,9 @@ class ImageSizePart(ControlRoomPart):
                 self.__ui_width_edit.setText(str(width_retrieved))
 
             # Height
-            height_retrieved = pm.getAttr("defaultResolution.height")
-            stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-                self._part_name, "height", height_retrieved)
-            self.__ui_lbl_height.setStyleSheet("QLabel{"+stylesheet_lbl+"}")
+            height_retrieved = self._control_room.get_attr("defaultResolution.height")
+            self._control_room.set_widget_state(self.__ui_lbl_height, self._control_room.get_field_state(
+                self._part_name, "height", height_retrieved))
             if hovered_preset and hovered_preset.contains(self._part_name, "height"):
                 self._preset_hovered = True
                 height_displayed = hovered_preset.get(self._part_name, "height")
@@ -255,51 +322,45 @@ class ImageSizePart(ControlRoomPart):
             # Aspect ratio / Quality
             aspect_ratio_displayed = width_displayed / height_displayed
 
-            stylesheet_selected = "background-color:#2C2C2C"
-
             for name, btn in self.__ui_ratio_btns.items():
                 if hovered_preset:
                     is_ratio_selected = abs(_AspectRatios[name]["ratio"] - aspect_ratio_displayed) < 0.001
                 else:
                     is_ratio_selected = name == self.__ratio_selected
-                btn.setStyleSheet(stylesheet_selected if is_ratio_selected else "")
+                self._control_room.set_widget_state(btn, "selected" if is_ratio_selected else "")
 
             is_ratio_found = self.__ratio_selected is not None
             self.__ui_sd_format_btn.setEnabled(is_ratio_found)
             self.__ui_hd_format_btn.setEnabled(is_ratio_found)
             sd_selected = is_ratio_found and width_displayed == _AspectRatios[self.__ratio_selected]["SD"]
             hd_selected = is_ratio_found and width_displayed == _AspectRatios[self.__ratio_selected]["HD"]
-            self.__ui_sd_format_btn.setStyleSheet(stylesheet_selected if sd_selected else "")
-            self.__ui_hd_format_btn.setStyleSheet(stylesheet_selected if hd_selected else "")
+            self._control_room.set_widget_state(self.__ui_sd_format_btn, "selected" if sd_selected else "")
+            self._control_room.set_widget_state(self.__ui_hd_format_btn, "selected" if hd_selected else "")
             if self.__cam is not None:
-                overscan = self.__cam.overscan.get()
-                stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-                    self._part_name, "overscan", overscan)
-                self.__ui_lbl_overscan.setStyleSheet("QLabel{"+stylesheet_lbl+"}")
+                overscan = self._control_room.get_attr(self.__cam + ".overscan")
+                self._control_room.set_widget_state(self.__ui_lbl_overscan, self._control_room.get_field_state(
+                    self._part_name, "overscan", overscan))
 
                 if hovered_preset and hovered_preset.contains(self._part_name, "overscan"):
                     self._preset_hovered = True
                     overscan_displayed = hovered_preset.get(self._part_name, "overscan")
                     self.__ui_overscan_slider.setValue(overscan_displayed * 1000)
                     self._preset_hovered = False
-                else:
+                elif not self.__ui_overscan_slider.isSliderDown():
+                    # Not dragged (the dragged slider drives the value)
                     self.__ui_overscan_slider.setValue(overscan * 1000)
 
-            self.__ui_overscan_slider.setEnabled(self.__cam is not None and not self.__cam.overscan.isLocked()
-                                                 and not self.__cam.overscan.isConnected())
-            self.__ui_overscan_line_edit.setEnabled(self.__cam is not None and not self.__cam.overscan.isLocked()
-                                                 and not self.__cam.overscan.isConnected())
-            self.__ui_enable_gate_cb.setEnabled(self.__cam is not None and not self.__cam.displayResolution.isLocked()
-                                                and not self.__cam.displayResolution.isConnected())
+            is_overscan_editable = self.__is_cam_attr_editable("overscan")
+            self.__ui_overscan_slider.setEnabled(is_overscan_editable)
+            self.__ui_overscan_line_edit.setEnabled(is_overscan_editable)
+            self.__ui_enable_gate_cb.setEnabled(self.__is_cam_attr_editable("displayResolution"))
             self.__ui_opaque_gate_cb.setEnabled(
-                self.__cam is not None and not self.__cam.displayGateMaskOpacity.isLocked()
-                and not self.__cam.displayGateMaskOpacity.isConnected()
-                and not self.__cam.displayGateMaskColor.isConnected())
+                self.__is_cam_attr_editable("displayGateMaskOpacity")
+                and not SceneBackend.get_instance().is_connected(self.__cam + ".displayGateMaskColor"))
 
             # Gate
-            stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-                self._part_name, "enable_gate", self.__is_gate_enabled)
-            self.__ui_enable_gate_cb.setStyleSheet("QCheckBox{"+stylesheet_lbl+"}")
+            self._control_room.set_widget_state(self.__ui_enable_gate_cb, self._control_room.get_field_state(
+                self._part_name, "enable_gate", self.__is_gate_enabled))
             if hovered_preset and hovered_preset.contains(self._part_name, "enable_gate"):
                 self._preset_hovered = True
                 self.__ui_enable_gate_cb.setChecked(hovered_preset.get(self._part_name, "enable_gate"))
@@ -307,9 +368,8 @@ class ImageSizePart(ControlRoomPart):
             else:
                 self.__ui_enable_gate_cb.setChecked(self.__is_gate_enabled)
 
-            stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-                self._part_name, "opaque_gate", self.__is_gate_opaque)
-            self.__ui_opaque_gate_cb.setStyleSheet("QCheckBox{"+stylesheet_lbl+"}")
+            self._control_room.set_widget_state(self.__ui_opaque_gate_cb, self._control_room.get_field_state(
+                self._part_name, "opaque_gate", self.__is_gate_opaque))
             if hovered_preset and hovered_preset.contains(self._part_name, "opaque_gate"):
                 self._preset_hovered = True
                 self.__ui_opaque_gate_cb.setChecked(hovered_preset.get(self._part_name, "opaque_gate"))
@@ -345,7 +405,7 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         if not self._preset_hovered:
-            pm.setAttr("defaultResolution.width", int(self.__ui_width_edit.text()))
+            self._control_room.set_attr("defaultResolution.width", int(self.__ui_width_edit.text()))
             self.__update_height()
 
     def __on_height_changed(self):
@@ -354,56 +414,98 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         if not self._preset_hovered:
-            pm.setAttr("defaultResolution.height", int(self.__ui_height_edit.text()))
+            self._control_room.set_attr("defaultResolution.height", int(self.__ui_height_edit.text()))
             self.__update_width()
 
-    def __callback(self):
+    def __callback(self, plug):
         """
         Callback that retrieve data and refresh UI
+        :param plug: plug changed
         :return:
         """
+        # Invalidate the cached value before retrieving the aspect ratio from it
+        self._control_room.on_plug_changed(plug)
         self.__retrieve_aspect_ratio()
-        self.refresh_ui()
 
-    def add_callbacks(self):
+    def __get_plugs(self):
+        """
+        Getter of the plugs the part depends on
+        :return: plugs
+        """
+        plugs = ["defaultResolution.width", "defaultResolution.height", "defaultResolution.deviceAspectRatio"]
+        if self.__cam is not None:
+            plugs.append(self.__cam + ".overscan")
+        return plugs
+
+    def register_fields(self, dirty_tracker):
         """
-        Add the callbacks
+        Register the refresh of the part with the plugs and preset keys it depends on
+        :param dirty_tracker
         :return:
         """
-        self.__width_callback = pm.scriptJob(
-            attributeChange=["defaultResolution.width", self.__callback])
-        self.__height_callback = pm.scriptJob(
-            attributeChange=["defaultResolution.height", self.__callback])
-        self.__aspect_ratio_callback = pm.scriptJob(
-            attributeChange=["defaultResolution.deviceAspectRatio", self.__callback])
+        self.__dirty_tracker = dirty_tracker
+        plugs = self.__get_plugs()
+        preset_keys = [(self._part_name, key) for key in ["width", "height", "overscan", "enable_gate", "opaque_gate"]]
+        dirty_tracker.register(self.refresh_ui, plugs, preset_keys)
 
-    def add_dynamic_callbacks(self):
+    def __set_cam(self, cam):
         """
-        Add dynamic callback for the camera
+        Setter of the camera and of the plugs the part depends on
+        :param cam
         :return:
         """
-        if self.__cam is not None:
-            self.__overscan_callback = pm.scriptJob(
-                attributeChange=[self.__cam + '.overscan', self.__callback])
+        callback_hub = self._control_room.get_callback_hub()
+        for plug in self.__get_plugs():
+            callback_hub.unsubscribe(plug, self.__callback)
+        self.__cam = cam
+        if self.__dirty_tracker is not None:
+            self.__dirty_tracker.unregister(self.refresh_ui)
+            self.register_fields(self.__dirty_tracker)
+        self.__retrieve_gate_attr()
+
+    def __on_cameras_changed(self, cam):
+        """
+        On render camera or camera set changed move the callbacks to the primary camera and refresh
+        :param cam: primary camera
+        :return:
+        """
+        if cam != self.__cam:
+            self.__set_cam(cam)
+            callback_hub = self._control_room.get_callback_hub()
+            for plug in self.__get_plugs():
+                callback_hub.subscribe(plug, self.__callback)
+        self._control_room.request_refresh(self.refresh_ui)
+
+    def add_callbacks(self):
+        """
+        Add the callbacks (the primary camera may have changed while the callbacks were removed)
+        :return:
+        """
+        scene_context = SceneContext.get_instance()
+        if scene_context.get_primary_camera() != self.__cam:
+            self.__set_cam(scene_context.get_primary_camera())
+        scene_context.subscribe(self.__on_cameras_changed)
+        callback_hub = self._control_room.get_callback_hub()
+        for plug in self.__get_plugs():
+            callback_hub.subscribe(plug, self.__callback)
 
     def remove_callbacks(self):
         """
         Remove the callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__width_callback)
-        pm.scriptJob(kill=self.__height_callback)
-        pm.scriptJob(kill=self.__aspect_ratio_callback)
-        self.remove_dynamic_callbacks()
+        SceneContext.get_instance().unsubscribe(self.__on_cameras_changed)
+        callback_hub = self._control_room.get_callback_hub()
+        for plug in self.__get_plugs():
+            callback_hub.unsubscribe(plug, self.__callback)
 
-    def remove_dynamic_callbacks(self):
+    def rebind(self):
         """
-        Remove dynamic callback for the camera
+        Read again the aspect ratio and the gate of the primary camera of the new scene
         :return:
         """
-        if self.__overscan_callback is not None:
-            pm.scriptJob(kill=self.__overscan_callback)
-            self.__overscan_callback = None
+        self.__retrieve_aspect_ratio()
+        self.__set_cam(SceneContext.get_instance().get_primary_camera())
 
     def __retrieve_gate_attr(self):
         """
@@ -411,8 +513,19 @@ class ImageSizePart(ControlRoomPart):
         :return:
         """
         if self.__cam is not None:
-            self.__is_gate_enabled = self.__cam.displayResolution.get()
-            self.__is_gate_opaque = self.__cam.displayGateMaskOpacity.get() == 1.0
+            self.__is_gate_enabled = self._control_room.get_attr(self.__cam + ".displayResolution")
+            self.__is_gate_opaque = self._control_room.get_attr(self.__cam + ".displayGateMaskOpacity") == 1.0
+
+    def get_fields(self):
+        """
+        Getter of the fields of the part stored on a plug (the gate fields are computed from several plugs)
+        :return: list of (part_name, key in the preset, plug)
+        """
+        fields = [(self._part_name, "width", "defaultResolution.width"),
+                  (self._part_name, "height", "defaultResolution.height")]
+        if self.__cam is not None:
+            fields.append((self._part_name, "overscan", self.__cam + ".overscan"))
+        return fields
 
     def add_to_preset(self, preset):
         """
@@ -420,10 +533,10 @@ class ImageSizePart(ControlRoomPart):
         :param preset
         :return:
         """
-        preset.set(self._part_name, "width", pm.getAttr("defaultResolution.width"))
-        preset.set(self._part_name, "height", pm.getAttr("defaultResolution.height"))
+        preset.set(self._part_name, "width", self._control_room.get_attr("defaultResolution.width"))
+        preset.set(self._part_name, "height", self._control_room.get_attr("defaultResolution.height"))
         if self.__cam is not None:
-            preset.set(self._part_name, "overscan", self.__cam.overscan.get())
+            preset.set(self._part_name, "overscan", self._control_room.get_attr(self.__cam + ".overscan"))
             preset.set(self._part_name, "opaque_gate", self.__is_gate_opaque)
             preset.set(self._part_name, "enable_gate", self.__is_gate_enabled)
 
@@ -435,16 +548,17 @@ class ImageSizePart(ControlRoomPart):
         """
         if preset.contains(self._part_name, "width"):
             width = preset.get(self._part_name, "width")
-            pm.setAttr("defaultResolution.width", width)
+            self._control_room.set_attr("defaultResolution.width", width)
         if preset.contains(self._part_name, "height"):
             height = preset.get(self._part_name, "height")
-            pm.setAttr("defaultResolution.height", height)
-        pm.setAttr("defaultResolution.deviceAspectRatio",
-                   pm.getAttr("defaultResolution.width") / pm.getAttr("defaultResolution.height"))
+            self._control_room.set_attr("defaultResolution.height", height)
+        self._control_room.set_attr("defaultResolution.deviceAspectRatio",
+                                    self._control_room.get_attr("defaultResolution.width")
+                                    / self._control_room.get_attr("defaultResolution.height"))
         self.__retrieve_aspect_ratio()
         if self.__cam is not None:
             if preset.contains(self._part_name, "overscan"):
-                self.__cam.overscan.set(preset.get(self._part_name, "overscan"))
+                self.__set_overscan(preset.get(self._part_name, "overscan"))
             if preset.contains(self._part_name, "opaque_gate"):
                 self.__is_gate_opaque = preset.get(self._part_name, "opaque_gate") == 1
             if preset.contains(self._part_name, "enable_gate"):
@@ -1,6 +1,5 @@
 from ..ControlRoomPart import *
 from ..FormSlider import *
-import pymel.core as pm
 
 
 class MotionBlurPart(ControlRoomPart):
@@ -19,9 +18,6 @@ class MotionBlurPart(ControlRoomPart):
         ]
         self.__ui_motion_blur_cb = None
         self.__ui_instant_shutter_cb = None
-        self.__motion_blur_callback = None
-        self.__instant_shutter_callback = None
-        self.__layer_callback = None
         self.__motion_blur_override = None
         self.__instant_shutter_override = None
         self.__action_add_motion_blur_override = QAction(text="Add Override")
@@ -59,7 +55,7 @@ class MotionBlurPart(ControlRoomPart):
         :return:
         """
         self.__motion_blur_override = \
-            cr.ControlRoom.retrieve_override("defaultArnoldRenderOptions", "motion_blur_enable")
+            self._control_room.get_layer_context().get_override("defaultArnoldRenderOptions", "motion_blur_enable")
 
     def __create_instant_shutter_override(self):
         """
@@ -83,7 +79,7 @@ class MotionBlurPart(ControlRoomPart):
         :return:
         """
         self.__instant_shutter_override = \
-            cr.ControlRoom.retrieve_override("defaultArnoldRenderOptions", "ignoreMotionBlur")
+            self._control_room.get_layer_context().get_override("defaultArnoldRenderOptions", "ignoreMotionBlur")
 
     def populate(self):
         """
@@ -122,8 +118,20 @@ class MotionBlurPart(ControlRoomPart):
         :return:
         """
         try:
-            motion_blur_enable  = pm.getAttr("defaultArnoldRenderOptions.motion_blur_enable")
-            ignore_motion_blur = pm.getAttr("defaultArnoldRenderOptions.ignoreMotionBlur")
+            self.__refresh_motion_blur()
+            self.__refresh_instant_shutter()
+            for fs in self.__form_sliders:
+                fs.refresh_ui()
+        except:
+            pass
+
+    def __refresh_motion_blur(self):
+        """
+        Refresh the enable motion blur checkbox
+        :return:
+        """
+        try:
+            motion_blur_enable = self._control_room.get_attr("defaultArnoldRenderOptions.motion_blur_enable")
 
             hovered_preset = self._control_room.get_hovered_preset()
             if hovered_preset and hovered_preset.contains(self._part_name, "enable_motion_blur"):
@@ -133,6 +141,28 @@ class MotionBlurPart(ControlRoomPart):
             else:
                 self.__ui_motion_blur_cb.setChecked(motion_blur_enable)
 
+            self.__retrieve_motion_blur_override()
+            is_default_layer = self._control_room.get_layer_context().is_default()
+            self.__action_add_motion_blur_override.setEnabled(
+                not is_default_layer and self.__motion_blur_override is None)
+            self.__action_remove_motion_blur_override.setEnabled(
+                not is_default_layer and self.__motion_blur_override is not None)
+
+            state = self._control_room.get_field_state(
+                self._part_name, "enable_motion_blur", motion_blur_enable, self.__motion_blur_override)
+            self._control_room.set_widget_state(self.__ui_motion_blur_cb, state)
+        except:
+            pass
+
+    def __refresh_instant_shutter(self):
+        """
+        Refresh the instantaneous shutter checkbox
+        :return:
+        """
+        try:
+            ignore_motion_blur = self._control_room.get_attr("defaultArnoldRenderOptions.ignoreMotionBlur")
+
+            hovered_preset = self._control_room.get_hovered_preset()
             if hovered_preset and hovered_preset.contains(self._part_name, "instant_shutter"):
                 self._preset_hovered = True
                 self.__ui_instant_shutter_cb.setChecked(hovered_preset.get(self._part_name, "instant_shutter"))
@@ -140,32 +170,32 @@ class MotionBlurPart(ControlRoomPart):
             else:
                 self.__ui_instant_shutter_cb.setChecked(ignore_motion_blur)
 
-            for fs in self.__form_sliders:
-                fs.refresh_ui()
-
-            visible_layer = render_setup.instance().getVisibleRenderLayer()
-            is_default_layer = visible_layer.name() == "defaultRenderLayer"
-            self.__action_add_motion_blur_override.setEnabled(
-                not is_default_layer and self.__motion_blur_override is None)
-            self.__action_remove_motion_blur_override.setEnabled(
-                not is_default_layer and self.__motion_blur_override is not None)
+            self.__retrieve_instant_shutter_override()
+            is_default_layer = self._control_room.get_layer_context().is_default()
             self.__action_add_instant_shutter_override.setEnabled(
                 not is_default_layer and self.__instant_shutter_override is None)
             self.__action_remove_instant_shutter_override.setEnabled(
                 not is_default_layer and self.__instant_shutter_override is not None)
 
-            motion_blur_stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
-                self._part_name, "enable_motion_blur", motion_blur_enable, self.__motion_blur_override)
-            self.__ui_motion_blur_cb.setStyleSheet("QCheckBox{" + motion_blur_stylesheet_lbl + "}")
-
-            instant_shutter_stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
+            state = self._control_room.get_field_state(
                 self._part_name, "instant_shutter", ignore_motion_blur, self.__instant_shutter_override)
-            self.__ui_instant_shutter_cb.setStyleSheet("QCheckBox{" + instant_shutter_stylesheet_lbl + "}")
-            self.__retrieve_motion_blur_override()
-            self.__retrieve_instant_shutter_override()
+            self._control_room.set_widget_state(self.__ui_instant_shutter_cb, state)
         except:
             pass
 
+    def register_fields(self, dirty_tracker):
+        """
+        Register the refresh functions of the part with the plugs and preset keys they depend on
+        :param dirty_tracker
+        :return:
+        """
+        dirty_tracker.register(self.__refresh_motion_blur, ["defaultArnoldRenderOptions.motion_blur_enable"],
+                               [(self._part_name, "enable_motion_blur")])
+        dirty_tracker.register(self.__refresh_instant_shutter, ["defaultArnoldRenderOptions.ignoreMotionBlur"],
+                               [(self._part_name, "instant_shutter")])
+        for fs in self.__form_sliders:
+            fs.register_fields(dirty_tracker)
+
     def __on_motion_blur_changed(self, state):
         """
         On motion blur enable checkbox changed set motion_blur_enable
@@ -173,7 +203,7 @@ class MotionBlurPart(ControlRoomPart):
         :return:
         """
         if not self._preset_hovered:
-            pm.setAttr("defaultArnoldRenderOptions.motion_blur_enable", state == 2)
+            self._control_room.set_attr("defaultArnoldRenderOptions.motion_blur_enable", state == 2)
 
     def __on_instant_shutter_changed(self, state):
         """
@@ -182,31 +212,45 @@ class MotionBlurPart(ControlRoomPart):
         :return:
         """
         if not self._preset_hovered:
-            pm.setAttr("defaultArnoldRenderOptions.ignoreMotionBlur", state == 2)
+            self._control_room.set_attr("defaultArnoldRenderOptions.ignoreMotionBlur", state == 2)
 
     def add_callbacks(self):
         """
         Add the callbacks
         :return:
         """
-        self.__motion_blur_callback = pm.scriptJob(
-            attributeChange=["defaultArnoldRenderOptions.motion_blur_enable", self.refresh_ui])
-        self.__instant_shutter_callback = pm.scriptJob(
-            attributeChange=["defaultArnoldRenderOptions.ignoreMotionBlur", self.refresh_ui])
+        self._control_room.get_callback_hub().subscribe("defaultArnoldRenderOptions.motion_blur_enable",
+                                                        self._control_room.on_plug_changed)
+        self._control_room.get_callback_hub().subscribe("defaultArnoldRenderOptions.ignoreMotionBlur",
+                                                        self._control_room.on_plug_changed)
         for fs in self.__form_sliders:
             fs.add_callbacks()
-        self.__layer_callback = pm.scriptJob(event=["renderLayerManagerChange", self.refresh_ui])
 
     def remove_callbacks(self):
         """
         Remove the callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__motion_blur_callback)
-        pm.scriptJob(kill=self.__instant_shutter_callback)
+        self._control_room.get_callback_hub().unsubscribe("defaultArnoldRenderOptions.motion_blur_enable",
+                                                          self._control_room.on_plug_changed)
+        self._control_room.get_callback_hub().unsubscribe("defaultArnoldRenderOptions.ignoreMotionBlur",
+                                                          self._control_room.on_plug_changed)
         for fs in self.__form_sliders:
             fs.remove_callbacks()
-        pm.scriptJob(kill=self.__layer_callback)
+
+    def get_fields(self):
+        """
+        Getter of the fields of the part stored on a plug
+        :return: list of (part_name, key in the preset, plug)
+        """
+        fields = [
+            (self._part_name, "enable_motion_blur", "defaultArnoldRenderOptions.motion_blur_enable"),
+            (self._part_name, "instant_shutter", "defaultArnoldRenderOptions.ignoreMotionBlur"),
+        ]
+        for fs in self.__form_sliders:
+            key, field = fs.get_key_preset_and_field()
+            fields.append((self._part_name, key, field))
+        return fields
 
     def add_to_preset(self, preset):
         """
@@ -214,11 +258,13 @@ class MotionBlurPart(ControlRoomPart):
         :param preset
         :return:
         """
-        preset.set(self._part_name, "enable_motion_blur", pm.getAttr("defaultArnoldRenderOptions.motion_blur_enable"))
-        preset.set(self._part_name, "instant_shutter", pm.getAttr("defaultArnoldRenderOptions.ignoreMotionBlur"))
+        preset.set(self._part_name, "enable_motion_blur",
+                   self._control_room.get_attr("defaultArnoldRenderOptions.motion_blur_enable"))
+        preset.set(self._part_name, "instant_shutter",
+                   self._control_room.get_attr("defaultArnoldRenderOptions.ignoreMotionBlur"))
         for fs in self.__form_sliders:
             key, field = fs.get_key_preset_and_field()
-            preset.set(self._part_name, key, pm.getAttr(field))
+            preset.set(self._part_name, key, self._control_room.get_attr(field))
 
     def apply(self, preset):
         """
@@ -227,10 +273,10 @@ class MotionBlurPart(ControlRoomPart):
         :return:
         """
         if preset.contains(self._part_name, "enable_motion_blur"):
-            pm.setAttr("defaultArnoldRenderOptions.motion_blur_enable", preset.get(self._part_name, "enable_motion_blur"))
+            self._control_room.set_attr("defaultArnoldRenderOptions.motion_blur_enable", preset.get(self._part_name, "enable_motion_blur"))
         if preset.contains(self._part_name, "instant_shutter"):
-            pm.setAttr("defaultArnoldRenderOptions.ignoreMotionBlur", preset.get(self._part_name, "instant_shutter"))
+            self._control_room.set_attr("defaultArnoldRenderOptions.ignoreMotionBlur", preset.get(self._part_name, "instant_shutter"))
         for fs in self.__form_sliders:
             key, field = fs.get_key_preset_and_field()
             if preset.contains(self._part_name, key):
-                pm.setAttr(field, preset.get(self._part_name, key))
+                self._control_room.set_attr(field, preset.get(self._part_name, key))
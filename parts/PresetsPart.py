@@ -4,13 +4,25 @@ import re
 from functools import partial
 
 import maya.OpenMaya as OpenMaya
-import pymel.core as pm
+import maya.cmds as cmds
 
 from ..ControlRoomPart import *
 from ..FormSlider import *
 from ..PresetManager import *
-
-_NBMAX_PRESET = 10
+from ..PresetSearchIndex import *
+from ..PresetBrowser import *
+from ..PresetMatcher import *
+from ..PresetComparison import *
+from ..LayerMatrix import *
+
+# Height of the preset list (the part layouts are aligned to the top at their size hint)
+_PRESETS_VIEW_HEIGHT = 640
+# Interval of the polling of the default preset files while the window is shown
+_DEFAULT_PRESETS_POLL_INTERVAL_MS = 2000
+# Interval of the refresh of the studio presets from the share while the window is shown
+_STUDIO_PRESETS_REFRESH_INTERVAL_MS = 60000
+# Number of presets not loaded yet compiled by the matcher at each step (steps run while the event loop is idle)
+_NB_PRESETS_COMPILED_BY_STEP = 4
 
 
 class PresetFilterDialog(QDialog):
@@ -139,30 +151,125 @@ class PresetFilterDialog(QDialog):
         self.accept()
 
 
-class EventFilterPreset(QObject):
-    def __init__(self, control_room, preset):
+class PresetComparisonDialog(QDialog):
+    def __init__(self, scene_preset, presets):
+        """
+        Constructor
+        :param scene_preset
+        :param presets
+        """
+        super(PresetComparisonDialog, self).__init__(wrapInstance(int(omui.MQtUtil.mainWindow()), QWidget))
+
+        # Model attributes
+        self.__scene_preset = scene_preset
+        self.__presets = presets
+
+        # UI attributes
+        self.__ui_width = 900
+        self.__ui_height = 500
+        self.__ui_min_width = 400
+        self.__ui_min_height = 250
+        self.__ui_pos = QDesktopWidget().availableGeometry().center() - QPoint(self.__ui_width, self.__ui_height) / 2
+
+        # name the window
+        self.setWindowTitle("Preset Comparison")
+        # make the window a "tool" in Maya's eyes so that it stays on top when you click off
+        self.setWindowFlags(QtCore.Qt.Tool)
+        # Makes the object get deleted from memory, not just hidden, when it is closed.
+        self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+
+        self.__create_ui()
+        self.__refresh_ui()
+
+    def __create_ui(self):
+        """
+        Create the ui
+        :return:
+        """
+        # Reinit attributes of the UI
+        self.setMinimumSize(self.__ui_min_width, self.__ui_min_height)
+        self.resize(self.__ui_width, self.__ui_height)
+        self.move(self.__ui_pos)
+
+        # Main Layout
+        main_lyt = QVBoxLayout()
+        self.setLayout(main_lyt)
+        main_lyt.setContentsMargins(5, 8, 5, 8)
+
+        self.__ui_only_different_cb = QCheckBox("Only the fields that differ between the presets")
+        self.__ui_only_different_cb.stateChanged.connect(self.__refresh_columns)
+        main_lyt.addWidget(self.__ui_only_different_cb)
+
+        # Grid of the presets by field (click on a field to sort the presets by it)
+        self.__comparison_model = PresetComparisonModel()
+        self.__proxy_model = PresetComparisonProxyModel()
+        self.__proxy_model.setSourceModel(self.__comparison_model)
+        self.__ui_table = QTableView()
+        self.__ui_table.setModel(self.__proxy_model)
+        # Keep the order of the presets until a field is clicked
+        self.__ui_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.__ui_table.setSortingEnabled(True)
+        self.__ui_table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.__ui_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        main_lyt.addWidget(self.__ui_table, 1)
+
+    def __refresh_ui(self):
+        """
+        Refresh the ui according to the model attribute
+        :return:
+        """
+        try:
+            self.__comparison_model.set_presets(self.__scene_preset, self.__presets)
+            self.__ui_table.resizeColumnsToContents()
+            self.__refresh_columns()
+        except:
+            pass
+
+    def __refresh_columns(self):
+        """
+        Hide the fields with the same value for all the presets if asked
+        :return:
+        """
+        only_different = self.__ui_only_different_cb.isChecked()
+        for column in range(self.__comparison_model.columnCount()):
+            self.__ui_table.setColumnHidden(
+                column, only_different and not self.__comparison_model.is_column_different(column))
+
+
+class EventFilterPresetView(QObject):
+    def __init__(self, control_room, view):
         """
         Constructor
         :param control_room
-        :param preset
+        :param view
         """
         super().__init__()
         self.__control_room = control_room
-        self.__preset = preset
+        self.__view = view
+        self.__hovered_preset = None
+
+    def __set_hovered_preset(self, preset):
+        """
+        Request the preview of the preset under the mouse if it changed
+        :param preset
+        :return:
+        """
+        if preset is not self.__hovered_preset:
+            self.__hovered_preset = preset
+            self.__control_room.request_hovered_preset(preset)
 
     def eventFilter(self, object, event):
         """
-        Event actions
+        Event actions on the viewport of the view (the events still reach the view)
         :param object
         :param event
         :return: event known
         """
-        if event.type() == QtCore.QEvent.Enter:
-            self.__control_room.set_hovered_preset(self.__preset)
-            return True
+        if event.type() == QtCore.QEvent.MouseMove:
+            index = self.__view.indexAt(event.pos())
+            self.__set_hovered_preset(index.data(PRESET_ROLE) if index.isValid() else None)
         elif event.type() == QtCore.QEvent.Leave:
-            self.__control_room.set_hovered_preset(None)
-            return True
+            self.__set_hovered_preset(None)
         return False
 
 
@@ -176,111 +283,196 @@ class PresetsPart(ControlRoomPart):
         :param part_name
         """
         super(PresetsPart, self).__init__(control_room, "Presets", part_name)
-        self.__ui_presets_lyt = None
         self.__asset_path = asset_path
-        self.__spacer = None
-        self.__maya_callback = None
-        self.__event_filters = []
+        self.__before_save_callback = None
+        self.__default_presets_timer = QTimer()
+        self.__default_presets_timer.setInterval(_DEFAULT_PRESETS_POLL_INTERVAL_MS)
+        self.__default_presets_timer.timeout.connect(self.__poll_default_presets)
+        self.__studio_presets_timer = QTimer()
+        self.__studio_presets_timer.setInterval(_STUDIO_PRESETS_REFRESH_INTERVAL_MS)
+        self.__studio_presets_timer.timeout.connect(PresetManager.get_instance().refresh_studio_presets)
+        self.__search_index = PresetSearchIndex()
+        self.__matcher = PresetMatcher()
+        # Compile the presets not loaded yet in the matcher a few at a time while the event loop is idle
+        self.__matcher_timer = QTimer()
+        self.__matcher_timer.setInterval(0)
+        self.__matcher_timer.timeout.connect(self.__compile_pending_match)
+        self.__presets_model = None
+        self.__filter_model = None
+        self.__delegate = None
+        self.__event_filter = None
+        self.__ui_search_line_edit = None
+        self.__ui_presets_view = None
+        # Whether the model is in sync with the PresetManager (its events are only listened while shown)
+        self.__is_synced = False
 
     def populate(self):
         """
         Generate the UI content of the PresetsPart
         :return: content
         """
-        self.__ui_presets_lyt = QVBoxLayout()
-        self.__ui_presets_lyt.setContentsMargins(2, 4, 2, 4)
-        self.__ui_presets_lyt.setSpacing(5)
-        return self.__ui_presets_lyt
+        content = QVBoxLayout()
+        content.setContentsMargins(2, 4, 2, 4)
+        content.setSpacing(5)
+
+        # Search
+        self.__ui_search_line_edit = QLineEdit()
+        self.__ui_search_line_edit.setPlaceholderText("Search name or field")
+        self.__ui_search_line_edit.setClearButtonEnabled(True)
+        self.__ui_search_line_edit.textChanged.connect(self.__on_search_changed)
+        content.addWidget(self.__ui_search_line_edit)
+
+        # Presets (only the visible cards are painted)
+        self.__presets_model = PresetListModel()
+        self.__filter_model = PresetFilterProxyModel()
+        self.__filter_model.setSourceModel(self.__presets_model)
+        self.__delegate = PresetItemDelegate(
+            get_cached_pixmap(os.path.join(self.__asset_path, "apply.png")),
+            get_cached_pixmap(os.path.join(self.__asset_path, "delete.png")))
+        self.__delegate.apply_requested.connect(self.__apply_preset)
+        self.__delegate.delete_requested.connect(self.__delete_preset)
+        self.__ui_presets_view = QListView()
+        self.__ui_presets_view.setModel(self.__filter_model)
+        self.__ui_presets_view.setItemDelegate(self.__delegate)
+        self.__ui_presets_view.setUniformItemSizes(True)
+        self.__ui_presets_view.setMouseTracking(True)
+        self.__ui_presets_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.__ui_presets_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.__ui_presets_view.setFrameShape(QFrame.NoFrame)
+        self.__ui_presets_view.setMinimumWidth(130)
+        self.__ui_presets_view.setMinimumHeight(_PRESETS_VIEW_HEIGHT)
+        self.__event_filter = EventFilterPresetView(self._control_room, self.__ui_presets_view)
+        self.__ui_presets_view.viewport().installEventFilter(self.__event_filter)
+        content.addWidget(self.__ui_presets_view, 1)
+
+        # New Preset Button
+        add_preset_btn = QPushButton("New Preset")
+        add_preset_btn.setStyleSheet("margin:0px 20px")
+        add_preset_btn.setIconSize(QtCore.QSize(18, 18))
+        add_preset_btn.setIcon(QIcon(get_cached_pixmap(os.path.join(self.__asset_path, "add.png"))))
+        add_preset_btn.clicked.connect(partial(self.__generate_new_preset))
+        # Compare Presets Button
+        compare_presets_btn = QPushButton("Compare")
+        compare_presets_btn.setToolTip("Compare all the presets field by field with the scene")
+        compare_presets_btn.clicked.connect(self.__compare_presets)
+        # Render Layers Matrix Button
+        layer_matrix_btn = QPushButton("Layers")
+        layer_matrix_btn.setToolTip("Audit the fields in all the render layers without switching the visible layer")
+        layer_matrix_btn.clicked.connect(self.__show_layer_matrix)
+        buttons_lyt = QHBoxLayout()
+        buttons_lyt.addStretch()
+        buttons_lyt.addWidget(add_preset_btn)
+        buttons_lyt.addWidget(compare_presets_btn)
+        buttons_lyt.addWidget(layer_matrix_btn)
+        buttons_lyt.addStretch()
+        content.addLayout(buttons_lyt)
+        return content
 
     def refresh_ui(self):
         """
-        Refresh the UI
+        Refresh the UI (the presets are kept in sync by the events of the PresetManager)
         :return:
         """
         try:
-            self.__event_filters.clear()
-            if self.__spacer is not None:
-                self.__ui_presets_lyt.removeItem(self.__spacer)
-            clear_layout(self.__ui_presets_lyt)
-            preset_manager = PresetManager.get_instance()
-            presets = preset_manager.get_presets()
-            default_presets = preset_manager.get_default_presets()
-
-            presets_tuples = [(p, True) for p in default_presets] + [(p, False) for p in presets]
-
-            index = 0
-
-            icon_size = QtCore.QSize(16, 16)
-            icon_container_size = QtCore.QSize(24, 24)
-
-            for preset, is_default in presets_tuples:
-                event_filter = EventFilterPreset(self._control_room, preset)
-                self.__event_filters.append(event_filter)
-                # Card
-                widget_preset = QWidget()
-                widget_preset.installEventFilter(event_filter)
-                widget_preset.setMinimumWidth(120)
-                widget_preset.setStyleSheet(".QWidget{background:#383838; border-radius:4px}")
-                lyt_preset = QVBoxLayout(widget_preset)
-                lyt_preset.setSpacing(10)
-                # Label
-                lbl_name_preset = QLabel(preset.get_name())
-                lbl_name_preset.setStyleSheet("font-weight:bold")
-                lyt_preset.addWidget(lbl_name_preset, alignment=Qt.AlignCenter)
-                # Actions
-                lyt_actions = QHBoxLayout()
-                lyt_actions.setSpacing(5)
-                lyt_actions.setAlignment(Qt.AlignCenter)
-                lyt_preset.addLayout(lyt_actions)
-                # Apply button
-                apply_btn = QPushButton()
-                apply_btn.setIconSize(QtCore.QSize(18, 18))
-                apply_btn.setFixedSize(icon_container_size)
-                apply_btn.setIcon(QIcon(QPixmap(os.path.join(self.__asset_path, "apply.png"))))
-                apply_btn.clicked.connect(partial(self.__apply_preset, preset))
-                lyt_actions.addWidget(apply_btn)
-                # Delete btn
-                delete_btn = QPushButton()
-                delete_btn.setIconSize(icon_size)
-                delete_btn.setFixedSize(icon_container_size)
-                delete_btn.setIcon(QIcon(QPixmap(os.path.join(self.__asset_path, "delete.png"))))
-                if is_default:
-                    delete_btn.setEnabled(False)
-                    delete_btn.setToolTip("Default presets can't be removed")
-                else:
-                    delete_btn.clicked.connect(partial(self.__delete_preset, preset))
-                lyt_actions.addWidget(delete_btn)
-                self.__ui_presets_lyt.insertWidget(index, widget_preset, 1)
-                index += 1
-
-            if index < _NBMAX_PRESET:
-                # New Preset Button
-                add_preset_btn = QPushButton("New Preset")
-                add_preset_btn.setStyleSheet("margin:0px 20px")
-                # if index == 0:
-                #     add_preset_btn.setStyleSheet("padding: 3px;margin-top:18px")
-                add_preset_btn.setIconSize(QtCore.QSize(18, 18))
-                add_preset_btn.setIcon(QIcon(QPixmap(os.path.join(self.__asset_path, "add.png"))))
-                add_preset_btn.clicked.connect(partial(self.__generate_new_preset))
-                self.__ui_presets_lyt.insertWidget(index, add_preset_btn, 1, Qt.AlignCenter)
-                index += 1
-
-            if index < _NBMAX_PRESET:
-                # Spacer
-                self.__spacer = QSpacerItem(0, 0)
-                self.__ui_presets_lyt.insertItem(index, self.__spacer)
-                self.__ui_presets_lyt.setStretch(index, _NBMAX_PRESET - index)
-            else:
-                self.__spacer = None
+            if not self.__is_synced:
+                self.__sync_presets()
+            self.__ui_presets_view.viewport().update()
         except:
             pass
 
+    def __sync_presets(self):
+        """
+        Synchronize the model and the search index with all the presets
+        :return:
+        """
+        preset_manager = PresetManager.get_instance()
+        presets_tuples = [(p, True) for p in preset_manager.get_default_presets()] + \
+                         [(p, False) for p in preset_manager.get_presets()]
+        # Only the presets added or removed since the last sync are inserted, removed and indexed
+        self.__presets_model.sync(presets_tuples)
+        presets_by_key = {get_preset_key(preset, is_default): preset for preset, is_default in presets_tuples}
+        if self.__search_index.sync(presets_by_key):
+            self.__on_search_changed()
+        self.__is_synced = True
+        self._control_room.request_refresh(self.__refresh_match)
+
+    def __on_presets_changed(self, event, preset, index):
+        """
+        On presets changed in the PresetManager update only the row of the preset
+        :param event
+        :param preset
+        :param index: index of the preset in the presets sorted by name
+        :return:
+        """
+        if self.__presets_model is None:
+            return
+        if event == "reset":
+            self.__sync_presets()
+            return
+        row = len(PresetManager.get_instance().get_default_presets()) + index
+        key = get_preset_key(preset, False)
+        if event == "added":
+            self.__presets_model.insert_entry(row, (preset, False))
+            self.__search_index.add(key, preset)
+            self.__on_search_changed()
+        elif event == "removed":
+            self.__presets_model.remove_entry(row)
+            self.__search_index.remove(key)
+        self._control_room.request_refresh(self.__refresh_match)
+
+    def register_fields(self, dirty_tracker):
+        """
+        Register the refresh of the preset matching the scene with the plugs of the matched parts
+        :param dirty_tracker
+        :return:
+        """
+        plugs = [plug for plug in dirty_tracker.get_plugs()
+                 if any(part_name in MATCHED_PARTS for part_name, key in dirty_tracker.get_preset_keys_for_plug(plug))]
+        dirty_tracker.register(self.__refresh_match, plugs=plugs)
+
+    def __refresh_match(self):
+        """
+        Refresh the preset matching the scene exactly or the nearest one
+        :return:
+        """
+        if self.__presets_model is None:
+            return
+        preset_manager = PresetManager.get_instance()
+        default_presets = preset_manager.get_default_presets()
+        self.__matcher.set_presets(default_presets + preset_manager.get_presets())
+        if self.__matcher.get_nb_pending() > 0 and not self.__matcher_timer.isActive():
+            self.__matcher_timer.start()
+        result = self.__matcher.find_nearest(self._control_room.get_scene_preset())
+        if result is None:
+            self.__presets_model.set_match(None, None)
+            return
+        preset, is_exact, fields_differing = result
+        is_default = any(preset is default_preset for default_preset in default_presets)
+        self.__presets_model.set_match(get_preset_key(preset, is_default), (is_exact, fields_differing))
+
+    def __compile_pending_match(self):
+        """
+        Compile some of the presets not loaded yet in the matcher and refresh the match once they are all compiled
+        :return:
+        """
+        self.__matcher.compile_pending(_NB_PRESETS_COMPILED_BY_STEP)
+        if self.__matcher.get_nb_pending() == 0:
+            self.__matcher_timer.stop()
+            self._control_room.request_refresh(self.__refresh_match)
+
+    def __on_search_changed(self):
+        """
+        On search changed keep only the presets matching
+        :return:
+        """
+        self.__filter_model.set_keys(self.__search_index.search(self.__ui_search_line_edit.text()))
+
     def __generate_new_preset(self):
         """
         Generate a new preset
         :return:
         """
-        result = pm.promptDialog(
+        result = cmds.promptDialog(
             title='New Preset',
             message='Enter the name:',
             button=['OK', 'Cancel'],
@@ -289,7 +481,7 @@ class PresetsPart(ControlRoomPart):
             dismissString='Cancel')
         if result == 'OK':
             preset_manager = PresetManager.get_instance()
-            name = pm.promptDialog(query=True, text=True)
+            name = cmds.promptDialog(query=True, text=True)
             if not re.match(r"^\w+$", name):
                 print_warning(["\"" + name + "\" is a bad preset name", "The preset has not been created"])
                 return
@@ -297,7 +489,25 @@ class PresetsPart(ControlRoomPart):
                 print_warning(["Preset \"" + name + "\" already exists", "The preset has not been created"])
                 return
             self._control_room.generate_preset(name)
-            self.refresh_ui()
+
+    def __compare_presets(self):
+        """
+        Display the comparison of all the presets with the scene
+        :return:
+        """
+        preset_manager = PresetManager.get_instance()
+        comparison_dialog = PresetComparisonDialog(
+            self._control_room.get_scene_preset(),
+            preset_manager.get_default_presets() + preset_manager.get_presets())
+        comparison_dialog.show()
+
+    def __show_layer_matrix(self):
+        """
+        Display the values of the fields in all the render layers
+        :return:
+        """
+        layer_matrix_dialog = LayerMatrixDialog(self._control_room)
+        layer_matrix_dialog.show()
 
     def __delete_preset(self, preset):
         """
@@ -305,7 +515,7 @@ class PresetsPart(ControlRoomPart):
         :param preset:
         :return:
         """
-        answer_delete = pm.confirmDialog(
+        answer_delete = cmds.confirmDialog(
             title='Confirm',
             message="Are you sure to delete the preset " + preset.get_name() + " ?",
             button=['Yes', 'No'],
@@ -315,7 +525,6 @@ class PresetsPart(ControlRoomPart):
             preset_manager = PresetManager.get_instance()
             preset_manager.remove_preset(preset)
             preset_manager.save_presets()
-            self.refresh_ui()
 
     def __apply_preset(self, preset):
         """
@@ -326,27 +535,56 @@ class PresetsPart(ControlRoomPart):
         self._control_room.apply_preset(preset)
         self.refresh_ui()
 
-    def __callback_scene_opened(self):
+    @staticmethod
+    def __poll_default_presets():
         """
-        Callback when a Scene is opened
+        Reload the default presets whose file changed and the studio presets refreshed in the background (the model is
+        updated by the reset event)
         :return:
         """
-        PresetManager.get_instance().retrieve_presets()
-        self.refresh_ui()
+        try:
+            PresetManager.get_instance().retrieve_default_presets()
+        except:
+            pass
+
+    @staticmethod
+    def __callback_before_save(*args):
+        """
+        Callback before a Scene is saved
+        :param args
+        :return:
+        """
+        PresetManager.get_instance().flush_presets()
 
     def add_callbacks(self):
         """
         Add the callbacks
         :return:
         """
-        self.__maya_callback = pm.scriptJob(event=["SceneOpened", self.__callback_scene_opened])
+        self.__before_save_callback = OpenMaya.MSceneMessage.addCallback(
+            OpenMaya.MSceneMessage.kBeforeSave, self.__callback_before_save)
+        PresetManager.get_instance().add_listener(self.__on_presets_changed)
+        if self.__presets_model is not None:
+            self.__sync_presets()
+        self.__poll_default_presets()
+        self.__default_presets_timer.start()
+        PresetManager.get_instance().refresh_studio_presets()
+        self.__studio_presets_timer.start()
 
     def remove_callbacks(self):
         """
         Remove the callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__maya_callback)
+        OpenMaya.MMessage.removeCallback(self.__before_save_callback)
+        self.__default_presets_timer.stop()
+        self.__studio_presets_timer.stop()
+        self.__matcher_timer.stop()
+        # The presets changed are written now as the scene may be saved while the window is hidden
+        preset_manager = PresetManager.get_instance()
+        preset_manager.flush_presets()
+        preset_manager.remove_listener(self.__on_presets_changed)
+        self.__is_synced = False
 
     def add_to_preset(self, preset):
         # Nothing
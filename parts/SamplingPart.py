@@ -1,6 +1,5 @@
 from ..ControlRoomPart import *
 from ..FormSlider import *
-import pymel.core as pm
 
 
 class SamplingPart(ControlRoomPart):
@@ -30,8 +29,6 @@ class SamplingPart(ControlRoomPart):
                        "defaultArnoldRenderOptions.GISpecularDepth", "ray_depth_specular", 0, 16, 160),
         ]
         self.__ui_progressive_render_cb = None
-        self.__progressive_render_callback = None
-        self.__layer_callback = None
 
         self.__progressive_render_override = None
         self.__action_add_progressive_render_override = QAction(text="Add Override")
@@ -62,8 +59,8 @@ class SamplingPart(ControlRoomPart):
         Retrieve progressive render override
         :return:
         """
-        self.__progressive_render_override = cr.ControlRoom.retrieve_override("defaultArnoldRenderOptions",
-                                                                              "enableProgressiveRender")
+        self.__progressive_render_override = self._control_room.get_layer_context().get_override(
+            "defaultArnoldRenderOptions", "enableProgressiveRender")
 
     def populate(self):
         """
@@ -95,9 +92,22 @@ class SamplingPart(ControlRoomPart):
         :return:
         """
         try:
-            visible_layer = render_setup.instance().getVisibleRenderLayer()
-            is_default_layer = visible_layer.name() == "defaultRenderLayer"
-            progressive_render_enabled = pm.getAttr("defaultArnoldRenderOptions.enableProgressiveRender")
+            self.__refresh_progressive_render()
+            for fs in self.__form_sliders:
+                fs.refresh_ui()
+        except:
+            pass
+
+    def __refresh_progressive_render(self):
+        """
+        Refresh the progressive render checkbox
+        :return:
+        """
+        try:
+            self.__retrieve_progressive_render_override()
+            is_default_layer = self._control_room.get_layer_context().is_default()
+            progressive_render_enabled = self._control_room.get_attr(
+                "defaultArnoldRenderOptions.enableProgressiveRender")
 
             hovered_preset = self._control_room.get_hovered_preset()
             if hovered_preset and hovered_preset.contains(self._part_name, "enable_progressive_render"):
@@ -107,22 +117,30 @@ class SamplingPart(ControlRoomPart):
             else:
                 self.__ui_progressive_render_cb.setChecked(progressive_render_enabled)
 
-            for fs in self.__form_sliders:
-                fs.refresh_ui()
-
             self.__action_add_progressive_render_override.setEnabled(
                 not is_default_layer and self.__progressive_render_override is None)
             self.__action_remove_progressive_render_override.setEnabled(
                 not is_default_layer and self.__progressive_render_override is not None)
 
-            stylesheet_lbl = self._control_room.get_stylesheet_color_for_field(
+            state = self._control_room.get_field_state(
                 self._part_name, "enable_progressive_render",
                 progressive_render_enabled, self.__progressive_render_override)
-            self.__ui_progressive_render_cb.setStyleSheet("QCheckBox{" + stylesheet_lbl + "}")
-            self.__retrieve_progressive_render_override()
+            self._control_room.set_widget_state(self.__ui_progressive_render_cb, state)
         except:
             pass
 
+    def register_fields(self, dirty_tracker):
+        """
+        Register the refresh functions of the part with the plugs and preset keys they depend on
+        :param dirty_tracker
+        :return:
+        """
+        dirty_tracker.register(self.__refresh_progressive_render,
+                               ["defaultArnoldRenderOptions.enableProgressiveRender"],
+                               [(self._part_name, "enable_progressive_render")])
+        for fs in self.__form_sliders:
+            fs.register_fields(dirty_tracker)
+
     def __on_progressive_render_changed(self, state):
         """
         On enable progressive render checkbox changed set enableProgressiveRender
@@ -130,28 +148,38 @@ class SamplingPart(ControlRoomPart):
         :return:
         """
         if not self._preset_hovered:
-            pm.setAttr("defaultArnoldRenderOptions.enableProgressiveRender", state == 2)
+            self._control_room.set_attr("defaultArnoldRenderOptions.enableProgressiveRender", state == 2)
 
     def add_callbacks(self):
         """
         Add the callbacks
         :return:
         """
-        self.__progressive_render_callback = pm.scriptJob(
-            attributeChange=["defaultArnoldRenderOptions.enableProgressiveRender", self.refresh_ui])
+        self._control_room.get_callback_hub().subscribe("defaultArnoldRenderOptions.enableProgressiveRender",
+                                                        self._control_room.on_plug_changed)
         for fs in self.__form_sliders:
             fs.add_callbacks()
-        self.__layer_callback = pm.scriptJob(event=["renderLayerManagerChange", self.refresh_ui])
 
     def remove_callbacks(self):
         """
         Remove the callbacks
         :return:
         """
-        pm.scriptJob(kill=self.__progressive_render_callback)
+        self._control_room.get_callback_hub().unsubscribe("defaultArnoldRenderOptions.enableProgressiveRender",
+                                                          self._control_room.on_plug_changed)
         for fs in self.__form_sliders:
             fs.remove_callbacks()
-        pm.scriptJob(kill=self.__layer_callback)
+
+    def get_fields(self):
+        """
+        Getter of the fields of the part stored on a plug
+        :return: list of (part_name, key in the preset, plug)
+        """
+        fields = [(self._part_name, "enable_progressive_render", "defaultArnoldRenderOptions.enableProgressiveRender")]
+        for fs in self.__form_sliders:
+            key, field = fs.get_key_preset_and_field()
+            fields.append((self._part_name, key, field))
+        return fields
 
     def add_to_preset(self, preset):
         """
@@ -159,10 +187,11 @@ class SamplingPart(ControlRoomPart):
         :param preset
         :return:
         """
-        preset.set(self._part_name, "enable_progressive_render", pm.getAttr("defaultArnoldRenderOptions.enableProgressiveRender"))
+        preset.set(self._part_name, "enable_progressive_render",
+                   self._control_room.get_attr("defaultArnoldRenderOptions.enableProgressiveRender"))
         for fs in self.__form_sliders:
             key, field = fs.get_key_preset_and_field()
-            preset.set(self._part_name, key, pm.getAttr(field))
+            preset.set(self._part_name, key, self._control_room.get_attr(field))
 
     def apply(self, preset):
         """
@@ -171,8 +200,8 @@ class SamplingPart(ControlRoomPart):
         :return:
         """
         if preset.contains(self._part_name, "enable_progressive_render"):
-            pm.setAttr("defaultArnoldRenderOptions.enableProgressiveRender", preset.get(self._part_name, "enable_progressive_render"))
+            self._control_room.set_attr("defaultArnoldRenderOptions.enableProgressiveRender", preset.get(self._part_name, "enable_progressive_render"))
         for fs in self.__form_sliders:
             key, field = fs.get_key_preset_and_field()
             if preset.contains(self._part_name, key):
-                pm.setAttr(field, preset.get(self._part_name, key))
+                self._control_room.set_attr(field, preset.get(self._part_name, key))